@@ -5,7 +5,8 @@ from typing import List, Optional
 from ninja import Router, Schema
 from ninja_jwt.authentication import JWTAuth
 
-from .models import Rod, Reel, Line, Bait
+from core.catalog import get_catalog
+from core.http_cache import catalog_response, level_bucket
 
 router = Router()
 
@@ -69,100 +70,112 @@ class BaitSchema(Schema):
     is_consumable: bool
 
 
+def _list_equipment(request, table: str, serialize, available_only: bool):
+    """
+    Equipment list from the catalog with ETag/304 support.
+
+    The full list is shared by all players; the list filtered by player
+    level is cached per level bucket.
+    """
+    if not available_only:
+        return catalog_response(
+            request, (table,),
+            lambda catalog: [serialize(x) for x in catalog.all(table)]
+        )
+
+    bucket = level_bucket(get_catalog().all(table), request.auth.profile.level)
+    return catalog_response(
+        request, (table, bucket),
+        lambda catalog: [serialize(x) for x in catalog.all(table) if x.required_level <= bucket]
+    )
+
+
+def _rod_data(r) -> dict:
+    return {
+        'id': r.id,
+        'name': r.name,
+        'description': r.description,
+        'image': r.image,
+        'tier': r.tier,
+        'tier_display': r.tier_display,
+        'power': r.power,
+        'sensitivity': r.sensitivity,
+        'max_line_weight': r.max_line_weight,
+        'cast_distance_bonus': r.cast_distance_bonus,
+        'price': r.price,
+        'required_level': r.required_level,
+    }
+
+
+def _reel_data(r) -> dict:
+    return {
+        'id': r.id,
+        'name': r.name,
+        'description': r.description,
+        'image': r.image,
+        'tier': r.tier,
+        'tier_display': r.tier_display,
+        'gear_ratio': r.gear_ratio,
+        'drag_power': r.drag_power,
+        'line_capacity': r.line_capacity,
+        'retrieve_speed': r.retrieve_speed,
+        'price': r.price,
+        'required_level': r.required_level,
+    }
+
+
+def _line_data(ln) -> dict:
+    return {
+        'id': ln.id,
+        'name': ln.name,
+        'description': ln.description,
+        'image': ln.image,
+        'tier': ln.tier,
+        'tier_display': ln.tier_display,
+        'breaking_strength': ln.breaking_strength,
+        'visibility': ln.visibility,
+        'stretch': ln.stretch,
+        'length': ln.length,
+        'price': ln.price,
+        'required_level': ln.required_level,
+    }
+
+
+def _bait_data(b) -> dict:
+    return {
+        'id': b.id,
+        'name': b.name,
+        'description': b.description,
+        'image': b.image,
+        'bait_type': b.bait_type,
+        'bait_type_display': b.bait_type_display,
+        'uses': b.uses,
+        'attraction_bonus': b.attraction_bonus,
+        'price': b.price,
+        'required_level': b.required_level,
+        'is_consumable': b.is_consumable,
+    }
+
+
 @router.get('/rods', response=List[RodSchema], auth=JWTAuth())
 def list_rods(request, available_only: bool = False):
     """List all rods, optionally filtered by player level."""
-    rods = Rod.objects.all()
-    if available_only:
-        rods = rods.filter(required_level__lte=request.auth.profile.level)
-    return [
-        {
-            'id': r.id,
-            'name': r.name,
-            'description': r.description,
-            'image': r.image.url if r.image else None,
-            'tier': r.tier,
-            'tier_display': r.get_tier_display(),
-            'power': r.power,
-            'sensitivity': r.sensitivity,
-            'max_line_weight': r.max_line_weight,
-            'cast_distance_bonus': r.cast_distance_bonus,
-            'price': r.price,
-            'required_level': r.required_level,
-        }
-        for r in rods
-    ]
+    return _list_equipment(request, 'rods', _rod_data, available_only)
 
 
 @router.get('/reels', response=List[ReelSchema], auth=JWTAuth())
 def list_reels(request, available_only: bool = False):
     """List all reels."""
-    reels = Reel.objects.all()
-    if available_only:
-        reels = reels.filter(required_level__lte=request.auth.profile.level)
-    return [
-        {
-            'id': r.id,
-            'name': r.name,
-            'description': r.description,
-            'image': r.image.url if r.image else None,
-            'tier': r.tier,
-            'tier_display': r.get_tier_display(),
-            'gear_ratio': r.gear_ratio,
-            'drag_power': r.drag_power,
-            'line_capacity': r.line_capacity,
-            'retrieve_speed': r.retrieve_speed,
-            'price': r.price,
-            'required_level': r.required_level,
-        }
-        for r in reels
-    ]
+    return _list_equipment(request, 'reels', _reel_data, available_only)
 
 
 @router.get('/lines', response=List[LineSchema], auth=JWTAuth())
 def list_lines(request, available_only: bool = False):
     """List all lines."""
-    lines = Line.objects.all()
-    if available_only:
-        lines = lines.filter(required_level__lte=request.auth.profile.level)
-    return [
-        {
-            'id': ln.id,
-            'name': ln.name,
-            'description': ln.description,
-            'image': ln.image.url if ln.image else None,
-            'tier': ln.tier,
-            'tier_display': ln.get_tier_display(),
-            'breaking_strength': ln.breaking_strength,
-            'visibility': ln.visibility,
-            'stretch': ln.stretch,
-            'length': ln.length,
-            'price': ln.price,
-            'required_level': ln.required_level,
-        }
-        for ln in lines
-    ]
+    return _list_equipment(request, 'lines', _line_data, available_only)
 
 
 @router.get('/baits', response=List[BaitSchema], auth=JWTAuth())
 def list_baits(request, available_only: bool = False):
     """List all baits."""
-    baits = Bait.objects.all()
-    if available_only:
-        baits = baits.filter(required_level__lte=request.auth.profile.level)
-    return [
-        {
-            'id': b.id,
-            'name': b.name,
-            'description': b.description,
-            'image': b.image.url if b.image else None,
-            'bait_type': b.bait_type,
-            'bait_type_display': b.get_bait_type_display(),
-            'uses': b.uses,
-            'attraction_bonus': b.attraction_bonus,
-            'price': b.price,
-            'required_level': b.required_level,
-            'is_consumable': b.is_consumable,
-        }
-        for b in baits
-    ]
+    return _list_equipment(request, 'baits', _bait_data, available_only)
@@ -5,3 +5,7 @@ class EquipmentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.equipment'
     verbose_name = 'Снаряжение'
+
+    def ready(self):
+        # Register catalog tables
+        import apps.equipment.catalog  # noqa: F401
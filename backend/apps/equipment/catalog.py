@@ -0,0 +1,161 @@
+"""
+Equipment catalog entries.
+
+Immutable copies of Rod/Reel/Line/Bait rows held in the process-local
+catalog (core.catalog). Registered in EquipmentConfig.ready().
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from core.catalog import registry
+from .models import Rod, Reel, Line, Bait, EquipmentTier, BaitType
+
+
+def _image_url(obj) -> Optional[str]:
+    return obj.image.url if obj.image else None
+
+
+@dataclass(frozen=True, slots=True)
+class RodEntry:
+    """Fishing rod."""
+    id: int
+    name: str
+    description: str
+    image: Optional[str]
+    tier: str
+    power: int
+    sensitivity: int
+    max_line_weight: float
+    cast_distance_bonus: int
+    price: int
+    required_level: int
+    durability: int
+
+    @property
+    def tier_display(self) -> str:
+        return EquipmentTier(self.tier).label
+
+    def __str__(self):
+        return f'{self.name} ({self.tier_display})'
+
+    @classmethod
+    def from_model(cls, rod: Rod) -> 'RodEntry':
+        return cls(
+            id=rod.id, name=rod.name, description=rod.description,
+            image=_image_url(rod), tier=rod.tier, power=rod.power,
+            sensitivity=rod.sensitivity, max_line_weight=rod.max_line_weight,
+            cast_distance_bonus=rod.cast_distance_bonus, price=rod.price,
+            required_level=rod.required_level, durability=rod.durability,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ReelEntry:
+    """Fishing reel."""
+    id: int
+    name: str
+    description: str
+    image: Optional[str]
+    tier: str
+    gear_ratio: float
+    drag_power: float
+    line_capacity: int
+    retrieve_speed: int
+    price: int
+    required_level: int
+    durability: int
+
+    @property
+    def tier_display(self) -> str:
+        return EquipmentTier(self.tier).label
+
+    def __str__(self):
+        return f'{self.name} ({self.gear_ratio}:1)'
+
+    @classmethod
+    def from_model(cls, reel: Reel) -> 'ReelEntry':
+        return cls(
+            id=reel.id, name=reel.name, description=reel.description,
+            image=_image_url(reel), tier=reel.tier, gear_ratio=reel.gear_ratio,
+            drag_power=reel.drag_power, line_capacity=reel.line_capacity,
+            retrieve_speed=reel.retrieve_speed, price=reel.price,
+            required_level=reel.required_level, durability=reel.durability,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class LineEntry:
+    """Fishing line."""
+    id: int
+    name: str
+    description: str
+    image: Optional[str]
+    tier: str
+    breaking_strength: float
+    visibility: int
+    stretch: int
+    length: int
+    price: int
+    required_level: int
+
+    @property
+    def tier_display(self) -> str:
+        return EquipmentTier(self.tier).label
+
+    def __str__(self):
+        return f'{self.name} ({self.breaking_strength} кг)'
+
+    @classmethod
+    def from_model(cls, line: Line) -> 'LineEntry':
+        return cls(
+            id=line.id, name=line.name, description=line.description,
+            image=_image_url(line), tier=line.tier,
+            breaking_strength=line.breaking_strength, visibility=line.visibility,
+            stretch=line.stretch, length=line.length, price=line.price,
+            required_level=line.required_level,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class BaitEntry:
+    """Fishing bait."""
+    id: int
+    name: str
+    description: str
+    image: Optional[str]
+    bait_type: str
+    uses: int
+    attraction_bonus: int
+    price: int
+    required_level: int
+    is_consumable: bool
+
+    @property
+    def bait_type_display(self) -> str:
+        return BaitType(self.bait_type).label
+
+    def __str__(self):
+        return f'{self.name} ({self.bait_type_display})'
+
+    @classmethod
+    def from_model(cls, bait: Bait) -> 'BaitEntry':
+        return cls(
+            id=bait.id, name=bait.name, description=bait.description,
+            image=_image_url(bait), bait_type=bait.bait_type, uses=bait.uses,
+            attraction_bonus=bait.attraction_bonus, price=bait.price,
+            required_level=bait.required_level, is_consumable=bait.is_consumable,
+        )
+
+
+# Catalog table name by equipment type (rod, reel, line, bait)
+EQUIPMENT_TABLES = {
+    'rod': 'rods',
+    'reel': 'reels',
+    'line': 'lines',
+    'bait': 'baits',
+}
+
+registry.register('rods', Rod.objects.all(), RodEntry.from_model)
+registry.register('reels', Reel.objects.all(), ReelEntry.from_model)
+registry.register('lines', Line.objects.all(), LineEntry.from_model)
+registry.register('baits', Bait.objects.all(), BaitEntry.from_model)
@@ -0,0 +1,41 @@
+"""
+HTTP caching of catalog lists: authentication, private Cache-Control, ETag/304.
+"""
+import pytest
+from django.test import Client
+from ninja_jwt.tokens import RefreshToken
+
+from apps.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+PATHS = ['/api/equipment/rods', '/api/equipment/rods?available_only=true']
+
+
+@pytest.fixture
+def client():
+    user = User.objects.create_user(username='angler', email='angler@test.test', password='x')
+    token = RefreshToken.for_user(user).access_token
+    return Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+
+@pytest.mark.parametrize('path', PATHS)
+def test_requires_authentication(path):
+    assert Client().get(path).status_code == 401
+
+
+@pytest.mark.parametrize('path', PATHS)
+def test_response_is_private(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    cache_control = response['Cache-Control']
+    assert 'private' in cache_control
+    assert 'public' not in cache_control
+
+
+@pytest.mark.parametrize('path', PATHS)
+def test_matching_etag_gives_304(client, path):
+    etag = client.get(path)['ETag']
+    response = client.get(path, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response['ETag'] == etag
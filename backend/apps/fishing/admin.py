@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Location, Fish, FishBaitPreference, CatchRecord
+from .models import Location, Fish, FishBaitPreference, CatchRecord, CatchDailyRollup
 
 
 @admin.register(Location)
@@ -47,3 +47,11 @@ class CatchRecordAdmin(admin.ModelAdmin):
     search_fields = ['player__username', 'fish__name']
     date_hierarchy = 'caught_at'
     readonly_fields = ['caught_at']
+
+
+@admin.register(CatchDailyRollup)
+class CatchDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['day', 'player', 'fish', 'location', 'catch_count', 'total_weight', 'max_weight']
+    list_filter = ['location', 'fish__rarity', 'day']
+    search_fields = ['player__username', 'fish__name']
+    date_hierarchy = 'day'
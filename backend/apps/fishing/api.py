@@ -1,11 +1,16 @@
 """
 Fishing API endpoints.
 """
+import csv
+from datetime import datetime
 from typing import List, Optional
+
+from django.http import StreamingHttpResponse
 from ninja import Router, Schema
 from ninja_jwt.authentication import JWTAuth
 
-from .models import Fish, Location, CatchRecord, Rarity
+from core.http_cache import catalog_response
+from .services.catch_history import CatchFilter, CatchHistory, InvalidCursorError
 
 router = Router()
 
@@ -36,8 +41,10 @@ class FishSchema(Schema):
 
 class CatchRecordSchema(Schema):
     id: int
+    fish_id: int
     fish_name: str
     fish_rarity: str
+    location_id: int
     location_name: str
     weight: float
     price: int
@@ -45,6 +52,15 @@ class CatchRecordSchema(Schema):
     caught_at: str
 
 
+class CatchPageSchema(Schema):
+    items: List[CatchRecordSchema]
+    next_cursor: Optional[str]
+
+
+class MessageSchema(Schema):
+    message: str
+
+
 @router.get('/locations', response=List[LocationSchema], auth=JWTAuth())
 def list_locations(request):
     """List all available locations for player."""
@@ -56,7 +72,7 @@ def list_locations(request):
             'id': loc.id,
             'name': loc.name,
             'description': loc.description,
-            'image': loc.image.url if loc.image else None,
+            'image': loc.image,
             'max_depth': loc.max_depth,
             'required_level': loc.required_level,
         }
@@ -66,44 +82,99 @@ def list_locations(request):
 
 @router.get('/locations/{location_id}/fish', response=List[FishSchema], auth=JWTAuth())
 def list_fish_at_location(request, location_id: int):
-    """List fish species at a location."""
-    fish_list = Fish.objects.filter(locations__id=location_id)
-    return [
-        {
-            'id': f.id,
-            'name': f.name,
-            'description': f.description,
-            'image': f.image.url if f.image else None,
-            'min_weight': f.min_weight,
-            'max_weight': f.max_weight,
-            'rarity': f.rarity,
-            'rarity_display': f.get_rarity_display(),
-            'base_price': f.base_price,
-            'strength': f.strength,
-            'stamina': f.stamina,
-            'aggressiveness': f.aggressiveness,
-        }
-        for f in fish_list
-    ]
+    """List fish species at a location (ETag/304, same for all players)."""
+    return catalog_response(
+        request, ('fish_at_location', location_id),
+        lambda catalog: [
+            _fish_data(f) for f in catalog.all('fish')
+            if location_id in f.location_ids
+        ]
+    )
+
+
+def _fish_data(f) -> dict:
+    return {
+        'id': f.id,
+        'name': f.name,
+        'description': f.description,
+        'image': f.image,
+        'min_weight': f.min_weight,
+        'max_weight': f.max_weight,
+        'rarity': f.rarity,
+        'rarity_display': f.rarity_display,
+        'base_price': f.base_price,
+        'strength': f.strength,
+        'stamina': f.stamina,
+        'aggressiveness': f.aggressiveness,
+    }
 
 
 @router.get('/catches', response=List[CatchRecordSchema], auth=JWTAuth())
 def list_catches(request, limit: int = 20):
     """List player's recent catches."""
-    catches = CatchRecord.objects.filter(
-        player=request.auth
-    ).select_related('fish', 'location')[:limit]
+    return CatchHistory(request.auth.pk).page(limit=limit).items
 
-    return [
-        {
-            'id': c.id,
-            'fish_name': c.fish.name,
-            'fish_rarity': c.fish.rarity,
-            'location_name': c.location.name,
-            'weight': c.weight,
-            'price': c.price,
-            'experience': c.experience,
-            'caught_at': c.caught_at.isoformat(),
-        }
-        for c in catches
-    ]
+
+@router.get('/catches/history', response={200: CatchPageSchema, 400: MessageSchema}, auth=JWTAuth())
+def catch_history(
+    request,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    fish_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """
+    Catch history page, newest first.
+
+    Pass next_cursor of the response as cursor to get the next page;
+    next_cursor is null on the last page.
+    """
+    history = CatchHistory(
+        request.auth.pk,
+        CatchFilter(fish_id=fish_id, location_id=location_id, since=since, until=until)
+    )
+    try:
+        page = history.page(cursor=cursor, limit=limit)
+    except InvalidCursorError as e:
+        return 400, {'message': str(e)}
+    return {'items': page.items, 'next_cursor': page.next_cursor}
+
+
+class _Echo:
+    """File-like object for csv.writer that returns the written line."""
+
+    def write(self, value):
+        return value
+
+
+EXPORT_COLUMNS = (
+    'id', 'caught_at', 'fish_id', 'fish_name', 'fish_rarity',
+    'location_id', 'location_name', 'weight', 'price', 'experience',
+)
+
+
+@router.get('/catches/export', auth=JWTAuth())
+def export_catches(
+    request,
+    fish_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Stream the whole (filtered) catch history as CSV."""
+    history = CatchHistory(
+        request.auth.pk,
+        CatchFilter(fish_id=fish_id, location_id=location_id, since=since, until=until)
+    )
+    writer = csv.writer(_Echo())
+
+    def rows():
+        yield writer.writerow(EXPORT_COLUMNS)
+        for item in history.iter_items():
+            yield writer.writerow([item[column] for column in EXPORT_COLUMNS])
+
+    response = StreamingHttpResponse(rows(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="catches.csv"'
+    return response
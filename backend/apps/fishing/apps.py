@@ -5,3 +5,7 @@ class FishingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.fishing'
     verbose_name = 'Рыбалка'
+
+    def ready(self):
+        # Register catalog tables
+        import apps.fishing.catalog  # noqa: F401
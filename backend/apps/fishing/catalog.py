@@ -0,0 +1,112 @@
+"""
+Fishing catalog entries.
+
+Immutable copies of Fish/Location rows and bait preferences held in the
+process-local catalog (core.catalog). Registered in FishingConfig.ready().
+"""
+import random
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from core.catalog import registry
+from .models import (
+    Fish, Location, FishBaitPreference, Rarity,
+    RARITY_PRICE_MULTIPLIER, RARITY_EXPERIENCE
+)
+
+
+def _image_url(obj) -> Optional[str]:
+    return obj.image.url if obj.image else None
+
+
+@dataclass(frozen=True, slots=True)
+class LocationEntry:
+    """Fishing location."""
+    id: int
+    name: str
+    description: str
+    image: Optional[str]
+    max_depth: float
+    required_level: int
+    is_active: bool
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def from_model(cls, location: Location) -> 'LocationEntry':
+        return cls(
+            id=location.id, name=location.name, description=location.description,
+            image=_image_url(location), max_depth=location.max_depth,
+            required_level=location.required_level, is_active=location.is_active,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class FishEntry:
+    """Fish species."""
+    id: int
+    name: str
+    description: str
+    image: Optional[str]
+    min_weight: float
+    max_weight: float
+    rarity: str
+    base_price: int
+    strength: int
+    stamina: int
+    aggressiveness: int
+    location_ids: frozenset
+    depth_min: float
+    depth_max: float
+    active_from: int
+    active_until: int
+
+    @property
+    def rarity_display(self) -> str:
+        return Rarity(self.rarity).label
+
+    def __str__(self):
+        return f'{self.name} ({self.rarity_display})'
+
+    def generate_weight(self) -> float:
+        """Generate random weight within range."""
+        return round(random.uniform(self.min_weight, self.max_weight), 2)
+
+    def calculate_price(self, weight: float) -> int:
+        """Calculate price based on weight and rarity multiplier."""
+        return int(weight * self.base_price * RARITY_PRICE_MULTIPLIER.get(self.rarity, 1.0))
+
+    def calculate_experience(self, weight: float) -> int:
+        """Calculate experience reward."""
+        base_xp = RARITY_EXPERIENCE.get(self.rarity, 10)
+        return int(base_xp * (1 + weight / self.max_weight))
+
+    @classmethod
+    def from_model(cls, fish: Fish, location_ids: Iterable[int] = ()) -> 'FishEntry':
+        return cls(
+            id=fish.id, name=fish.name, description=fish.description,
+            image=_image_url(fish), min_weight=fish.min_weight,
+            max_weight=fish.max_weight, rarity=fish.rarity,
+            base_price=fish.base_price, strength=fish.strength,
+            stamina=fish.stamina, aggressiveness=fish.aggressiveness,
+            location_ids=frozenset(location_ids), depth_min=fish.depth_min,
+            depth_max=fish.depth_max, active_from=fish.active_from,
+            active_until=fish.active_until,
+        )
+
+
+registry.register('locations', Location.objects.all(), LocationEntry.from_model)
+registry.register(
+    'fish',
+    Fish.objects.prefetch_related('locations'),
+    lambda fish: FishEntry.from_model(fish, [loc.pk for loc in fish.locations.all()])
+)
+# (fish_id, bait_id) -> attraction
+registry.register(
+    'bait_preferences',
+    FishBaitPreference.objects.all(),
+    lambda pref: pref.attraction,
+    key=lambda pref: (pref.fish_id, pref.bait_id)
+)
+registry.watch(Fish.locations.through)
@@ -0,0 +1,53 @@
+"""
+Maintain monthly partitions of CatchRecord (PostgreSQL).
+
+    python manage.py catch_partitions --convert   # once, in a maintenance window
+    python manage.py catch_partitions             # daily: create partitions ahead
+    python manage.py catch_partitions --detach [--drop]
+
+Detach only after rollup_catches has built the rollups of those months.
+On other databases the command reports that partitioning is unavailable
+and does nothing.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.fishing.services import partitions
+
+
+class Command(BaseCommand):
+    help = 'Create future monthly partitions of CatchRecord and detach old ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--convert', action='store_true',
+                            help='Convert CatchRecord into a partitioned table (once)')
+        parser.add_argument('--ahead', type=int, default=settings.CATCH_PARTITION_MONTHS_AHEAD,
+                            help='Months to create ahead of the current one')
+        parser.add_argument('--detach', action='store_true',
+                            help='Detach partitions older than --retention months')
+        parser.add_argument('--retention', type=int, default=settings.CATCH_RETENTION_MONTHS,
+                            help='Months of raw catches to keep attached')
+        parser.add_argument('--drop', action='store_true',
+                            help='Drop detached partitions instead of keeping them as archives')
+
+    def handle(self, *args, **options):
+        if not partitions.is_supported():
+            self.stdout.write(self.style.WARNING(
+                'CatchRecord partitioning requires PostgreSQL - nothing to do'
+            ))
+            return
+
+        if options['convert']:
+            partitions.convert_to_partitioned()
+            self.stdout.write(self.style.SUCCESS(f'{partitions.TABLE} is partitioned by month'))
+        elif not partitions.is_partitioned():
+            self.stdout.write(self.style.WARNING(
+                f'{partitions.TABLE} is not partitioned - run with --convert first'
+            ))
+            return
+
+        for name in partitions.create_partitions(options['ahead']):
+            self.stdout.write(f'Created {name}')
+        if options['detach']:
+            for name in partitions.detach_partitions(options['retention'], drop=options['drop']):
+                self.stdout.write(f'{"Dropped" if options["drop"] else "Detached"} {name}')
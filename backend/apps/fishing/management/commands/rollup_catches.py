@@ -0,0 +1,31 @@
+"""
+Rebuild daily catch rollups (CatchDailyRollup) from CatchRecord.
+
+By default rebuilds yesterday and today - run it periodically (e.g.
+every 15 minutes) to keep today's totals fresh. Rebuilding a day
+replaces its rows, so runs can overlap or repeat.
+
+    python manage.py rollup_catches [--date 2026-01-31] [--days 7]
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.fishing.services.rollups import rollup_days
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily catch rollups per player, fish and location'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat,
+                            help='Last day to rebuild (default: today)')
+        parser.add_argument('--days', type=int, default=2,
+                            help='Number of days ending with --date')
+
+    def handle(self, *args, **options):
+        until = options['date'] or timezone.localdate()
+        since = until - timedelta(days=max(1, options['days']) - 1)
+        rows = rollup_days(since, until)
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {since} .. {until}: {rows} rows'))
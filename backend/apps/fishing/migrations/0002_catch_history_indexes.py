@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fishing', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='catchrecord',
+            index=models.Index(fields=['player', '-caught_at', '-id'], name='catch_player_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catchrecord',
+            index=models.Index(fields=['player', 'fish', '-caught_at', '-id'], name='catch_player_fish_time_idx'),
+        ),
+    ]
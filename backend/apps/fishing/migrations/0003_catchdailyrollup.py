@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fishing', '0002_catch_history_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatchDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('catch_count', models.PositiveIntegerField(default=0, verbose_name='Поймано')),
+                ('total_weight', models.FloatField(default=0, verbose_name='Общий вес (кг)')),
+                ('max_weight', models.FloatField(default=0, verbose_name='Самая крупная (кг)')),
+                ('total_price', models.PositiveIntegerField(default=0, verbose_name='Сумма цен')),
+                ('total_experience', models.PositiveIntegerField(default=0, verbose_name='Сумма опыта')),
+                ('fish', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='fishing.fish', verbose_name='Рыба')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='fishing.location', verbose_name='Локация')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='catch_rollups', to=settings.AUTH_USER_MODEL, verbose_name='Игрок')),
+            ],
+            options={
+                'verbose_name': 'Итоги уловов за день',
+                'verbose_name_plural': 'Итоги уловов по дням',
+                'indexes': [models.Index(fields=['player', 'day'], name='rollup_player_day_idx')],
+                'unique_together': {('day', 'player', 'fish', 'location')},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fishing', '0003_catchdailyrollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='catchrecord',
+            name='caught_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Время поимки'),
+        ),
+    ]
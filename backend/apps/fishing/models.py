@@ -2,6 +2,7 @@
 Fishing models: Fish, Location, Weather conditions.
 """
 from django.db import models
+from django.utils import timezone
 
 
 class Rarity(models.TextChoices):
@@ -12,6 +13,25 @@ class Rarity(models.TextChoices):
     LEGENDARY = 'legendary', 'Легендарная'
 
 
+# Price multiplier by rarity
+RARITY_PRICE_MULTIPLIER = {
+    Rarity.COMMON: 1.0,
+    Rarity.UNCOMMON: 1.5,
+    Rarity.RARE: 2.5,
+    Rarity.EPIC: 4.0,
+    Rarity.LEGENDARY: 8.0,
+}
+
+# Base experience by rarity
+RARITY_EXPERIENCE = {
+    Rarity.COMMON: 10,
+    Rarity.UNCOMMON: 25,
+    Rarity.RARE: 50,
+    Rarity.EPIC: 100,
+    Rarity.LEGENDARY: 250,
+}
+
+
 class Location(models.Model):
     """Fishing location."""
     name = models.CharField(max_length=100, verbose_name='Название')
@@ -112,25 +132,11 @@ class Fish(models.Model):
 
     def calculate_price(self, weight: float) -> int:
         """Calculate price based on weight and rarity multiplier."""
-        rarity_multiplier = {
-            Rarity.COMMON: 1.0,
-            Rarity.UNCOMMON: 1.5,
-            Rarity.RARE: 2.5,
-            Rarity.EPIC: 4.0,
-            Rarity.LEGENDARY: 8.0,
-        }
-        return int(weight * self.base_price * rarity_multiplier.get(self.rarity, 1.0))
+        return int(weight * self.base_price * RARITY_PRICE_MULTIPLIER.get(self.rarity, 1.0))
 
     def calculate_experience(self, weight: float) -> int:
         """Calculate experience reward."""
-        rarity_xp = {
-            Rarity.COMMON: 10,
-            Rarity.UNCOMMON: 25,
-            Rarity.RARE: 50,
-            Rarity.EPIC: 100,
-            Rarity.LEGENDARY: 250,
-        }
-        base_xp = rarity_xp.get(self.rarity, 10)
+        base_xp = RARITY_EXPERIENCE.get(self.rarity, 10)
         return int(base_xp * (1 + weight / self.max_weight))
 
 
@@ -185,12 +191,63 @@ class CatchRecord(models.Model):
     weight = models.FloatField(verbose_name='Вес (кг)')
     price = models.PositiveIntegerField(verbose_name='Цена')
     experience = models.PositiveIntegerField(verbose_name='Опыт')
-    caught_at = models.DateTimeField(auto_now_add=True, verbose_name='Время поимки')
+    # Not auto_now_add: write-behind flushes pass the time the catch was completed
+    caught_at = models.DateTimeField(default=timezone.now, editable=False, verbose_name='Время поимки')
 
     class Meta:
         verbose_name = 'Запись улова'
         verbose_name_plural = 'Записи уловов'
         ordering = ['-caught_at']
+        indexes = [
+            # Catch history pages: player's catches newest first (keyset by caught_at, id)
+            models.Index(fields=['player', '-caught_at', '-id'], name='catch_player_time_idx'),
+            models.Index(fields=['player', 'fish', '-caught_at', '-id'], name='catch_player_fish_time_idx'),
+        ]
 
     def __str__(self):
         return f'{self.player.username}: {self.fish.name} ({self.weight} кг)'
+
+
+class CatchDailyRollup(models.Model):
+    """
+    Daily catch totals per player, fish and location.
+
+    Rebuilt from CatchRecord by day (services/rollups.py, command
+    rollup_catches); analytics and leaderboards read it instead of
+    scanning raw catches, which may be detached with old partitions.
+    """
+    day = models.DateField(verbose_name='День')
+    player = models.ForeignKey(
+        'users.User',
+        on_delete=models.CASCADE,
+        related_name='catch_rollups',
+        verbose_name='Игрок'
+    )
+    fish = models.ForeignKey(
+        Fish,
+        on_delete=models.CASCADE,
+        related_name='rollups',
+        verbose_name='Рыба'
+    )
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.CASCADE,
+        related_name='rollups',
+        verbose_name='Локация'
+    )
+    catch_count = models.PositiveIntegerField(default=0, verbose_name='Поймано')
+    total_weight = models.FloatField(default=0, verbose_name='Общий вес (кг)')
+    max_weight = models.FloatField(default=0, verbose_name='Самая крупная (кг)')
+    total_price = models.PositiveIntegerField(default=0, verbose_name='Сумма цен')
+    total_experience = models.PositiveIntegerField(default=0, verbose_name='Сумма опыта')
+
+    class Meta:
+        verbose_name = 'Итоги уловов за день'
+        verbose_name_plural = 'Итоги уловов по дням'
+        unique_together = ['day', 'player', 'fish', 'location']
+        indexes = [
+            models.Index(fields=['player', 'day'], name='rollup_player_day_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.day} {self.player.username}: {self.fish.name} x{self.catch_count}'
@@ -0,0 +1,61 @@
+"""
+Alias-method sampler (Walker/Vose).
+
+Builds a table in O(n) from a list of weights, after which every draw
+takes O(1): one uniform index and one biased coin flip.
+"""
+import random
+from typing import Generic, Sequence, TypeVar
+
+T = TypeVar('T')
+
+
+class AliasSampler(Generic[T]):
+    """Weighted random choice in O(1) per draw."""
+
+    __slots__ = ('items', 'total', '_prob', '_alias')
+
+    def __init__(self, items: Sequence[T], weights: Sequence[float]):
+        if not items or len(items) != len(weights):
+            raise ValueError('items and weights must be non-empty and of equal length')
+
+        n = len(items)
+        self.items = list(items)
+        self.total = sum(weights)
+        if self.total <= 0:
+            raise ValueError('total weight must be positive')
+
+        # Vose: split scaled weights into under- and over-full columns
+        scaled = [w * n / self.total for w in weights]
+        prob = [0.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+
+        # Leftovers are full columns (up to rounding errors)
+        for i in large + small:
+            prob[i] = 1.0
+
+        self._prob = prob
+        self._alias = alias
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def sample(self, rng=random) -> T:
+        """Draw one item (rng - random module or random.Random instance)."""
+        i = int(rng.random() * len(self._prob))
+        if rng.random() < self._prob[i]:
+            return self.items[i]
+        return self.items[self._alias[i]]
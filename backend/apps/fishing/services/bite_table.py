@@ -0,0 +1,189 @@
+"""
+Compiled bite tables.
+
+A BiteTable holds everything BiteCalculator needs for one (location, bait)
+pair: the fish living there, their bait attraction, precomputed rarity
+factors and an hour-of-day activity mask, indexed by depth.
+
+Tables are compiled from the catalog (core.catalog) on first use and
+live as long as the catalog snapshot: any change to fish, locations or
+bait preferences publishes a new snapshot and the tables are rebuilt.
+"""
+from bisect import bisect_left
+from typing import Optional
+
+from core.catalog import Catalog, get_catalog
+from apps.fishing.catalog import FishEntry
+from apps.fishing.services.alias_sampler import AliasSampler
+
+# Attraction used when a fish has no preference for the bait (or there is no bait)
+DEFAULT_ATTRACTION = 20
+
+# Base bite probability by rarity
+RARITY_BITE_FACTOR = {
+    'common': 0.4,
+    'uncommon': 0.25,
+    'rare': 0.15,
+    'epic': 0.08,
+    'legendary': 0.03,
+}
+DEFAULT_BITE_FACTOR = 0.1
+
+# Time until bite (seconds) by rarity - rarer fish take longer
+RARITY_WAIT_TIME = {
+    'common': (5, 20),
+    'uncommon': (10, 30),
+    'rare': (20, 45),
+    'epic': (30, 60),
+    'legendary': (45, 90),
+}
+DEFAULT_WAIT_TIME = (10, 30)
+
+
+def activity_mask(active_from: int, active_until: int) -> int:
+    """24-bit mask of the hours a fish is active (bit N = hour N)."""
+    mask = 0
+    for hour in range(24):
+        if active_from <= active_until:
+            active = active_from <= hour < active_until
+        else:
+            # Wraps around midnight
+            active = hour >= active_from or hour < active_until
+        if active:
+            mask |= 1 << hour
+    return mask
+
+
+class BiteEntry:
+    """Precomputed bite parameters of one fish for a (location, bait) pair."""
+
+    __slots__ = (
+        'fish', 'depth_min', 'depth_max', 'depth_center', 'depth_range',
+        'hours', 'base_probability', 'wait_time',
+    )
+
+    def __init__(self, fish: FishEntry, attraction: int):
+        self.fish = fish
+        self.depth_min = fish.depth_min
+        self.depth_max = fish.depth_max
+        self.depth_center = (fish.depth_min + fish.depth_max) / 2
+        self.depth_range = fish.depth_max - fish.depth_min
+        self.hours = activity_mask(fish.active_from, fish.active_until)
+
+        # Rarity factor * attraction factor (0-100 -> 0.5-1.5)
+        rarity_factor = RARITY_BITE_FACTOR.get(fish.rarity, DEFAULT_BITE_FACTOR)
+        self.base_probability = rarity_factor * (0.5 + attraction / 100)
+        self.wait_time = RARITY_WAIT_TIME.get(fish.rarity, DEFAULT_WAIT_TIME)
+
+    def is_active(self, hour: int) -> bool:
+        """Check if fish is active at given hour."""
+        return bool(self.hours >> hour & 1)
+
+    def probability(self, depth: float) -> float:
+        """Bite probability at given depth."""
+        if self.depth_range:
+            depth_diff = abs(depth - self.depth_center)
+            depth_factor = max(0.5, 1 - (depth_diff / self.depth_range))
+        else:
+            depth_factor = 1.0
+        return self.base_probability * depth_factor
+
+
+class BiteTable:
+    """
+    Fish that can bite at a location with a given bait, indexed by depth.
+
+    Depth ranges are split into elementary segments by their endpoints:
+    for every endpoint and every open segment between two neighbouring
+    endpoints the covering entries are stored up front, so a lookup is
+    one bisect plus copying the k matching entries - O(log n + k).
+
+    The bite distribution for a depth (rounded to SAMPLER_DEPTH_PRECISION)
+    and hour is compiled into an AliasSampler once and reused until
+    the table itself is invalidated.
+    """
+
+    SAMPLER_DEPTH_PRECISION = 2  # Decimal places (centimetres)
+    MAX_SAMPLERS = 10000
+
+    def __init__(self, entries: list[BiteEntry]):
+        self.entries = entries
+        self._samplers: dict[tuple[float, int], Optional[AliasSampler[BiteEntry]]] = {}
+
+        points = sorted({e.depth_min for e in entries} | {e.depth_max for e in entries})
+        self._points = points
+        # Entries covering exactly points[i]
+        self._at_point = [
+            [e for e in entries if e.depth_min <= p <= e.depth_max]
+            for p in points
+        ]
+        # Entries covering the open segment (points[i], points[i + 1])
+        self._between = [
+            [e for e in entries if e.depth_min <= low and high <= e.depth_max]
+            for low, high in zip(points, points[1:])
+        ]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def at_depth(self, depth: float) -> list[BiteEntry]:
+        """Entries whose depth range contains depth."""
+        i = bisect_left(self._points, depth)
+        if i < len(self._points) and self._points[i] == depth:
+            return self._at_point[i]
+        if 0 < i < len(self._points):
+            return self._between[i - 1]
+        return []
+
+    def candidates(self, depth: float, hour: int) -> list[BiteEntry]:
+        """Entries that can bite at given depth and hour."""
+        return [e for e in self.at_depth(depth) if e.hours >> hour & 1]
+
+    def sampler(self, depth: float, hour: int) -> Optional[AliasSampler[BiteEntry]]:
+        """
+        Bite distribution at given depth and hour.
+
+        Returns None if no fish can bite. The sampler's total is the summed
+        bite probability, items are drawn proportionally to their probability.
+        """
+        depth = round(depth, self.SAMPLER_DEPTH_PRECISION)
+        key = (depth, hour)
+        try:
+            return self._samplers[key]
+        except KeyError:
+            pass
+
+        candidates = self.candidates(depth, hour)
+        weights = [entry.probability(depth) for entry in candidates]
+        sampler = AliasSampler(candidates, weights) if candidates else None
+
+        if len(self._samplers) >= self.MAX_SAMPLERS:
+            self._samplers.clear()
+        self._samplers[key] = sampler
+        return sampler
+
+    @classmethod
+    def compile(cls, catalog: Catalog, location_id: int, bait_id: Optional[int]) -> 'BiteTable':
+        """Build the table from a catalog snapshot (no queries)."""
+        entries = []
+        for fish in catalog.all('fish'):
+            if location_id not in fish.location_ids:
+                continue
+
+            attraction = DEFAULT_ATTRACTION
+            if bait_id is not None:
+                attraction = catalog.get('bait_preferences', (fish.id, bait_id), DEFAULT_ATTRACTION)
+            if attraction == 0:
+                continue  # Fish ignores this bait
+            entries.append(BiteEntry(fish, attraction))
+
+        return cls(entries)
+
+
+def get_bite_table(location_id: int, bait_id: Optional[int]) -> BiteTable:
+    """Get the compiled bite table for a location and bait."""
+    catalog = get_catalog()
+    return catalog.derived(
+        ('bite_table', location_id, bait_id),
+        lambda: BiteTable.compile(catalog, location_id, bait_id)
+    )
@@ -0,0 +1,144 @@
+"""
+Catch history with keyset pagination.
+
+Catches are read newest first in (caught_at, id) order. A page ends with
+an opaque cursor holding the last row's key; the next page continues
+with `(caught_at, id) < cursor`. Each page is an index range scan on
+(player, -caught_at, -id), so its cost does not depend on how deep into
+the history it is, unlike OFFSET. The export walks the same pages and
+streams rows without loading the whole history.
+
+Fish and location names come from the catalog, so rows are read from
+CatchRecord alone, without joins.
+"""
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from apps.fishing.models import CatchRecord
+from core.catalog import get_catalog
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+EXPORT_CHUNK_SIZE = 500
+
+ROW_FIELDS = ('id', 'fish_id', 'location_id', 'weight', 'price', 'experience', 'caught_at')
+
+
+class InvalidCursorError(ValueError):
+    """Cursor was not produced by encode_cursor()."""
+
+
+def encode_cursor(caught_at: datetime, record_id: int) -> str:
+    """Opaque cursor pointing after the row (caught_at, record_id)."""
+    raw = f'{caught_at.isoformat()}|{record_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor(); raises InvalidCursorError."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, record_id = raw.split('|')
+        caught_at = parse_datetime(timestamp)
+        if caught_at is None:
+            raise ValueError(timestamp)
+        return caught_at, int(record_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError('Invalid cursor') from None
+
+
+@dataclass(frozen=True)
+class CatchFilter:
+    """Catch history filters; None means "any"."""
+    fish_id: Optional[int] = None
+    location_id: Optional[int] = None
+    since: Optional[datetime] = None   # inclusive
+    until: Optional[datetime] = None   # exclusive
+
+
+@dataclass
+class CatchPage:
+    """One page of catch history."""
+    items: List[dict]
+    next_cursor: Optional[str]
+
+
+class CatchHistory:
+    """Catch history of one player."""
+
+    def __init__(self, player_id: int, filters: Optional[CatchFilter] = None):
+        self.player_id = player_id
+        self.filters = filters or CatchFilter()
+
+    def page(self, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> CatchPage:
+        """
+        Catches after cursor (newest first).
+
+        Args:
+            cursor: next_cursor of the previous page; None - from the newest
+            limit: Page size, clamped to 1..MAX_PAGE_SIZE
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        after = decode_cursor(cursor) if cursor else None
+        # One extra row tells whether there is a next page
+        rows = self._rows(after, limit + 1)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last['caught_at'], last['id'])
+        return CatchPage(items=[self._item(row) for row in rows], next_cursor=next_cursor)
+
+    def iter_items(self, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[dict]:
+        """All matching catches, newest first, read in keyset chunks."""
+        after = None
+        while True:
+            rows = self._rows(after, chunk_size)
+            for row in rows:
+                yield self._item(row)
+            if len(rows) < chunk_size:
+                return
+            after = (rows[-1]['caught_at'], rows[-1]['id'])
+
+    def _rows(self, after: Optional[Tuple[datetime, int]], limit: int) -> List[dict]:
+        queryset = CatchRecord.objects.filter(player_id=self.player_id)
+        filters = self.filters
+        if filters.fish_id is not None:
+            queryset = queryset.filter(fish_id=filters.fish_id)
+        if filters.location_id is not None:
+            queryset = queryset.filter(location_id=filters.location_id)
+        if filters.since is not None:
+            queryset = queryset.filter(caught_at__gte=filters.since)
+        if filters.until is not None:
+            queryset = queryset.filter(caught_at__lt=filters.until)
+        if after is not None:
+            caught_at, record_id = after
+            # caught_at <= X bounds the index range, the OR breaks ties by id
+            queryset = queryset.filter(caught_at__lte=caught_at).filter(
+                Q(caught_at__lt=caught_at) | Q(id__lt=record_id)
+            )
+        return list(queryset.order_by('-caught_at', '-id').values(*ROW_FIELDS)[:limit])
+
+    @staticmethod
+    def _item(row: dict) -> dict:
+        catalog = get_catalog()
+        fish = catalog.get('fish', row['fish_id'])
+        location = catalog.get('locations', row['location_id'])
+        return {
+            'id': row['id'],
+            'fish_id': row['fish_id'],
+            'fish_name': fish.name if fish else '',
+            'fish_rarity': fish.rarity if fish else '',
+            'location_id': row['location_id'],
+            'location_name': location.name if location else '',
+            'weight': row['weight'],
+            'price': row['price'],
+            'experience': row['experience'],
+            'caught_at': row['caught_at'].isoformat(),
+        }
@@ -7,18 +7,22 @@ from dataclasses import dataclass
 from django.db import transaction
 
 from apps.users.models import User, PlayerProfile
-from apps.fishing.models import Fish, Location, CatchRecord
+from apps.fishing.models import CatchRecord
+from apps.fishing.catalog import FishEntry, LocationEntry
+from core.catalog import get_catalog
+from core.counters import CounterUpdate
 
 
 @dataclass
 class CatchResult:
     """Result of catching a fish."""
-    fish: Fish
+    fish: FishEntry
     weight: float
     price: int
     experience: int
     leveled_up: bool
     new_level: Optional[int] = None
+    record: Optional[CatchRecord] = None
 
 
 class FishingService:
@@ -31,34 +35,52 @@ class FishingService:
     @transaction.atomic
     def record_catch(
         self,
-        fish: Fish,
-        location: Location,
-        weight: float
+        fish: FishEntry,
+        location_id: int,
+        weight: float,
+        save: bool = True
     ) -> CatchResult:
-        """Record a caught fish and update player stats."""
+        """
+        Record a caught fish and update player stats.
+
+        Profile counters are updated with a single atomic UPDATE (no
+        read-modify-write). With save=False nothing is written: the profile
+        changes only in memory and the unsaved record is returned for the
+        caller to persist.
+        """
         price = fish.calculate_price(weight)
         experience = fish.calculate_experience(weight)
 
         # Create catch record
-        CatchRecord.objects.create(
+        record = CatchRecord(
             player=self.user,
-            fish=fish,
-            location=location,
+            fish_id=fish.id,
+            location_id=location_id,
             weight=weight,
             price=price,
             experience=experience
         )
+        if save:
+            record.save()
 
-        # Update profile stats
-        self.profile.money += price
-        self.profile.total_fish_caught += 1
-        self.profile.total_weight_caught += weight
+        # Update profile stats and experience in one UPDATE
+        update = CounterUpdate.for_instance(self.profile)
+        update.add('money', price)
+        update.add('total_fish_caught')
+        update.add('total_weight_caught', weight)
+        update.max('biggest_fish_weight', weight)
+        self.profile.gain_experience(update, experience)
 
-        if weight > self.profile.biggest_fish_weight:
-            self.profile.biggest_fish_weight = weight
+        if save:
+            update.execute()
+        update.apply_to(self.profile)
 
-        # Add experience
-        leveled_up = self.profile.add_experience(experience)
+        # Level from the stored experience, not from this instance
+        if save:
+            level, experience_left, leveled_up = PlayerProfile.settle_level(pk=self.profile.pk)
+            self.profile.level, self.profile.experience = level, experience_left
+        else:
+            leveled_up = self.profile.normalize_level()
 
         return CatchResult(
             fish=fish,
@@ -66,19 +88,18 @@ class FishingService:
             price=price,
             experience=experience,
             leveled_up=leveled_up,
-            new_level=self.profile.level if leveled_up else None
+            new_level=self.profile.level if leveled_up else None,
+            record=record
         )
 
-    def get_available_locations(self) -> list[Location]:
+    def get_available_locations(self) -> list[LocationEntry]:
         """Get locations available for player's level."""
-        return list(
-            Location.objects.filter(
-                is_active=True,
-                required_level__lte=self.profile.level
-            )
-        )
+        return [
+            location for location in get_catalog().all('locations')
+            if self.can_access_location(location)
+        ]
 
-    def can_access_location(self, location: Location) -> bool:
+    def can_access_location(self, location: LocationEntry) -> bool:
         """Check if player can access location."""
         return (
             location.is_active and
@@ -0,0 +1,244 @@
+"""
+Monthly partitioning of CatchRecord (PostgreSQL only, optional).
+
+convert_to_partitioned() turns fishing_catchrecord into a table
+partitioned by RANGE (caught_at) without copying rows:
+
+- the existing table is renamed to fishing_catchrecord_legacy and
+  attached as the partition for everything before next month; its
+  primary key (id) is dropped first - a partition cannot keep a primary
+  key of its own, ATTACH builds the parent's (id, caught_at) on it
+- the new parent gets the same columns, its own sequence continuing the
+  old ids, primary key (id, caught_at), foreign keys and the model indexes
+- a DEFAULT partition catches rows when no monthly partition exists,
+  so inserts never fail if partition maintenance is late
+
+After that create_partitions() adds monthly partitions ahead of time and
+detach_partitions() detaches (optionally drops) partitions older than
+the retention period. Rollups (services/rollups.py) must be built for
+those days first: detached rows are no longer visible to the game.
+
+The Django model is unchanged (the ORM only needs `id` to be unique,
+which the sequence guarantees). On other databases every function is
+a no-op reported by is_supported().
+"""
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.fishing.models import CatchRecord
+
+logger = logging.getLogger(__name__)
+
+TABLE = CatchRecord._meta.db_table
+LEGACY_TABLE = f'{TABLE}_legacy'
+DEFAULT_PARTITION = f'{TABLE}_default'
+SEQUENCE = f'{TABLE}_part_id_seq'
+
+_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+
+@dataclass(frozen=True)
+class Partition:
+    """Attached partition and its upper bound (None - DEFAULT or MAXVALUE)."""
+    name: str
+    upper: Optional[datetime]
+
+
+def is_supported() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned() -> bool:
+    """Whether CatchRecord is already a partitioned table."""
+    if not is_supported():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            [TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def month_start(moment: datetime, offset: int = 0) -> datetime:
+    """First instant of the month `offset` months from moment's month (current time zone)."""
+    moment = timezone.localtime(moment)
+    index = moment.year * 12 + moment.month - 1 + offset
+    return timezone.make_aware(datetime(index // 12, index % 12 + 1, 1))
+
+
+def partition_name(start: datetime) -> str:
+    return f'{TABLE}_p{start:%Y_%m}'
+
+
+def list_partitions() -> List[Partition]:
+    """Attached partitions ordered by upper bound."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            """,
+            [TABLE]
+        )
+        rows = cursor.fetchall()
+    partitions = []
+    for name, bound in rows:
+        match = _UPPER_BOUND.search(bound)
+        upper = parse_datetime(match.group(1)) if match else None
+        partitions.append(Partition(name=name, upper=upper))
+    return sorted(partitions, key=lambda p: (p.upper is None, p.upper or datetime.min))
+
+
+def _execute(statements: List[str]) -> None:
+    with connection.cursor() as cursor:
+        for sql in statements:
+            logger.info(sql)
+            cursor.execute(sql)
+
+
+def _literal(moment: datetime) -> str:
+    return f"'{moment.isoformat()}'"
+
+
+@transaction.atomic
+def convert_to_partitioned(now: Optional[datetime] = None) -> None:
+    """
+    One-time conversion of CatchRecord into a partitioned table.
+
+    Takes an ACCESS EXCLUSIVE lock on the table and validates the legacy
+    partition bound with a full scan - run in a maintenance window.
+    """
+    if is_partitioned():
+        return
+    boundary = month_start(now or timezone.now(), 1)
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p'",
+            [TABLE]
+        )
+        primary_keys = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s", [TABLE])
+        # The primary key index goes away with its constraint
+        old_indexes = [row[0] for row in cursor.fetchall() if row[0] not in primary_keys]
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {quote(TABLE)}")
+        max_id = cursor.fetchone()[0]
+
+    statements = [f"ALTER TABLE {quote(TABLE)} RENAME TO {quote(LEGACY_TABLE)}"]
+    # A partition cannot have a primary key besides the parent's (id, caught_at)
+    statements += [
+        f"ALTER TABLE {quote(LEGACY_TABLE)} DROP CONSTRAINT {quote(name)}"
+        for name in primary_keys
+    ]
+    statements += [
+        # Ids continue from the parent's own sequence; a partition cannot
+        # keep an identity column of its own
+        f"ALTER TABLE {quote(LEGACY_TABLE)} ALTER COLUMN id DROP IDENTITY IF EXISTS",
+        f"ALTER TABLE {quote(LEGACY_TABLE)} ALTER COLUMN id DROP DEFAULT",
+    ]
+    # Index names are global: free them for the new parent
+    statements += [
+        f"ALTER INDEX {quote(name)} RENAME TO {quote(f'{name[:52]}_legacy')}"
+        for name in old_indexes
+    ]
+    statements += [
+        f"CREATE TABLE {quote(TABLE)} (LIKE {quote(LEGACY_TABLE)} INCLUDING DEFAULTS INCLUDING STORAGE)"
+        f" PARTITION BY RANGE (caught_at)",
+        f"CREATE SEQUENCE {quote(SEQUENCE)} OWNED BY {quote(TABLE)}.id START WITH {max_id + 1}",
+        f"ALTER TABLE {quote(TABLE)} ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE}')",
+        f"ALTER TABLE {quote(TABLE)} ADD PRIMARY KEY (id, caught_at)",
+    ]
+    for field in CatchRecord._meta.concrete_fields:
+        if field.remote_field is None:
+            continue
+        target = field.remote_field.model._meta
+        statements.append(
+            f"ALTER TABLE {quote(TABLE)} ADD FOREIGN KEY ({quote(field.column)})"
+            f" REFERENCES {quote(target.db_table)} ({quote(target.pk.column)})"
+            f" DEFERRABLE INITIALLY DEFERRED"
+        )
+    _execute(statements)
+
+    # Indexes of the parent (FK indexes and Meta.indexes) cascade to partitions
+    with connection.schema_editor() as editor:
+        for field in CatchRecord._meta.concrete_fields:
+            if field.db_index and not field.primary_key:
+                editor.execute(editor._create_index_sql(CatchRecord, fields=[field]))
+        for index in CatchRecord._meta.indexes:
+            editor.add_index(CatchRecord, index)
+
+    _execute([
+        f"ALTER TABLE {quote(TABLE)} ATTACH PARTITION {quote(LEGACY_TABLE)}"
+        f" FOR VALUES FROM (MINVALUE) TO ({_literal(boundary)})",
+        f"CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {quote(TABLE)} DEFAULT",
+    ])
+
+
+def create_partitions(months_ahead: int, now: Optional[datetime] = None) -> List[str]:
+    """
+    Create monthly partitions from the current month up to months_ahead months.
+
+    Months already covered (including by the legacy partition) are skipped.
+    Rows of a new month already in the DEFAULT partition make PostgreSQL
+    reject that partition - create partitions ahead of time.
+
+    Returns:
+        Names of created partitions
+    """
+    if not is_partitioned():
+        return []
+    now = now or timezone.now()
+    covered_until = max((p.upper for p in list_partitions() if p.upper), default=None)
+    quote = connection.ops.quote_name
+    created = []
+    for offset in range(months_ahead + 1):
+        start, end = month_start(now, offset), month_start(now, offset + 1)
+        if covered_until is not None and end <= covered_until:
+            continue
+        name = partition_name(start)
+        _execute([
+            f"CREATE TABLE {quote(name)} PARTITION OF {quote(TABLE)}"
+            f" FOR VALUES FROM ({_literal(start)}) TO ({_literal(end)})"
+        ])
+        created.append(name)
+    return created
+
+
+def detach_partitions(
+    retention_months: int,
+    drop: bool = False,
+    now: Optional[datetime] = None
+) -> List[str]:
+    """
+    Detach partitions whose whole range is older than retention_months.
+
+    Detached tables stay in the database as archives unless drop=True.
+
+    Returns:
+        Names of detached partitions
+    """
+    if not is_partitioned():
+        return []
+    cutoff = month_start(now or timezone.now(), -retention_months)
+    quote = connection.ops.quote_name
+    detached = []
+    for partition in list_partitions():
+        if partition.upper is None or partition.upper > cutoff:
+            continue
+        statements = [f"ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(partition.name)}"]
+        if drop:
+            statements.append(f"DROP TABLE {quote(partition.name)}")
+        with transaction.atomic():
+            _execute(statements)
+        detached.append(partition.name)
+    return detached
@@ -0,0 +1,95 @@
+"""
+Daily catch rollups.
+
+CatchDailyRollup holds per-day totals for each (player, fish, location).
+A day is rebuilt from its raw CatchRecord rows in one transaction
+(delete + insert), so rebuilding is idempotent and can run repeatedly
+for the current day. The day range is a caught_at range scan, which on
+a partitioned table touches only the month's partition.
+
+Days are calendar days in TIME_ZONE.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Max, QuerySet, Sum
+from django.utils import timezone
+
+from apps.fishing.models import CatchDailyRollup, CatchRecord
+
+
+def day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """[start, end) of a calendar day in the current time zone."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    return start, end
+
+
+@transaction.atomic
+def rollup_day(day: date) -> int:
+    """
+    Rebuild the rollups of one day from CatchRecord.
+
+    Returns:
+        Number of rollup rows written
+    """
+    start, end = day_bounds(day)
+    rows = (
+        CatchRecord.objects
+        .filter(caught_at__gte=start, caught_at__lt=end)
+        .order_by()
+        .values('player_id', 'fish_id', 'location_id')
+        .annotate(
+            catch_count=Count('id'),
+            total_weight=Sum('weight'),
+            max_weight=Max('weight'),
+            total_price=Sum('price'),
+            total_experience=Sum('experience'),
+        )
+    )
+    rollups = [CatchDailyRollup(day=day, **row) for row in rows]
+    CatchDailyRollup.objects.filter(day=day).delete()
+    CatchDailyRollup.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
+
+
+def rollup_days(since: date, until: date) -> int:
+    """Rebuild every day in [since, until]; one transaction per day."""
+    total = 0
+    day = since
+    while day <= until:
+        total += rollup_day(day)
+        day += timedelta(days=1)
+    return total
+
+
+def player_totals(
+    since: date,
+    until: date,
+    fish_id: Optional[int] = None,
+    location_id: Optional[int] = None
+) -> QuerySet:
+    """
+    Per-player totals for days [since, until] from the rollups.
+
+    Rows: player_id, catch_count, total_weight, max_weight, total_price,
+    total_experience - e.g. `.order_by('-total_weight')[:10]` for a
+    leaderboard.
+    """
+    queryset = CatchDailyRollup.objects.filter(day__gte=since, day__lte=until)
+    if fish_id is not None:
+        queryset = queryset.filter(fish_id=fish_id)
+    if location_id is not None:
+        queryset = queryset.filter(location_id=location_id)
+    return (
+        queryset.order_by()
+        .values('player_id')
+        .annotate(
+            catch_count=Sum('catch_count'),
+            total_weight=Sum('total_weight'),
+            max_weight=Max('max_weight'),
+            total_price=Sum('total_price'),
+            total_experience=Sum('total_experience'),
+        )
+    )
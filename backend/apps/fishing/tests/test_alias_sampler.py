@@ -0,0 +1,114 @@
+"""
+AliasSampler и выбор рыбы из BiteTable.
+
+Распределение alias-сэмплера сравнивается с ожидаемыми вероятностями
+поклёвки (критерий согласия хи-квадрат) и с прежним линейным проходом
+по накопленным вероятностям (двухвыборочный критерий однородности).
+"""
+import math
+import random
+
+import pytest
+
+from apps.fishing.catalog import FishEntry
+from apps.fishing.models import Fish
+from apps.fishing.services.alias_sampler import AliasSampler
+from apps.fishing.services.bite_table import BiteEntry, BiteTable
+
+DRAWS = 50000
+ALPHA = 0.001
+
+# Условный набор рыбы: разные редкости, перекрывающиеся глубины и часы (без БД)
+FISH = [
+    Fish(pk=1, name='Карась', rarity='common', depth_min=0.5, depth_max=3,
+         active_from=0, active_until=24, strength=20, aggressiveness=15),
+    Fish(pk=2, name='Окунь', rarity='common', depth_min=1, depth_max=5,
+         active_from=5, active_until=21, strength=35, aggressiveness=45),
+    Fish(pk=3, name='Лещ', rarity='uncommon', depth_min=2, depth_max=8,
+         active_from=0, active_until=24, strength=40, aggressiveness=25),
+    Fish(pk=4, name='Щука', rarity='rare', depth_min=1, depth_max=6,
+         active_from=6, active_until=22, strength=70, aggressiveness=80),
+    Fish(pk=5, name='Сом', rarity='epic', depth_min=4, depth_max=15,
+         active_from=20, active_until=6, strength=90, aggressiveness=60),
+    Fish(pk=6, name='Осётр', rarity='legendary', depth_min=6, depth_max=20,
+         active_from=0, active_until=24, strength=95, aggressiveness=70),
+]
+ATTRACTION = {1: 80, 2: 20, 3: 60, 4: 20, 5: 40, 6: 20}
+
+# (глубина, час) - контексты поклёвки
+CONTEXTS = [(2.5, 12), (4.5, 12), (5.0, 23), (7.0, 3), (12.0, 12)]
+
+
+def linear_choice(items, weights, total, rng):
+    """Прежний выбор: линейный проход по накопленным вероятностям."""
+    r = rng.uniform(0, total)
+    cumulative = 0
+    for item, weight in zip(items, weights):
+        cumulative += weight
+        if r < cumulative:
+            return item
+    return items[-1]
+
+
+def chi2_sf(x: float, dof: int) -> float:
+    """P(X > x) для хи-квадрат (аппроксимация Уилсона-Хилферти)."""
+    if dof <= 0:
+        return 1.0
+    z = ((x / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def chi2_expected(counts, probabilities, draws) -> float:
+    """Критерий согласия с ожидаемыми вероятностями (p-value)."""
+    stat = sum((c - p * draws) ** 2 / (p * draws) for c, p in zip(counts, probabilities))
+    return chi2_sf(stat, len(counts) - 1)
+
+
+def chi2_two_sample(a, b) -> float:
+    """Двухвыборочный критерий однородности, выборки равного размера (p-value)."""
+    stat = sum((x - y) ** 2 / (x + y) for x, y in zip(a, b) if x + y)
+    return chi2_sf(stat, len(a) - 1)
+
+
+@pytest.fixture(scope='module')
+def table():
+    return BiteTable([
+        BiteEntry(FishEntry.from_model(fish), ATTRACTION[fish.pk]) for fish in FISH
+    ])
+
+
+def test_single_item():
+    assert AliasSampler(['a'], [0.3]).sample() == 'a'
+
+
+def test_zero_weight_is_never_drawn():
+    sampler = AliasSampler(['a', 'b'], [0, 1])
+    rng = random.Random(1)
+    assert all(sampler.sample(rng) == 'b' for _ in range(1000))
+
+
+@pytest.mark.parametrize('items, weights', [([], []), (['a'], [1, 2]), (['a', 'b'], [0, 0])])
+def test_invalid_weights(items, weights):
+    with pytest.raises(ValueError):
+        AliasSampler(items, weights)
+
+
+@pytest.mark.parametrize('depth, hour', CONTEXTS)
+def test_distribution_matches_bite_probabilities(table, depth, hour):
+    sampler = table.sampler(depth, hour)
+    assert sampler is not None
+
+    entries = sampler.items
+    weights = [entry.probability(depth) for entry in entries]
+    total = sum(weights)
+    index = {id(entry): i for i, entry in enumerate(entries)}
+
+    rng = random.Random(depth * 100 + hour)
+    alias_counts = [0] * len(entries)
+    linear_counts = [0] * len(entries)
+    for _ in range(DRAWS):
+        alias_counts[index[id(sampler.sample(rng))]] += 1
+        linear_counts[index[id(linear_choice(entries, weights, total, rng))]] += 1
+
+    assert chi2_expected(alias_counts, [w / total for w in weights], DRAWS) > ALPHA
+    assert chi2_two_sample(alias_counts, linear_counts) > ALPHA
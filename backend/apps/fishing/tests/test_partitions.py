@@ -0,0 +1,166 @@
+"""
+CatchRecord partitions (PostgreSQL only) and daily rollups (any database).
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from apps.fishing.models import CatchDailyRollup, CatchRecord, Fish, Location
+from apps.fishing.services import partitions
+from apps.fishing.services.rollups import player_totals, rollup_day
+from apps.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+postgresql = pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='CatchRecord partitioning requires PostgreSQL'
+)
+
+NOW = timezone.make_aware(datetime(2026, 5, 15, 12, 0))
+
+
+@pytest.fixture
+def player():
+    return User.objects.create_user(username='angler', email='angler@test.test', password='x')
+
+
+@pytest.fixture
+def fish():
+    return Fish.objects.create(
+        name='Окунь', description='', min_weight=0.1, max_weight=2, base_price=10,
+        strength=35, stamina=40, aggressiveness=45, depth_min=1, depth_max=5
+    )
+
+
+@pytest.fixture
+def location():
+    return Location.objects.create(name='Озеро', description='', max_depth=10)
+
+
+@pytest.fixture
+def add_catch(player, fish, location):
+    def add(caught_at, weight=1.0, **kwargs):
+        values = dict(player=player, fish=fish, location=location, weight=weight, price=10, experience=5)
+        values.update(kwargs)
+        return CatchRecord.objects.create(caught_at=caught_at, **values)
+    return add
+
+
+def table_exists(name: str) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s)', [name])
+        return cursor.fetchone()[0] is not None
+
+
+def primary_keys(table: str) -> list:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_get_constraintdef(oid) FROM pg_constraint"
+            " WHERE conrelid = to_regclass(%s) AND contype = 'p'",
+            [table]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+# --- Партиции ------------------------------------------------------------
+
+@postgresql
+def test_convert_keeps_rows_and_ids(add_catch):
+    old = [add_catch(NOW - timedelta(days=days)) for days in (0, 40, 400)]
+
+    partitions.convert_to_partitioned(now=NOW)
+
+    assert partitions.is_partitioned()
+    assert primary_keys(partitions.TABLE) == ['PRIMARY KEY (id, caught_at)']
+    # Прежний ключ (id) удалён, у партиции - ключ родителя
+    assert primary_keys(partitions.LEGACY_TABLE) == ['PRIMARY KEY (id, caught_at)']
+    names = [p.name for p in partitions.list_partitions()]
+    assert names == [partitions.LEGACY_TABLE, partitions.DEFAULT_PARTITION]
+
+    assert sorted(CatchRecord.objects.values_list('id', flat=True)) == sorted(c.pk for c in old)
+    new = add_catch(NOW + timedelta(days=30))
+    assert new.pk > max(c.pk for c in old)
+
+    # Повторная конвертация ничего не делает
+    partitions.convert_to_partitioned(now=NOW)
+    assert partitions.is_partitioned()
+
+
+@postgresql
+def test_create_partitions_ahead(add_catch):
+    partitions.convert_to_partitioned(now=NOW)
+
+    created = partitions.create_partitions(2, now=NOW)
+    # Текущий месяц покрыт старой таблицей
+    assert created == [f'{partitions.TABLE}_p2026_06', f'{partitions.TABLE}_p2026_07']
+    assert partitions.create_partitions(2, now=NOW) == []
+
+    catch = add_catch(timezone.make_aware(datetime(2026, 6, 10)))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT tableoid::regclass::text FROM {partitions.TABLE} WHERE id = %s', [catch.pk]
+        )
+        assert cursor.fetchone()[0] == f'{partitions.TABLE}_p2026_06'
+
+
+@postgresql
+@pytest.mark.parametrize('drop', [False, True])
+def test_detach_after_retention(add_catch, drop):
+    add_catch(NOW - timedelta(days=40))
+    partitions.convert_to_partitioned(now=NOW)
+    partitions.create_partitions(1, now=NOW)
+    recent = add_catch(timezone.make_aware(datetime(2026, 6, 10)))
+
+    # Через 24 месяца после июня 2026 старая таблица и июнь уже вне хранения
+    later = timezone.make_aware(datetime(2028, 7, 15))
+    assert partitions.detach_partitions(24, drop=drop, now=NOW) == []
+    detached = partitions.detach_partitions(24, drop=drop, now=later)
+
+    assert detached == [partitions.LEGACY_TABLE, f'{partitions.TABLE}_p2026_06']
+    assert not CatchRecord.objects.filter(pk=recent.pk).exists()
+    assert table_exists(partitions.LEGACY_TABLE) is not drop
+    assert [p.name for p in partitions.list_partitions()] == [partitions.DEFAULT_PARTITION]
+
+
+def test_partitioning_is_skipped_without_postgresql():
+    if partitions.is_supported():
+        pytest.skip('PostgreSQL')
+    assert not partitions.is_partitioned()
+    assert partitions.create_partitions(3) == []
+    assert partitions.detach_partitions(24) == []
+
+
+# --- Итоги по дням -------------------------------------------------------
+
+def test_rollup_day(add_catch, player, fish, location):
+    day = timezone.localdate(NOW)
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    add_catch(start, weight=1.0)
+    add_catch(start + timedelta(hours=23, minutes=59), weight=2.5)
+    add_catch(start + timedelta(days=1), weight=9.0)  # Следующий день
+
+    assert rollup_day(day) == 1
+    rollup = CatchDailyRollup.objects.get(day=day)
+    assert (rollup.player_id, rollup.fish_id, rollup.location_id) == (player.pk, fish.pk, location.pk)
+    assert (rollup.catch_count, rollup.total_weight, rollup.max_weight) == (2, 3.5, 2.5)
+    assert (rollup.total_price, rollup.total_experience) == (20, 10)
+
+    # Пересчёт дня идемпотентен и учитывает новые уловы
+    add_catch(start + timedelta(hours=12), weight=0.5)
+    assert rollup_day(day) == 1
+    assert CatchDailyRollup.objects.get(day=day).catch_count == 3
+
+
+def test_player_totals(add_catch, player, fish):
+    days = [date(2026, 5, 1), date(2026, 5, 2), date(2026, 5, 3)]
+    for day, weight in zip(days, (1.0, 4.0, 2.0)):
+        add_catch(timezone.make_aware(datetime.combine(day, datetime.min.time())) + timedelta(hours=10), weight)
+        rollup_day(day)
+
+    totals = player_totals(days[0], days[1]).get()
+    assert totals['player_id'] == player.pk
+    assert (totals['catch_count'], totals['total_weight'], totals['max_weight']) == (2, 5.0, 4.0)
+    assert player_totals(days[0], days[2], fish_id=fish.pk).get()['catch_count'] == 3
+    assert not player_totals(days[0], days[2], fish_id=fish.pk + 1).exists()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import GameSession
+from .models import GameSession, PendingWrite
 
 
 @admin.register(GameSession)
@@ -11,3 +11,10 @@ class GameSessionAdmin(admin.ModelAdmin):
     list_filter = ['state', 'location']
     search_fields = ['player__username']
     readonly_fields = ['created_at', 'updated_at', 'fight_start_time']
+
+
+@admin.register(PendingWrite)
+class PendingWriteAdmin(admin.ModelAdmin):
+    list_display = ['id', 'player', 'created_at']
+    search_fields = ['player__username']
+    readonly_fields = ['player', 'payload', 'created_at']
@@ -2,16 +2,26 @@
 WebSocket consumers для игровой сессии.
 Обрабатывает real-time взаимодействие с клиентом.
 """
-import json
 import asyncio
+import logging
+from urllib.parse import parse_qs
 from typing import Optional
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
 
+from core import json_codec
+from core.catalog import get_catalog
 from apps.game.models import GameState
+from apps.game.protocol import BINARY_SUBPROTOCOL, FightStream
 from apps.game.services.game_session import GameSessionService
-from apps.game.services.fight_engine import PlayerAction
+from apps.game.services.player_context import PlayerContext
+from apps.game.services.fight_engine import FightEngine, FightResult, PlayerAction
+from apps.game.services.tick_scheduler import FightTick, get_tick_scheduler
+from apps.game.services.timer_queue import get_timer_queue
+from apps.game.services.update_rate import AdaptiveUpdateRate
+from apps.game.services.write_behind import get_write_behind_queue
 from apps.game.use_cases.cast_line import CastLineUseCase, CastLineInput
 from apps.game.use_cases.handle_bite import HandleBiteUseCase, HandleBiteInput
 from apps.game.use_cases.fight_fish import (
@@ -21,6 +31,8 @@ from apps.game.use_cases.fight_fish import (
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
 
 class GameConsumer(AsyncJsonWebsocketConsumer):
     """
@@ -34,6 +46,7 @@ class GameConsumer(AsyncJsonWebsocketConsumer):
         {"type": "reel", "speed": 0.5}
         {"type": "release"}
         {"type": "set_drag", "level": 0.7}
+        {"type": "keyframe"}  # Запросить полный кадр fight_update (дельта-режим)
 
     Server -> Client:
         {"type": "joined", "session": {...}}
@@ -44,13 +57,52 @@ class GameConsumer(AsyncJsonWebsocketConsumer):
         {"type": "fight_update", "state": {...}}
         {"type": "catch", "result": {...}}
         {"type": "error", "message": "..."}
+
+    Во время вываживания FightEngine живёт в памяти consumer'а:
+    БД пишется только при подсечке, при завершении боя и
+    в периодических чекпоинтах (GAME_FIGHT_CHECKPOINT_INTERVAL).
+    Тики всех боёв процесса выполняет общий TickScheduler.
+
+    Поклёвка не опрашивается: после заброса consumer ставит таймер
+    в общую TimerQueue ровно на next_bite_check_time, а после поклёвки -
+    на истечение времени подсечки.
+
+    Бинарный протокол: клиент, запросивший подпротокол BINARY_SUBPROTOCOL,
+    получает fight_update упакованными кадрами (apps/game/protocol.py),
+    остальные сообщения - JSON. Без подпротокола всё остаётся JSON.
+    Параметр подключения delta=1 включает дельта-кодирование fight_update
+    (keyframe=N - полный кадр раз в N тиков), см. FightStream.
+
+    Симуляция идёт с фиксированным шагом, а fight_update отправляется
+    с адаптивной частотой (AdaptiveUpdateRate, GAME_FIGHT_SEND_RATES):
+    реже в спокойных фазах, на каждом шаге при рывке и высоком натяжении.
+
+    Пользователь с профилем, статистикой и экипировкой загружается
+    одним запросом в JWTAuthMiddleware; игровые сервисы создаются один
+    раз на соединение (PlayerContext) и переиспользуются всеми сообщениями.
     """
 
+    # Запас к таймауту подсечки, чтобы проверка гарантированно увидела его истечение
+    BITE_TIMEOUT_SLACK = 0.05
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.user: Optional[User] = None
-        self.game_loop_task: Optional[asyncio.Task] = None
+        self.player: Optional[PlayerContext] = None
+        self.joined = False
+        self.binary = False
+        self.fight_stream: Optional[FightStream] = None
+        self.update_rate = AdaptiveUpdateRate(
+            tick=settings.GAME_FIGHT_TICK,
+            rates=settings.GAME_FIGHT_SEND_RATES,
+            urgent_tension=settings.GAME_FIGHT_URGENT_TENSION
+        )
+        # Запись результата боя в БД: не отменяется, а дожидается
+        self.finish_task: Optional[asyncio.Task] = None
         self.is_fighting = False
+        self.fight_engine: Optional[FightEngine] = None
+        self.checkpoint_task: Optional[asyncio.Task] = None
+        self.last_checkpoint_time = 0.0
 
     async def connect(self):
         """Подключение клиента."""
@@ -60,33 +112,95 @@ class GameConsumer(AsyncJsonWebsocketConsumer):
             await self.close(code=4001)
             return
 
+        # Снасти дополняются из справочника и ContentType: в свежем процессе
+        # это первые запросы к БД, их нельзя делать из event loop
+        self.player = await database_sync_to_async(PlayerContext)(self.user)
+
         # Закрываем старую сессию если она есть (предотвращаем множественные подключения)
         await self._close_old_sessions()
 
-        await self.accept()
+        # Согласование протокола: бинарный fight_update только по запросу клиента
+        self.binary = BINARY_SUBPROTOCOL in self.scope.get('subprotocols', [])
+        await self.accept(subprotocol=BINARY_SUBPROTOCOL if self.binary else None)
+        self.fight_stream = self._create_fight_stream()
         await self.send_json({
             'type': 'connected',
-            'message': 'Подключено к игровому серверу'
+            'message': 'Подключено к игровому серверу',
+            'protocol': 'binary' if self.binary else 'json',
+            'delta': self.fight_stream.delta
         })
 
+    def _create_fight_stream(self) -> FightStream:
+        """Настройки потока fight_update из query string (delta, keyframe)."""
+        params = parse_qs(self.scope.get('query_string', b'').decode('utf-8'))
+        try:
+            keyframe = int(params.get('keyframe', [settings.GAME_FIGHT_KEYFRAME_INTERVAL])[0])
+        except ValueError:
+            keyframe = settings.GAME_FIGHT_KEYFRAME_INTERVAL
+        return FightStream(
+            binary=self.binary,
+            delta=params.get('delta', ['0'])[0] in ('1', 'true'),
+            keyframe_interval=keyframe
+        )
+
     async def disconnect(self, close_code):
         """Отключение клиента."""
-        # Останавливаем игровой цикл
-        await self._cancel_game_loop()
+        # Останавливаем вываживание и таймеры, дожидаемся записи итогов боя
+        self._stop_fight()
+        self._cancel_timers()
+        await self._wait_checkpoint()
+        await self._wait_finish()
 
         # Закрываем сессию
-        if self.user:
+        if self.player:
             await self._close_session()
 
-    async def _cancel_game_loop(self):
-        """Отменить текущую задачу игрового цикла."""
-        if self.game_loop_task:
-            self.game_loop_task.cancel()
+        stats = self.update_rate.stats
+        if stats.frames_sent:
+            logger.debug(
+                'fight_update %s: отправлено %d кадров (%d байт), пропущено %d',
+                self.channel_name, stats.frames_sent, stats.bytes_sent, stats.frames_skipped
+            )
+
+    async def _wait_finish(self):
+        """
+        Дождаться завершения прошлого боя.
+
+        Задачу нельзя отменять: запись в БД всё равно закончится в потоке,
+        а сообщение catch и планирование сброса журнала потеряются.
+        """
+        if self.finish_task:
             try:
-                await self.game_loop_task
-            except asyncio.CancelledError:
-                pass
-            self.game_loop_task = None
+                await self.finish_task
+            except Exception:
+                logger.exception('Ошибка завершения боя')
+            self.finish_task = None
+
+    async def _wait_checkpoint(self):
+        """
+        Дождаться чекпоинта боя, запущенного на одном из последних тиков.
+
+        Иначе он может записать поля боя поверх сессии, уже сброшенной
+        complete_catch() или закрытой при отключении.
+        """
+        if self.checkpoint_task:
+            try:
+                await self.checkpoint_task
+            except Exception:
+                logger.exception('Ошибка чекпоинта боя')
+            self.checkpoint_task = None
+
+    def _cancel_timers(self):
+        """Отменить таймеры поклёвки consumer'а."""
+        get_timer_queue().cancel(self.channel_name)
+
+    @classmethod
+    async def decode_json(cls, text_data):
+        return json_codec.loads(text_data)
+
+    @classmethod
+    async def encode_json(cls, content):
+        return json_codec.dumps(content)
 
     async def receive_json(self, content):
         """Обработка входящих сообщений."""
@@ -100,6 +214,7 @@ class GameConsumer(AsyncJsonWebsocketConsumer):
             'release': self._handle_release,
             'set_drag': self._handle_set_drag,
             'hold': self._handle_hold,
+            'keyframe': self._handle_keyframe,
         }
 
         handler = handlers.get(msg_type)
@@ -143,9 +258,12 @@ class GameConsumer(AsyncJsonWebsocketConsumer):
         power = data.get('power', 0.5)
         angle = data.get('angle', 45)
 
+        # Итоги прошлого боя должны быть записаны до нового заброса
+        await self._wait_finish()
+
         use_case = CastLineUseCase()
         result = await database_sync_to_async(use_case.execute)(
-            CastLineInput(user=self.user, power=power, angle=angle)
+            CastLineInput(user=self.user, power=power, angle=angle, service=self.player.game)
         )
 
         if result.success:
@@ -154,9 +272,8 @@ class GameConsumer(AsyncJsonWebsocketConsumer):
                 'distance': result.data.distance,
                 'depth': result.data.depth
             })
-            # Запускаем цикл ожидания поклёвки
-            await self._cancel_game_loop()
-            self.game_loop_task = asyncio.create_task(self._bite_loop())
+            # Планируем проверку поклёвки
+            self._schedule_bite_check(result.data.bite_check_in)
         else:
             await self.send_json({
                 'type': 'error',
@@ -167,19 +284,32 @@ class GameConsumer(AsyncJsonWebsocketConsumer):
         """Подсечка."""
         use_case = StartFightUseCase()
         result = await database_sync_to_async(use_case.execute)(
-            StartFightInput(user=self.user)
+            StartFightInput(user=self.user, service=self.player.game)
         )
 
         if result.success:
+            self.fight_engine = await self._load_fight_engine()
+            if not self.fight_engine:
+                await self.send_json({
+                    'type': 'error',
+                    'message': 'Не удалось начать вываживание'
+                })
+                return
+
             self.is_fighting = True
+            self.fight_stream.request_keyframe()
+            self.update_rate.reset()
             await self.send_json({
                 'type': 'fight_started',
                 'fish': result.data.fish_name,
                 'weight': result.data.weight
             })
-            # Запускаем цикл вываживания
-            await self._cancel_game_loop()
-            self.game_loop_task = asyncio.create_task(self._fight_loop())
+            # Передаём бой общему планировщику тиков
+            self._cancel_timers()
+            self.last_checkpoint_time = asyncio.get_running_loop().time()
+            get_tick_scheduler().register(
+                self.channel_name, self.fight_engine, self._on_fight_tick
+            )
         else:
             await self.send_json({
                 'type': 'error',
@@ -204,174 +334,190 @@ class GameConsumer(AsyncJsonWebsocketConsumer):
         """Удержание."""
         await self._process_fight_action('hold', 0)
 
+    async def _handle_keyframe(self, data):
+        """Клиент потерял кадр - следующий fight_update будет полным."""
+        self.fight_stream.request_keyframe()
+
     async def _process_fight_action(self, action: str, value: float):
-        """Обработать действие при вываживании."""
-        if not self.is_fighting:
+        """
+        Обработать действие при вываживании.
+
+        Действие попадает в буфер ввода боя и применяется планировщиком
+        в начале следующего шага: частые reel сливаются, от drag
+        остаётся последнее значение. Ввод, пришедший между завершением
+        боя планировщиком и _finish_fight(), молча отбрасывается.
+        """
+        if not self.is_fighting or not self.fight_engine:
             return
 
         use_case = FightFishUseCase()
-        result = await database_sync_to_async(use_case.execute)(
-            FightFishInput(user=self.user, action=action, value=value)
+        result = use_case.execute(
+            FightFishInput(
+                user=self.user,
+                action=action,
+                value=value,
+                fight_key=self.channel_name
+            )
         )
 
         if not result.success:
-            # Игнорируем ошибку "Нет активного вываживания" - бой уже закончен
-            if 'Нет активного вываживания' in result.error:
-                return
-
             await self.send_json({
                 'type': 'error',
                 'message': result.error
             })
+
+    def _schedule_bite_check(self, delay: Optional[float]):
+        """Поставить таймер проверки поклёвки (None - проверять нечего)."""
+        if delay is None:
+            self._cancel_timers()
             return
+        get_timer_queue().call_later(self.channel_name, delay, self._resolve_bite)
 
-        # ВАЖНО: Проверяем завершение боя в результате действия
-        if result.data.finished and result.data.result:
-            self.is_fighting = False
+    async def _resolve_bite(self):
+        """Таймер next_bite_check_time: рассчитать поклёвку."""
+        use_case = HandleBiteUseCase()
+        result = await database_sync_to_async(use_case.execute)(
+            HandleBiteInput(user=self.user, service=self.player.game)
+        )
+        if not result.success:
+            return
 
-            # Отправляем результат клиенту
+        if result.data.has_bite:
             await self.send_json({
-                'type': 'catch',
-                'result': result.data.result
+                'type': 'bite',
+                'fish': result.data.fish_name,
+                'intensity': result.data.intensity
+            })
+            # Ждём подсечку
+            get_timer_queue().call_later(
+                self.channel_name,
+                GameSessionService.BITE_TIMEOUT + self.BITE_TIMEOUT_SLACK,
+                self._resolve_bite_timeout
+            )
+        else:
+            self._schedule_bite_check(result.data.next_check_in)
+
+    async def _resolve_bite_timeout(self):
+        """Таймер подсечки: если игрок не подсёк - рыба уходит."""
+        if not await self._check_bite_timeout():
+            return
+
+        await self.send_json({
+            'type': 'bite_timeout',
+            'message': 'Рыба ушла! Слишком долго тянули с подсечкой'
+        })
+        self._schedule_bite_check(GameSessionService.BITE_RETRY_DELAY)
+
+    async def _on_fight_tick(self, tick: FightTick):
+        """Обработать кадр планировщика: отправить состояние или результат боя."""
+        if not self.is_fighting:
+            return
+
+        if tick.error:
+            self._stop_fight()
+            await self.send_json({
+                'type': 'error',
+                'message': f'Ошибка вываживания: {str(tick.error)}'
             })
+            return
 
-            # Останавливаем цикл вываживания
-            if self.game_loop_task:
-                self.game_loop_task.cancel()
+        if tick.result:
+            # Запись результата в БД не должна задерживать кадр планировщика
+            self.finish_task = asyncio.create_task(self._finish_fight(tick.result))
+            return
 
-    async def _bite_loop(self):
-        """Цикл ожидания поклёвки."""
-        try:
-            use_case = HandleBiteUseCase()
-
-            while True:
-                await asyncio.sleep(1)  # Проверка каждую секунду
-
-                result = await database_sync_to_async(use_case.execute)(
-                    HandleBiteInput(user=self.user)
-                )
-
-                if result.success and result.data.has_bite:
-                    await self.send_json({
-                        'type': 'bite',
-                        'fish': result.data.fish_name,
-                        'intensity': result.data.intensity
-                    })
-                    # Запускаем таймер таймаута поклевки
-                    await self._cancel_game_loop()
-                    self.game_loop_task = asyncio.create_task(self._bite_timeout_check())
-                    return  # Выходим из цикла, ждём подсечку
-
-        except asyncio.CancelledError:
-            pass
-
-    async def _bite_timeout_check(self):
-        """Проверка таймаута поклевки (работает после отправки bite сообщения)."""
-        try:
-            await asyncio.sleep(8)  # Ждем 8 секунд
+        if self.update_rate.should_send(tick.state, tick.steps):
+            await self._send_fight_update(tick)
 
-            # Проверяем не подсек ли игрок за это время
-            timeout_result = await self._check_bite_timeout()
-            if timeout_result:
-                # Рыба ушла - уведомляем клиента
-                await self.send_json({
-                    'type': 'bite_timeout',
-                    'message': 'Рыба ушла! Слишком долго тянули с подсечкой'
-                })
-                # Перезапускаем цикл ожидания поклевки
-                await self._cancel_game_loop()
-                self.game_loop_task = asyncio.create_task(self._bite_loop())
+        self._maybe_checkpoint()
 
-        except asyncio.CancelledError:
-            pass
+    async def _send_fight_update(self, tick: FightTick):
+        """Отправить состояние боя в формате соединения и учесть трафик."""
+        frame = self.fight_stream.encode(tick.state)
+        if frame is None:
+            return
+        if isinstance(frame, bytes):
+            await self.send(bytes_data=frame)
+            self.update_rate.record(len(frame))
+        else:
+            text = await self.encode_json(frame)
+            await self.send(text_data=text)
+            self.update_rate.record(len(text))
+
+    def _maybe_checkpoint(self):
+        """Периодически сохранять состояние боя в БД (в фоне)."""
+        interval = settings.GAME_FIGHT_CHECKPOINT_INTERVAL
+        if not interval:
+            return
 
-    async def _fight_loop(self):
-        """Цикл вываживания - отправка обновлений состояния."""
-        try:
-            while self.is_fighting:
-                await asyncio.sleep(0.1)  # 10 обновлений в секунду
-
-                try:
-                    # СНАЧАЛА проверяем завершение (перед получением state)
-                    result = await self._check_fight_result()
-                    if result:
-                        self.is_fighting = False
-                        await self.send_json({
-                            'type': 'catch',
-                            'result': result
-                        })
-                        break
-
-                    # Получаем текущее состояние
-                    state = await self._get_fight_state()
-                    if not state:
-                        self.is_fighting = False
-                        break
-
-                    # Отправляем обновление клиенту
-                    await self.send_json({
-                        'type': 'fight_update',
-                        'state': {
-                            'fish_state': state.fish_state.value,
-                            'fish_stamina': state.fish_stamina,
-                            'fish_distance': state.fish_distance,
-                            'fish_direction': state.fish_direction,
-                            'line_tension': state.line_tension,
-                            'line_health': state.line_health,
-                            'drag_level': state.drag_level,
-                            'is_critical': state.is_critical,
-                        }
-                    })
-
-                except Exception as e:
-                    print(f'Ошибка в fight_loop: {e}')
-                    import traceback
-                    traceback.print_exc()
-                    await self.send_json({
-                        'type': 'error',
-                        'message': f'Ошибка вываживания: {str(e)}'
-                    })
-                    self.is_fighting = False
-                    break
-
-        except asyncio.CancelledError:
-            pass
+        now = asyncio.get_running_loop().time()
+        if now - self.last_checkpoint_time < interval:
+            return
+        if self.checkpoint_task and not self.checkpoint_task.done():
+            return
+
+        self.last_checkpoint_time = now
+        self.checkpoint_task = asyncio.create_task(
+            database_sync_to_async(self.fight_engine.checkpoint)()
+        )
+
+    def _stop_fight(self):
+        """Снять бой с планировщика."""
+        if self.is_fighting or self.fight_engine:
+            get_tick_scheduler().unregister(self.channel_name)
+        self.is_fighting = False
+        self.fight_engine = None
+
+    async def _finish_fight(self, result: FightResult):
+        """Завершить бой: записать результат в БД и отправить его клиенту."""
+        self._stop_fight()
+        await self._wait_checkpoint()
+
+        catch_result = await self._complete_catch(result)
+        if settings.GAME_WRITE_BEHIND:
+            get_write_behind_queue().schedule()
+        if catch_result:
+            await self.send_json({
+                'type': 'catch',
+                'result': catch_result
+            })
 
     @database_sync_to_async
     def _create_session(self, location_id: int):
-        """Создать игровую сессию."""
-        service = GameSessionService(self.user)
-        return service.get_or_create_session(location_id)
+        """
+        Создать игровую сессию.
+
+        Первый вход использует данные, загруженные при подключении;
+        при смене локации профиль и снаряжение перечитываются
+        (игрок мог переэкипироваться через HTTP API).
+        """
+        if self.joined:
+            self.player.refresh()
+            self.user = self.player.user
+        self.joined = True
+        return self.player.game.get_or_create_session(location_id)
 
     @database_sync_to_async
     def _get_location_name(self, location_id: int) -> str:
         """Получить название локации."""
-        from apps.fishing.models import Location
-        try:
-            location = Location.objects.get(id=location_id)
-            return location.name
-        except Location.DoesNotExist:
-            return 'Неизвестная локация'
+        location = get_catalog().get('locations', location_id)
+        return location.name if location else 'Неизвестная локация'
 
     @database_sync_to_async
     def _close_old_sessions(self):
         """Закрыть старые сессии пользователя."""
-        from apps.game.models import GameSession
         # Удаляем старую сессию (будет создана новая при join)
-        GameSession.objects.filter(player=self.user).delete()
+        self.player.game.close_session()
 
     @database_sync_to_async
     def _close_session(self):
         """Закрыть игровую сессию."""
-        service = GameSessionService(self.user)
-        service.close_session()
+        self.player.game.close_session()
 
     @database_sync_to_async
-    def _get_fight_state(self):
-        """Получить состояние вываживания."""
-        service = GameSessionService(self.user)
-        session_state = service.get_session_state()
-        return session_state.fight if session_state else None
+    def _load_fight_engine(self) -> Optional[FightEngine]:
+        """Загрузить движок вываживания (один раз на бой)."""
+        return self.player.game.get_fight_engine()
 
     @database_sync_to_async
     def _check_bite_timeout(self):
@@ -379,7 +525,7 @@ class GameConsumer(AsyncJsonWebsocketConsumer):
         from datetime import timedelta
         from django.utils import timezone
 
-        service = GameSessionService(self.user)
+        service = self.player.game
         session = service.get_session()
 
         if not session or session.state != GameState.BITE:
@@ -388,40 +534,23 @@ class GameConsumer(AsyncJsonWebsocketConsumer):
         if not session.bite_time:
             return False
 
-        BITE_TIMEOUT = 8  # секунд
         elapsed = (timezone.now() - session.bite_time).total_seconds()
 
-        if elapsed > BITE_TIMEOUT:
+        if elapsed > service.BITE_TIMEOUT:
             # Сбрасываем состояние
             session.state = GameState.WAITING
-            session.hooked_fish = None
+            session.hooked_fish_id = None
             session.hooked_fish_weight = 0
             session.bite_time = None
-            session.next_bite_check_time = timezone.now() + timedelta(seconds=10)
-            session.save()
+            session.next_bite_check_time = timezone.now() + timedelta(
+                seconds=service.BITE_RETRY_DELAY
+            )
+            service.save_session(session)
             return True
 
         return False
 
     @database_sync_to_async
-    def _check_fight_result(self):
-        """Проверить результат вываживания."""
-        try:
-            service = GameSessionService(self.user)
-            engine = service.get_fight_engine()
-            if not engine:
-                return None
-
-            state, result = engine.update(0.1)
-
-            if result:
-                catch_result = service.complete_catch(result)
-                if not catch_result:
-                    return None
-                return catch_result
-            return None
-        except Exception as e:
-            print(f'[ERROR] _check_fight_result: {e}')
-            import traceback
-            traceback.print_exc()
-            return None
+    def _complete_catch(self, result: FightResult) -> dict:
+        """Записать результат вываживания и выдать награды."""
+        return self.player.game.complete_catch(result)
@@ -0,0 +1,27 @@
+"""
+Применить журнал отложенных записей (PendingWrite).
+
+Запускается после падения или остановки воркеров, а также перед
+выключением write-behind (GAME_WRITE_BEHIND = False): записи, которые
+не успел применить фоновый сброс, применяются пачками.
+
+    python manage.py replay_pending_writes
+"""
+from django.core.management.base import BaseCommand
+
+from apps.game.models import PendingWrite
+from apps.game.services.write_behind import get_write_behind_queue
+
+
+class Command(BaseCommand):
+    help = 'Применить отложенные записи итогов боя из журнала PendingWrite'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--player', type=int, help='Только записи одного игрока (ID)')
+
+    def handle(self, *args, **options):
+        pending = PendingWrite.objects.count()
+        applied = get_write_behind_queue().flush_all(player_id=options['player'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Применено записей: {applied} (было в журнале: {pending})'
+        ))
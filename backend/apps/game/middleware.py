@@ -4,17 +4,22 @@ Middleware для WebSocket аутентификации через JWT.
 from urllib.parse import parse_qs
 from channels.middleware import BaseMiddleware
 from channels.db import database_sync_to_async
-from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 import jwt
 from django.conf import settings
 
-User = get_user_model()
+from apps.game.services.player_context import load_player
 
 
 @database_sync_to_async
 def get_user_from_token(token: str):
-    """Получить пользователя из JWT токена."""
+    """
+    Получить пользователя из JWT токена.
+
+    Пользователь загружается одним запросом вместе с профилем, статистикой
+    и экипировкой (см. PlayerContext) - consumer дальше обходится без
+    повторных запросов.
+    """
     try:
         # Декодируем токен
         payload = jwt.decode(
@@ -22,12 +27,12 @@ def get_user_from_token(token: str):
             settings.SECRET_KEY,
             algorithms=['HS256']
         )
-        user_id = payload.get('user_id')
-        if user_id:
-            return User.objects.get(pk=user_id)
-    except (jwt.InvalidTokenError, User.DoesNotExist):
-        pass
-    return AnonymousUser()
+    except jwt.InvalidTokenError:
+        return AnonymousUser()
+
+    user_id = payload.get('user_id')
+    user = load_player(user_id) if user_id else None
+    return user or AnonymousUser()
 
 
 class JWTAuthMiddleware(BaseMiddleware):
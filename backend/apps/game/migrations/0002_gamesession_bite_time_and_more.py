@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='bite_time',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Время поклевки'),
+        ),
+        migrations.AddField(
+            model_name='gamesession',
+            name='next_bite_check_time',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Время следующей проверки поклёвки'),
+        ),
+        migrations.AddField(
+            model_name='gamesession',
+            name='version',
+            field=models.IntegerField(default=0, verbose_name='Версия (для optimistic locking)'),
+        ),
+    ]
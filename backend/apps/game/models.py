@@ -137,3 +137,31 @@ class GameSession(models.Model):
 
     def __str__(self):
         return f'Сессия {self.player.username} @ {self.location.name}'
+
+
+class PendingWrite(models.Model):
+    """
+    Журнал отложенных записей (write-behind).
+
+    Итог боя записывается сюда одной строкой в транзакции complete_catch,
+    а улов, счётчики профиля и статистики и достижения применяются
+    фоновым сбросом пачками (services/write_behind.py). Строка удаляется
+    в той же транзакции, что применяет её, поэтому после падения процесса
+    оставшиеся строки просто применяются повторно.
+    """
+    player = models.ForeignKey(
+        'users.User',
+        on_delete=models.CASCADE,
+        related_name='pending_writes',
+        verbose_name='Игрок'
+    )
+    payload = models.JSONField(verbose_name='Изменения')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Отложенная запись'
+        verbose_name_plural = 'Отложенные записи'
+        ordering = ['id']
+
+    def __str__(self):
+        return f'Отложенная запись #{self.pk} ({self.player_id})'
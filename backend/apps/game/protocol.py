@@ -0,0 +1,277 @@
+"""
+Формат сообщений WebSocket-протокола.
+
+По умолчанию все сообщения - JSON. Клиент может запросить при подключении
+подпротокол BINARY_SUBPROTOCOL (Sec-WebSocket-Protocol), тогда
+fight_update отправляется бинарным кадром фиксированной длины,
+остальные сообщения остаются JSON.
+
+Бинарный fight_update (little-endian, 14 байт):
+
+    B  тип кадра (FRAME_FIGHT_UPDATE)
+    B  fish_state (индекс в FISH_STATES)
+    B  флаги (бит 0 - is_critical)
+    H  fish_stamina × 10
+    H  fish_distance × 10
+    h  fish_direction × 10
+    H  line_tension × 10
+    h  line_health × 10
+    B  drag_level × 100
+
+Точность совпадает с JSON (FightState уже округлён до 0.1 / 0.01).
+
+Дельта-режим (FightStream с delta=True) отправляет только изменившиеся
+поля с номером кадра seq (ничего - если изменений нет) и полный ключевой
+кадр раз в keyframe_interval тиков, а также в начале боя и по запросу
+клиента:
+
+    JSON:    {"type": "fight_update", "seq": 7, "keyframe": false, "state": {...}}
+    binary:  B тип (FRAME_FIGHT_KEYFRAME / FRAME_FIGHT_DELTA), H seq,
+             [B маска полей - только в дельте], значения полей FIELDS
+
+Поля в бинарных кадрах идут в порядке FIELDS, в дельте - только
+отмеченные в маске (бит i - поле FIELDS[i]). seq растёт на 1 с каждым
+отправленным кадром (по модулю 2^16); пропуск seq означает потерю
+кадра - FightStreamDecoder ждёт следующего ключевого кадра.
+"""
+import struct
+from typing import Callable, Dict, NamedTuple, Optional, Union
+
+from apps.game.models import FishState
+from apps.game.services.fight_engine import FightState
+
+BINARY_SUBPROTOCOL = 'fishing.bin.v1'
+
+FRAME_FIGHT_UPDATE = 1
+FRAME_FIGHT_DELTA = 2
+FRAME_FIGHT_KEYFRAME = 3
+
+SEQ_MODULO = 1 << 16
+
+FISH_STATES = tuple(FishState)
+_FISH_STATE_INDEX = {state: index for index, state in enumerate(FISH_STATES)}
+
+FLAG_CRITICAL = 0x01
+
+_FIGHT_UPDATE = struct.Struct('<BBBHHhHhB')
+
+_UINT16_MAX = 0xFFFF
+_INT16_MIN, _INT16_MAX = -0x8000, 0x7FFF
+
+
+def _u16(value: float, scale: int) -> int:
+    return max(0, min(_UINT16_MAX, round(value * scale)))
+
+
+def _i16(value: float, scale: int) -> int:
+    return max(_INT16_MIN, min(_INT16_MAX, round(value * scale)))
+
+
+def fight_state_dict(state: FightState) -> dict:
+    """Состояние боя для JSON-сообщения fight_update."""
+    return {
+        'fish_state': state.fish_state.value,
+        'fish_stamina': state.fish_stamina,
+        'fish_distance': state.fish_distance,
+        'fish_direction': state.fish_direction,
+        'line_tension': state.line_tension,
+        'line_health': state.line_health,
+        'drag_level': state.drag_level,
+        'is_critical': state.is_critical,
+    }
+
+
+def encode_fight_update(state: FightState) -> bytes:
+    """Упаковать fight_update в бинарный кадр."""
+    return _FIGHT_UPDATE.pack(
+        FRAME_FIGHT_UPDATE,
+        _FISH_STATE_INDEX[state.fish_state],
+        FLAG_CRITICAL if state.is_critical else 0,
+        _u16(state.fish_stamina, 10),
+        _u16(state.fish_distance, 10),
+        _i16(state.fish_direction, 10),
+        _u16(state.line_tension, 10),
+        _i16(state.line_health, 10),
+        max(0, min(255, round(state.drag_level * 100))),
+    )
+
+
+def decode_fight_update(frame: bytes) -> dict:
+    """Распаковать бинарный fight_update в тот же словарь, что и JSON-путь."""
+    (
+        frame_type, fish_state, flags, stamina, distance,
+        direction, tension, health, drag
+    ) = _FIGHT_UPDATE.unpack(frame)
+    if frame_type != FRAME_FIGHT_UPDATE:
+        raise ValueError(f'Неизвестный тип кадра: {frame_type}')
+
+    return {
+        'fish_state': FISH_STATES[fish_state].value,
+        'fish_stamina': stamina / 10,
+        'fish_distance': distance / 10,
+        'fish_direction': direction / 10,
+        'line_tension': tension / 10,
+        'line_health': health / 10,
+        'drag_level': drag / 100,
+        'is_critical': bool(flags & FLAG_CRITICAL),
+    }
+
+
+class Field(NamedTuple):
+    """Поле состояния боя в бинарном кадре."""
+    name: str
+    format: str
+    pack: Callable
+    unpack: Callable
+
+
+FIELDS = (
+    Field('fish_state', 'B', lambda v: _FISH_STATE_INDEX[FishState(v)], lambda r: FISH_STATES[r].value),
+    Field('is_critical', 'B', int, bool),
+    Field('fish_stamina', 'H', lambda v: _u16(v, 10), lambda r: r / 10),
+    Field('fish_distance', 'H', lambda v: _u16(v, 10), lambda r: r / 10),
+    Field('fish_direction', 'h', lambda v: _i16(v, 10), lambda r: r / 10),
+    Field('line_tension', 'H', lambda v: _u16(v, 10), lambda r: r / 10),
+    Field('line_health', 'h', lambda v: _i16(v, 10), lambda r: r / 10),
+    Field('drag_level', 'B', lambda v: max(0, min(255, round(v * 100))), lambda r: r / 100),
+)
+FULL_MASK = (1 << len(FIELDS)) - 1
+
+_KEYFRAME_HEADER = struct.Struct('<BH')
+_DELTA_HEADER = struct.Struct('<BHB')
+_payload_structs: Dict[int, struct.Struct] = {}
+
+
+def _payload_struct(mask: int) -> struct.Struct:
+    """Struct для значений полей, отмеченных в маске."""
+    packer = _payload_structs.get(mask)
+    if packer is None:
+        packer = struct.Struct('<' + ''.join(
+            field.format for i, field in enumerate(FIELDS) if mask & (1 << i)
+        ))
+        _payload_structs[mask] = packer
+    return packer
+
+
+class FightStream:
+    """
+    Поток fight_update одного соединения.
+
+    Без delta - прежние сообщения (полное состояние JSON или кадр
+    FRAME_FIGHT_UPDATE). С delta - помнит последнее отправленное
+    состояние и отправляет только изменившиеся поля.
+    """
+
+    def __init__(self, binary: bool = False, delta: bool = False, keyframe_interval: int = 20):
+        self.binary = binary
+        self.delta = delta
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.seq = 0
+        self._last: Optional[dict] = None
+        self._since_keyframe = 0
+
+    def request_keyframe(self) -> None:
+        """Следующий кадр будет ключевым (начало боя, запрос клиента)."""
+        self._last = None
+
+    def encode(self, state: FightState) -> Union[dict, bytes, None]:
+        """
+        Сообщение для отправки: dict для send_json или bytes для бинарного кадра.
+
+        None - в дельта-режиме ничего не изменилось, отправлять нечего
+        (seq при этом не растёт).
+        """
+        values = fight_state_dict(state)
+        if not self.delta:
+            if self.binary:
+                return encode_fight_update(state)
+            return {'type': 'fight_update', 'state': values}
+
+        keyframe = self._last is None or self._since_keyframe >= self.keyframe_interval
+        if keyframe:
+            changed = values
+            self._since_keyframe = 0
+        else:
+            changed = {k: v for k, v in values.items() if self._last[k] != v}
+        self._since_keyframe += 1
+        if not changed:
+            return None
+
+        self.seq = (self.seq + 1) % SEQ_MODULO
+        self._last = values
+
+        if self.binary:
+            return self._pack(changed, keyframe)
+        return {'type': 'fight_update', 'seq': self.seq, 'keyframe': keyframe, 'state': changed}
+
+    def _pack(self, changed: dict, keyframe: bool) -> bytes:
+        if keyframe:
+            header = _KEYFRAME_HEADER.pack(FRAME_FIGHT_KEYFRAME, self.seq)
+            mask = FULL_MASK
+        else:
+            mask = 0
+            for i, field in enumerate(FIELDS):
+                if field.name in changed:
+                    mask |= 1 << i
+            header = _DELTA_HEADER.pack(FRAME_FIGHT_DELTA, self.seq, mask)
+
+        return header + _payload_struct(mask).pack(*(
+            field.pack(changed[field.name]) for field in FIELDS if field.name in changed
+        ))
+
+
+class FightStreamDecoder:
+    """
+    Восстановление полного состояния на стороне клиента (эталон для клиентов).
+
+    Принимает сообщения FightStream в любом режиме. После пропуска seq
+    возвращает None до следующего ключевого кадра.
+    """
+
+    def __init__(self):
+        self.state: Optional[dict] = None
+        self.seq: Optional[int] = None
+        self.gaps = 0
+
+    def apply(self, message: Union[dict, bytes]) -> Optional[dict]:
+        """Применить сообщение; возвращает полное состояние или None, если нужен ключевой кадр."""
+        if isinstance(message, (bytes, bytearray)):
+            seq, keyframe, changed = self._unpack(bytes(message))
+        else:
+            seq, keyframe, changed = message.get('seq'), message.get('keyframe', True), message['state']
+
+        if seq is None:
+            # Режим без дельт - каждое сообщение полное
+            self.state = dict(changed)
+            return dict(self.state)
+
+        if not keyframe and (self.state is None or seq != (self.seq + 1) % SEQ_MODULO):
+            if self.state is not None:
+                self.gaps += 1
+            self.state = None
+            self.seq = seq
+            return None
+
+        self.seq = seq
+        self.state = dict(changed) if keyframe else {**self.state, **changed}
+        return dict(self.state)
+
+    def _unpack(self, frame: bytes):
+        frame_type = frame[0]
+        if frame_type == FRAME_FIGHT_UPDATE:
+            return None, True, decode_fight_update(frame)
+        if frame_type == FRAME_FIGHT_KEYFRAME:
+            _, seq = _KEYFRAME_HEADER.unpack_from(frame)
+            mask, offset = FULL_MASK, _KEYFRAME_HEADER.size
+        elif frame_type == FRAME_FIGHT_DELTA:
+            _, seq, mask = _DELTA_HEADER.unpack_from(frame)
+            offset = _DELTA_HEADER.size
+        else:
+            raise ValueError(f'Неизвестный тип кадра: {frame_type}')
+
+        raw = iter(_payload_struct(mask).unpack_from(frame, offset))
+        changed = {
+            field.name: field.unpack(next(raw))
+            for i, field in enumerate(FIELDS) if mask & (1 << i)
+        }
+        return seq, frame_type == FRAME_FIGHT_KEYFRAME, changed
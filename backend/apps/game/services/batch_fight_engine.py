@@ -0,0 +1,327 @@
+"""
+Пакетный движок вываживания на NumPy.
+
+Хранит состояние N одновременных боёв в виде structure-of-arrays и
+продвигает их все одним векторизованным шагом. Логика повторяет
+FightEngine.update() и FishAI (переходы состояний, поведение,
+шанс схода) - результаты статистически эквивалентны скалярному движку,
+но не совпадают бит-в-бит: случайные числа берутся пачками.
+"""
+from typing import Optional
+
+import numpy as np
+
+from apps.game.models import FishState
+from apps.game.services.fight_engine import FightEngine, FightState
+
+
+# Коды состояний рыбы в массиве fish_state
+PASSIVE, ACTIVE, RUSH, EXHAUSTED = 0, 1, 2, 3
+STATE_CODES = {
+    FishState.PASSIVE: PASSIVE,
+    FishState.ACTIVE: ACTIVE,
+    FishState.RUSH: RUSH,
+    FishState.EXHAUSTED: EXHAUSTED,
+}
+STATE_BY_CODE = {code: state for state, code in STATE_CODES.items()}
+
+# Коды результатов боя в массиве result
+RESULT_NONE = 0
+RESULT_CAUGHT = 1
+RESULT_LINE_BREAK = 2
+RESULT_LINE_WORN = 3
+RESULT_FISH_ESCAPED = 4
+RESULT_REASONS = {
+    RESULT_CAUGHT: 'caught',
+    RESULT_LINE_BREAK: 'line_break',
+    RESULT_LINE_WORN: 'line_worn',
+    RESULT_FISH_ESCAPED: 'fish_escaped',
+}
+
+# Множитель натяжения при подмотке по состоянию рыбы (индекс = код состояния)
+REEL_TENSION_MULTIPLIER = np.array([1.0, 1.5, 3.0, 0.5])
+
+
+class BatchFightEngine:
+    """
+    Векторизованный движок для множества боёв.
+
+    Каждый бой занимает слот (индекс в массивах). Завершившиеся бои
+    перестают обновляться, результат остаётся в `result` до remove().
+    """
+
+    # Состояние боя
+    STATE_FIELDS = (
+        'fish_stamina', 'fish_distance', 'fish_direction',
+        'line_tension', 'line_health', 'drag_level', 'elapsed',
+    )
+    # Параметры рыбы и снасти (не меняются во время боя)
+    PARAM_FIELDS = (
+        'strength', 'aggressiveness', 'weight_factor',
+        'rod_power', 'reel_speed', 'line_length',
+    )
+
+    def __init__(self, capacity: int = 1024, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+        self.capacity = 0
+        self.size = 0  # Граница занятых слотов
+        self._free: list[int] = []
+        self._allocate(max(1, capacity))
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.active))
+
+    def _allocate(self, capacity: int) -> None:
+        """Выделить (или расширить) массивы до capacity слотов."""
+        def grow(name: str, dtype, fill) -> None:
+            array = np.full(capacity, fill, dtype=dtype)
+            if self.capacity:
+                array[:self.capacity] = getattr(self, name)
+            setattr(self, name, array)
+
+        for name in self.STATE_FIELDS + self.PARAM_FIELDS:
+            grow(name, np.float64, 0.0)
+        grow('fish_state', np.int8, PASSIVE)
+        grow('result', np.int8, RESULT_NONE)
+        grow('active', np.bool_, False)
+        self.capacity = capacity
+
+    def add(
+        self,
+        strength: float,
+        aggressiveness: float,
+        weight_factor: float,
+        rod_power: float,
+        reel_speed: float,
+        line_length: float,
+        fish_distance: float,
+        fish_state: FishState = FishState.ACTIVE,
+        fish_stamina: float = 100,
+        fish_direction: float = 0,
+        line_tension: float = 30,
+        line_health: float = 100,
+        drag_level: float = 0.5,
+    ) -> int:
+        """
+        Добавить бой.
+
+        Значения по умолчанию совпадают с GameSessionService.start_fight().
+
+        Returns:
+            Номер слота боя
+        """
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self.size == self.capacity:
+                self._allocate(self.capacity * 2)
+            slot = self.size
+            self.size += 1
+
+        self.strength[slot] = strength
+        self.aggressiveness[slot] = aggressiveness
+        self.weight_factor[slot] = weight_factor
+        self.rod_power[slot] = rod_power
+        self.reel_speed[slot] = reel_speed
+        self.line_length[slot] = line_length
+
+        self.fish_state[slot] = STATE_CODES[FishState(fish_state)]
+        self.fish_stamina[slot] = fish_stamina
+        self.fish_distance[slot] = fish_distance
+        self.fish_direction[slot] = fish_direction
+        self.line_tension[slot] = line_tension
+        self.line_health[slot] = line_health
+        self.drag_level[slot] = drag_level
+        self.elapsed[slot] = 0
+        self.result[slot] = RESULT_NONE
+        self.active[slot] = True
+        return slot
+
+    def add_engine(self, engine: FightEngine) -> int:
+        """Перенести бой из скалярного FightEngine в пакет."""
+        session = engine.session
+        fish_ai = engine.fish_ai
+        return self.add(
+            strength=fish_ai.fish.strength,
+            aggressiveness=fish_ai.fish.aggressiveness,
+            weight_factor=fish_ai.weight_factor,
+            rod_power=engine.rod.power,
+            reel_speed=engine.reel_speed,
+            line_length=engine.line.length,
+            fish_distance=session.fish_distance,
+            fish_state=session.fish_state,
+            fish_stamina=session.fish_stamina,
+            fish_direction=session.fish_direction,
+            line_tension=session.line_tension,
+            line_health=session.line_health,
+            drag_level=session.drag_level,
+        )
+
+    def remove(self, slot: int) -> None:
+        """Освободить слот."""
+        self.active[slot] = False
+        self.result[slot] = RESULT_NONE
+        self._free.append(slot)
+
+    # ------------------------------------------------------------------
+    # Действия игрока (аналог FightEngine.process_action)
+    # ------------------------------------------------------------------
+
+    def reel(self, slots: np.ndarray, speed: np.ndarray) -> None:
+        """Подмотка для набора боёв."""
+        effective_speed = speed * self.reel_speed[slots]
+        self.fish_distance[slots] = np.maximum(
+            0, self.fish_distance[slots] - FightEngine.DISTANCE_PER_REEL * effective_speed
+        )
+        multiplier = REEL_TENSION_MULTIPLIER[self.fish_state[slots]]
+        self.line_tension[slots] = np.clip(
+            self.line_tension[slots] + FightEngine.TENSION_PER_REEL * effective_speed * multiplier,
+            0, FightEngine.MAX_TENSION
+        )
+        self.fish_stamina[slots] = np.maximum(0, self.fish_stamina[slots] - effective_speed * 0.5)
+
+    def release(self, slots: np.ndarray) -> None:
+        """Стравливание лески для набора боёв."""
+        self.line_tension[slots] = np.clip(self.line_tension[slots] - 20, 0, FightEngine.MAX_TENSION)
+        self.fish_distance[slots] += 1
+
+    def set_drag(self, slots: np.ndarray, level: np.ndarray) -> None:
+        """Установка фрикциона для набора боёв."""
+        self.drag_level[slots] = np.clip(level, 0.1, 1.0)
+
+    # ------------------------------------------------------------------
+    # Шаг симуляции (аналог FightEngine.update)
+    # ------------------------------------------------------------------
+
+    def step(self, delta_time: float) -> np.ndarray:
+        """
+        Продвинуть все активные бои на delta_time секунд.
+
+        Returns:
+            Индексы слотов, завершившихся на этом шаге (код в `result`)
+        """
+        idx = np.flatnonzero(self.active[:self.size])
+        if not idx.size:
+            return idx
+
+        n = idx.size
+        current = self.fish_state[idx]
+        stamina = self.fish_stamina[idx]
+        tension = self.line_tension[idx]
+        drag = self.drag_level[idx]
+        strength = self.strength[idx]
+        aggressiveness = self.aggressiveness[idx]
+        weight_factor = self.weight_factor[idx]
+
+        # --- FishAI._determine_state (is_reeling=False, как в FightEngine.update)
+        roll_rush, roll_tired, roll_switch, roll_direction, roll_escape = self.rng.random((5, n))
+
+        rush_chance = aggressiveness / 100 * (tension / 100) * 0.15
+        rush_chance = np.where(tension > 70, rush_chance * 2, rush_chance)
+
+        new_state = current.copy()
+        new_state[current == PASSIVE] = np.where(
+            roll_switch < aggressiveness / 300, ACTIVE, PASSIVE
+        )[current == PASSIVE]
+        new_state[current == ACTIVE] = np.where(
+            roll_switch < 0.2 + (100 - stamina) / 200, PASSIVE, ACTIVE
+        )[current == ACTIVE]
+        new_state[current == RUSH] = np.where(roll_switch < 0.6, ACTIVE, PASSIVE)[current == RUSH]
+        new_state[(stamina < 40) & (roll_tired < 0.4)] = PASSIVE
+        new_state[roll_rush < rush_chance] = RUSH
+        # Выдохшаяся рыба (FishAI.update: stamina < 20)
+        new_state[stamina < 20] = EXHAUSTED
+
+        # --- Поведение для состояния (_rush/_active/_passive/_exhausted_behavior)
+        is_rush = new_state == RUSH
+        is_active = new_state == ACTIVE
+        is_passive = new_state == PASSIVE
+
+        direction_span = np.select([is_rush, is_active, is_passive], [60, 20, 5], 0)
+        direction_change = (roll_direction * 2 - 1) * direction_span
+        pull_force = np.select(
+            [is_rush, is_active, is_passive],
+            [
+                70 + strength * 0.3 * weight_factor,
+                30 + strength * 0.4 * weight_factor,
+                10 + strength * 0.1,
+            ],
+            5
+        )
+        stamina_drain = np.select(
+            [is_rush, is_active, is_passive],
+            [3 + strength * 0.05, 1.5 + (tension / 100) * 0.5, 0.5],
+            0.1
+        )
+
+        # --- FightEngine._apply_fish_behavior
+        direction = self.fish_direction[idx] + direction_change
+        direction = np.where(direction > 180, direction - 360, direction)
+        direction = np.where(direction < -180, direction + 360, direction)
+
+        pull_effect = pull_force * (1 - drag * 0.7)
+        tension = np.clip(tension + pull_effect * delta_time * 0.5, 0, FightEngine.MAX_TENSION)
+
+        distance = self.fish_distance[idx] + np.where(
+            is_rush, FightEngine.DISTANCE_PER_RUSH * delta_time, 0
+        )
+
+        stamina_drain = stamina_drain * delta_time * (1 + drag * 0.5) * (1 + self.rod_power[idx] / 200)
+        stamina = np.maximum(0, stamina - stamina_drain)
+
+        # --- Спад натяжения и износ лески
+        tension = np.clip(tension - FightEngine.TENSION_DECAY * delta_time, 0, FightEngine.MAX_TENSION)
+        health = self.line_health[idx] - np.where(
+            tension > FightEngine.LINE_DAMAGE_THRESHOLD,
+            (tension - FightEngine.LINE_DAMAGE_THRESHOLD) * 0.1 * delta_time,
+            0
+        )
+
+        # --- FightEngine._check_end_conditions (порядок проверок сохранён)
+        escape_chance = np.where(
+            (stamina > 60) & (tension < 20), 0.001,
+            np.where((stamina < 30) | (tension > 70), 0.02, 0.005)
+        )
+        caught = ((distance <= 3) & (stamina < 20)) | (stamina <= 0)
+        result = np.select(
+            [
+                tension >= FightEngine.MAX_TENSION,
+                health <= 0,
+                distance > self.line_length[idx] * 0.9,
+                caught,
+                roll_escape < escape_chance,
+            ],
+            [RESULT_LINE_BREAK, RESULT_LINE_WORN, RESULT_FISH_ESCAPED, RESULT_CAUGHT, RESULT_FISH_ESCAPED],
+            RESULT_NONE
+        )
+
+        self.fish_state[idx] = new_state
+        self.fish_direction[idx] = direction
+        self.fish_distance[idx] = distance
+        self.fish_stamina[idx] = stamina
+        self.line_tension[idx] = tension
+        self.line_health[idx] = health
+        self.elapsed[idx] += delta_time
+        self.result[idx] = result
+
+        finished = idx[result != RESULT_NONE]
+        self.active[finished] = False
+        return finished
+
+    def get_state(self, slot: int) -> FightState:
+        """Состояние боя в формате FightEngine для отправки клиенту."""
+        tension = self.line_tension[slot]
+        return FightState(
+            fish_state=STATE_BY_CODE[int(self.fish_state[slot])],
+            fish_stamina=round(float(self.fish_stamina[slot]), 1),
+            fish_distance=round(float(self.fish_distance[slot]), 1),
+            fish_direction=round(float(self.fish_direction[slot]), 1),
+            line_tension=round(float(tension), 1),
+            line_health=round(float(self.line_health[slot]), 1),
+            drag_level=round(float(self.drag_level[slot]), 2),
+            is_critical=bool(tension >= FightEngine.CRITICAL_TENSION)
+        )
+
+    def get_reason(self, slot: int) -> str:
+        """Причина завершения боя ('' если бой продолжается)."""
+        return RESULT_REASONS.get(int(self.result[slot]), '')
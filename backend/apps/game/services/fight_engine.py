@@ -2,16 +2,21 @@
 Движок механики вываживания.
 Ядро игрового процесса - обрабатывает все действия игрока и обновляет состояние.
 """
+import logging
 import time
+import random
 from dataclasses import dataclass
 from typing import Optional, Tuple
 from enum import Enum
 
-from apps.fishing.models import Fish
-from apps.equipment.models import Rod, Reel, Line
+from apps.equipment.catalog import RodEntry, ReelEntry, LineEntry
+from apps.fishing.catalog import FishEntry
 from apps.game.models import GameSession, GameState, FishState
 from apps.game.services.fish_ai import FishAI, FishBehavior
-from core.exceptions import LineBreakError, FishEscapedError
+from apps.game.services.session_store import get_session_store
+from core.exceptions import LineBreakError, FishEscapedError, SessionNotFoundError
+
+logger = logging.getLogger(__name__)
 
 
 class PlayerAction(str, Enum):
@@ -39,7 +44,7 @@ class FightState:
 class FightResult:
     """Результат вываживания."""
     success: bool
-    fish: Optional[Fish] = None
+    fish: Optional[FishEntry] = None
     weight: float = 0
     fight_duration: int = 0  # секунды
     reason: str = ''  # Причина завершения
@@ -65,12 +70,28 @@ class FightEngine:
     CRITICAL_TENSION = 90       # Критическое натяжение
     MAX_TENSION = 100           # Максимум перед обрывом
 
-    def __init__(self, session: GameSession, rod: Rod, reel: Reel, line: Line):
+    # Поля сессии, которые меняются во время боя и сохраняются в чекпоинте
+    CHECKPOINT_FIELDS = (
+        'fish_state', 'fish_stamina', 'fish_distance', 'fish_direction',
+        'line_tension', 'line_health', 'drag_level',
+    )
+
+    def __init__(
+        self,
+        session: GameSession,
+        fish: FishEntry,
+        rod: RodEntry,
+        reel: ReelEntry,
+        line: LineEntry,
+        rng: Optional[random.Random] = None
+    ):
         self.session = session
+        self.fish = fish
         self.rod = rod
         self.reel = reel
         self.line = line
-        self.fish_ai = FishAI(session.hooked_fish, session.hooked_fish_weight)
+        self.rng = rng or random.Random()
+        self.fish_ai = FishAI(fish, session.hooked_fish_weight, rng=self.rng)
 
         # Расчёт максимальных параметров снасти
         self.max_drag = min(reel.drag_power, line.breaking_strength)
@@ -102,6 +123,9 @@ class FightEngine:
         """
         Обновить состояние вываживания (вызывается каждый тик).
 
+        Работает только с состоянием в памяти и не обращается к БД.
+        Для сохранения промежуточного состояния используйте checkpoint().
+
         Args:
             delta_time: Время с последнего обновления (секунды)
 
@@ -130,9 +154,16 @@ class FightEngine:
         # Проверяем условия завершения
         result = self._check_end_conditions()
 
-        self.session.save()
         return self._get_state(), result
 
+    def checkpoint(self) -> None:
+        """Сохранить текущее состояние боя в хранилище сессий (периодический чекпоинт)."""
+        try:
+            get_session_store().save(self.session, update_fields=self.CHECKPOINT_FIELDS)
+        except SessionNotFoundError:
+            # Сессия истекла - бой доживает в памяти, complete_catch сообщит об ошибке
+            logger.warning('Чекпоинт боя пропущен: нет сессии игрока %s', self.session.player_id)
+
     def _process_reel(self, speed: float) -> None:
         """Обработка подмотки."""
         # Скорость 0-1, умножается на характеристики катушки
@@ -241,7 +272,7 @@ class FightEngine:
 
             return FightResult(
                 success=True,
-                fish=self.session.hooked_fish,
+                fish=self.fish,
                 weight=self.session.hooked_fish_weight,
                 fight_duration=duration,
                 reason='caught'
@@ -252,8 +283,7 @@ class FightEngine:
             self.session.line_tension,
             self.session.fish_stamina
         )
-        import random
-        if random.random() < escape_chance:
+        if self.rng.random() < escape_chance:
             return FightResult(
                 success=False,
                 reason='fish_escaped'
@@ -0,0 +1,80 @@
+"""
+Буфер ввода игрока при вываживании.
+
+Сообщения reel/release/hold/set_drag не применяются к движку сразу:
+они копятся в буфере соединения и применяются один раз в начале
+следующего шага симуляции (TickScheduler), перед FightEngine.update().
+Поэтому стоимость тика не зависит от того, как часто клиент шлёт ввод.
+"""
+from typing import Optional
+
+from apps.game.services.fight_engine import FightEngine, PlayerAction
+
+
+class FightInputBuffer:
+    """
+    Ввод игрока, накопленный между шагами симуляции.
+
+    Правила слияния:
+    - reel: скорости суммируются, но не больше MAX_REEL_PER_TICK за шаг
+    - set_drag: остаётся последнее значение
+    - release, hold: не больше одного раза за шаг
+
+    Порядок применения: фрикцион → стравливание → подмотка → удержание,
+    затем шаг FightEngine.update().
+    """
+
+    MAX_REEL_PER_TICK = 1.0  # Одна подмотка на полной скорости
+
+    __slots__ = ('reel', 'drag', 'release', 'hold', 'received')
+
+    def __init__(self):
+        self.reel = 0.0
+        self.drag: Optional[float] = None
+        self.release = False
+        self.hold = False
+        self.received = 0  # Сообщений с прошлого применения
+
+    def __bool__(self) -> bool:
+        return self.received > 0
+
+    def push(self, action: PlayerAction, value: float = 0) -> None:
+        """Добавить действие игрока в буфер."""
+        if action == PlayerAction.REEL:
+            speed = max(0.0, min(1.0, value))
+            self.reel = min(self.MAX_REEL_PER_TICK, self.reel + speed)
+        elif action == PlayerAction.SET_DRAG:
+            self.drag = value
+        elif action == PlayerAction.RELEASE:
+            self.release = True
+        elif action == PlayerAction.HOLD:
+            self.hold = True
+        self.received += 1
+
+    def apply(self, engine: FightEngine) -> int:
+        """
+        Применить накопленный ввод к движку и очистить буфер.
+
+        Returns:
+            Сколько действий применено после слияния
+        """
+        applied = 0
+        if self.drag is not None:
+            engine.process_action(PlayerAction.SET_DRAG, self.drag)
+            applied += 1
+        if self.release:
+            engine.process_action(PlayerAction.RELEASE)
+            applied += 1
+        if self.reel > 0:
+            engine.process_action(PlayerAction.REEL, self.reel)
+            applied += 1
+        if self.hold:
+            engine.process_action(PlayerAction.HOLD)
+            applied += 1
+
+        self.reel = 0.0
+        self.drag = None
+        self.release = False
+        self.hold = False
+        self.received = 0
+        return applied
@@ -5,9 +5,9 @@
 import random
 import math
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Optional, Tuple
 
-from apps.fishing.models import Fish
+from apps.fishing.catalog import FishEntry
 from apps.game.models import FishState
 
 
@@ -31,9 +31,11 @@ class FishAI:
     - Случайных факторов
     """
 
-    def __init__(self, fish: Fish, weight: float):
+    def __init__(self, fish: FishEntry, weight: float, rng: Optional[random.Random] = None):
         self.fish = fish
         self.weight = weight
+        # Собственный генератор - воспроизводимость боя при заданном seed
+        self.rng = rng or random.Random()
         # Вес влияет на силу
         self.weight_factor = weight / fish.max_weight
 
@@ -94,31 +96,31 @@ class FishAI:
 
         # При подмотке рыба чаще сопротивляется
         if is_reeling and current == FishState.PASSIVE:
-            if random.random() < 0.3 + (self.fish.strength / 200):
+            if self.rng.random() < 0.3 + (self.fish.strength / 200):
                 return FishState.ACTIVE
 
         # Рывок
-        if random.random() < rush_chance:
+        if self.rng.random() < rush_chance:
             return FishState.RUSH
 
         # Уставшая рыба остаётся пассивной
-        if stamina < 40 and random.random() < 0.4:
+        if stamina < 40 and self.rng.random() < 0.4:
             return FishState.PASSIVE
 
         # Активное сопротивление
         if current == FishState.RUSH:
             # После рывка переход в активное или пассивное
-            return FishState.ACTIVE if random.random() < 0.6 else FishState.PASSIVE
+            return FishState.ACTIVE if self.rng.random() < 0.6 else FishState.PASSIVE
 
         if current == FishState.ACTIVE:
             # Может устать или продолжить сопротивляться
-            if random.random() < 0.2 + (100 - stamina) / 200:
+            if self.rng.random() < 0.2 + (100 - stamina) / 200:
                 return FishState.PASSIVE
             return FishState.ACTIVE
 
         # Пассивная рыба может начать сопротивляться
         if current == FishState.PASSIVE:
-            if random.random() < self.fish.aggressiveness / 300:
+            if self.rng.random() < self.fish.aggressiveness / 300:
                 return FishState.ACTIVE
 
         return current
@@ -127,7 +129,7 @@ class FishAI:
         """Поведение при рывке - сильный рывок в случайном направлении."""
         return FishBehavior(
             new_state=FishState.RUSH,
-            direction_change=random.uniform(-60, 60),
+            direction_change=self.rng.uniform(-60, 60),
             pull_force=70 + self.fish.strength * 0.3 * self.weight_factor,
             stamina_drain=3 + self.fish.strength * 0.05
         )
@@ -136,7 +138,7 @@ class FishAI:
         """Активное сопротивление - умеренная тяга."""
         return FishBehavior(
             new_state=FishState.ACTIVE,
-            direction_change=random.uniform(-20, 20),
+            direction_change=self.rng.uniform(-20, 20),
             pull_force=30 + self.fish.strength * 0.4 * self.weight_factor,
             stamina_drain=1.5 + (tension / 100) * 0.5
         )
@@ -145,7 +147,7 @@ class FishAI:
         """Пассивное состояние - слабое сопротивление."""
         return FishBehavior(
             new_state=FishState.PASSIVE,
-            direction_change=random.uniform(-5, 5),
+            direction_change=self.rng.uniform(-5, 5),
             pull_force=10 + self.fish.strength * 0.1,
             stamina_drain=0.5
         )
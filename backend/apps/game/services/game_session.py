@@ -4,18 +4,24 @@
 """
 from typing import Optional
 from dataclasses import dataclass
+from datetime import timedelta
+from functools import partial
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
-from apps.users.models import User
-from apps.fishing.models import Fish, Location
+from apps.users.models import User, PlayerProfile
 from apps.fishing.services.bite_calculator import BiteCalculator, BiteResult
 from apps.fishing.services.fishing_service import FishingService
-from apps.inventory.models import PlayerEquipment
 from apps.inventory.services import InventoryService
+from apps.progression.models import PlayerStats
+from apps.progression.leaderboards import get_leaderboards, level_score
 from apps.progression.services import ProgressionService
 from apps.game.models import GameSession, GameState, FishState
 from apps.game.services.fight_engine import FightEngine, FightState, FightResult, PlayerAction
+from apps.game.services.session_store import get_session_store
+from apps.game.services.write_behind import PlayerWrites, get_write_behind_queue
+from core.catalog import get_catalog
 from core.exceptions import InvalidGameStateError, EquipmentNotFoundError
 
 
@@ -25,6 +31,7 @@ class CastResult:
     success: bool
     distance: float = 0
     depth: float = 0
+    bite_check_in: Optional[float] = None  # Через сколько секунд проверить поклёвку
     error: str = ''
 
 
@@ -48,46 +55,56 @@ class GameSessionService:
     - Обработку поклёвки
     - Координацию вываживания
     - Завершение и награды
+
+    Живое состояние сессии читается и пишется через SessionStore
+    (GAME_SESSION_STORE); durable-снимок в таблице GameSession
+    обновляется при создании сессии, подсечке и завершении боя.
     """
 
+    BITE_TIMEOUT = 8  # Секунд на подсечку после поклёвки
+    BITE_RETRY_DELAY = 10  # Через сколько секунд после ухода рыбы возможна новая поклёвка
+
     def __init__(self, user: User):
         self.user = user
+        self.store = get_session_store()
         self.inventory_service = InventoryService(user)
         self.fishing_service = FishingService(user)
         self.progression_service = ProgressionService(user)
+        # Write-behind: отложенные записи игрока уже применены и профиль перечитан
+        self._player_synced = False
 
     def get_or_create_session(self, location_id: int) -> GameSession:
         """Получить или создать игровую сессию."""
         # Проверяем доступ к локации
-        location = Location.objects.get(pk=location_id)
+        location = get_catalog().get('locations', location_id)
+        if location is None:
+            raise InvalidGameStateError('Локация не найдена')
         if not self.fishing_service.can_access_location(location):
             raise InvalidGameStateError('Локация недоступна для вашего уровня')
 
         # Проверяем экипировку
-        equipment = self.inventory_service.get_equipment()
-        if not equipment or not equipment.is_complete():
+        if not self.inventory_service.get_loadout().is_complete:
             raise EquipmentNotFoundError('Экипируйте все снасти перед рыбалкой')
 
         # Создаём или обновляем сессию
-        session, created = GameSession.objects.update_or_create(
-            player=self.user,
-            defaults={
-                'location': location,
-                'state': GameState.IDLE,
-            }
-        )
+        session = self.get_session() or GameSession(player=self.user)
+        session.location_id = location.id
+        session.state = GameState.IDLE
+        self.store.snapshot(session)
+        self.save_session(session)
         return session
 
     def close_session(self) -> None:
         """Закрыть игровую сессию."""
-        GameSession.objects.filter(player=self.user).delete()
+        self.store.delete(self.user.id)
 
-    def get_session(self) -> Optional[GameSession]:
+    def get_session(self, for_update: bool = False) -> Optional[GameSession]:
         """Получить текущую сессию."""
-        try:
-            return GameSession.objects.get(player=self.user)
-        except GameSession.DoesNotExist:
-            return None
+        return self.store.get(self.user.id, for_update=for_update)
+
+    def save_session(self, session: GameSession) -> None:
+        """Сохранить живое состояние сессии."""
+        self.store.save(session)
 
     @transaction.atomic
     def cast_line(self, power: float, angle: float) -> CastResult:
@@ -109,8 +126,7 @@ class GameSessionService:
             return CastResult(success=False, error='Нельзя забрасывать в текущем состоянии')
 
         # Получаем снаряжение
-        equipment = self.inventory_service.get_equipment()
-        rod = equipment.get_rod()
+        rod = self.inventory_service.get_loadout().rod.item
 
         # Расходуем наживку
         if not self.inventory_service.consume_bait():
@@ -125,33 +141,46 @@ class GameSessionService:
         distance = base_distance * (1 + distance_bonus)
 
         # Глубина зависит от угла и локации
-        max_depth = session.location.max_depth
+        max_depth = get_catalog().get('locations', session.location_id).max_depth
         depth = max_depth * (0.3 + angle / 90 * 0.7)  # 30%-100% от максимума
 
         # Обновляем сессию
         session.cast_distance = distance
         session.cast_depth = depth
         session.state = GameState.WAITING
-        session.next_bite_check_time = None  # Сбрасываем время проверки
-        session.save()
 
-        return CastResult(success=True, distance=distance, depth=depth)
+        # Сразу планируем первую проверку поклёвки
+        bite = self.calculate_bite(session)
+        bite_check_in = bite.wait_time if bite else None
+        session.next_bite_check_time = (
+            timezone.now() + timedelta(seconds=bite_check_in) if bite else None
+        )
+        self.save_session(session)
 
-    def calculate_bite(self) -> Optional[BiteResult]:
+        return CastResult(
+            success=True,
+            distance=distance,
+            depth=depth,
+            bite_check_in=bite_check_in
+        )
+
+    def calculate_bite(self, session: Optional[GameSession] = None) -> Optional[BiteResult]:
         """
         Рассчитать поклёвку.
-        Вызывается периодически пока состояние WAITING.
+        Вызывается в момент next_bite_check_time пока состояние WAITING.
+
+        Args:
+            session: Уже загруженная сессия (чтобы не читать её повторно)
         """
-        session = self.get_session()
+        session = session or self.get_session()
         if not session or session.state != GameState.WAITING:
             return None
 
-        equipment = self.inventory_service.get_equipment()
-        bait = equipment.get_bait()
+        bait = self.inventory_service.get_loadout().bait
 
         calculator = BiteCalculator(
-            location=session.location,
-            bait=bait,
+            location_id=session.location_id,
+            bait_id=bait.item_id if bait else None,
             cast_distance=session.cast_distance,
             depth=session.cast_depth
         )
@@ -159,17 +188,18 @@ class GameSessionService:
         return calculator.calculate_bite()
 
     @transaction.atomic
-    def handle_bite(self, bite: BiteResult) -> bool:
+    def handle_bite(self, bite: BiteResult, session: Optional[GameSession] = None) -> bool:
         """
         Обработать поклёвку.
 
         Args:
             bite: Результат расчёта поклёвки
+            session: Уже загруженная (заблокированная) сессия
 
         Returns:
             True если рыба подсечена
         """
-        session = self.get_session()
+        session = session or self.get_session()
 
         if not session or session.state != GameState.WAITING:
             return False
@@ -181,12 +211,12 @@ class GameSessionService:
         weight = bite.fish.generate_weight()
 
         # Обновляем сессию
-        from django.utils import timezone
         session.state = GameState.BITE
-        session.hooked_fish = bite.fish
+        session.hooked_fish_id = bite.fish.id
         session.hooked_fish_weight = weight
         session.bite_time = timezone.now()  # Запоминаем время поклевки
-        session.save()
+        session.next_bite_check_time = None
+        self.save_session(session)
 
         return True
 
@@ -202,22 +232,20 @@ class GameSessionService:
         if not session or session.state != GameState.BITE:
             return False
 
-        # Проверяем таймаут поклевки (8 секунд)
-        from django.utils import timezone
-        from datetime import timedelta
-        BITE_TIMEOUT = 8  # секунд
-
+        # Проверяем таймаут поклевки
         if session.bite_time:
             elapsed = (timezone.now() - session.bite_time).total_seconds()
 
-            if elapsed > BITE_TIMEOUT:
+            if elapsed > self.BITE_TIMEOUT:
                 # Таймаут - рыба ушла
                 session.state = GameState.WAITING
-                session.hooked_fish = None
+                session.hooked_fish_id = None
                 session.hooked_fish_weight = 0
                 session.bite_time = None
-                session.next_bite_check_time = timezone.now() + timedelta(seconds=10)
-                session.save()
+                session.next_bite_check_time = timezone.now() + timedelta(
+                    seconds=self.BITE_RETRY_DELAY
+                )
+                self.save_session(session)
                 return False
 
         # Инициализируем параметры вываживания
@@ -231,7 +259,8 @@ class GameSessionService:
         session.drag_level = 0.5
         session.fight_start_time = timezone.now()
         session.bite_time = None  # Очищаем время поклевки
-        session.save()
+        self.save_session(session)
+        self.store.snapshot(session)
 
         return True
 
@@ -241,12 +270,17 @@ class GameSessionService:
         if not session or session.state != GameState.FIGHTING:
             return None
 
-        equipment = self.inventory_service.get_equipment()
+        fish = get_catalog().get('fish', session.hooked_fish_id)
+        if fish is None:
+            return None
+
+        loadout = self.inventory_service.get_loadout()
         return FightEngine(
             session=session,
-            rod=equipment.get_rod(),
-            reel=equipment.get_reel(),
-            line=equipment.get_line()
+            fish=fish,
+            rod=loadout.rod.item,
+            reel=loadout.reel.item,
+            line=loadout.line.item
         )
 
     @transaction.atomic
@@ -254,6 +288,12 @@ class GameSessionService:
         """
         Завершить вываживание и выдать награды.
 
+        При GAME_WRITE_BEHIND награда считается по профилю и статистике
+        в памяти, а улов, счётчики и достижения пишутся одной строкой
+        журнала и применяются фоновым сбросом (write_behind.py). Перед
+        первой наградой соединения применяются отложенные записи игрока
+        (_sync_player), дальше сброс остаётся фоновому воркеру.
+
         Args:
             result: Результат вываживания
 
@@ -265,23 +305,44 @@ class GameSessionService:
             return {}
 
         reward = {}
+        writes = None
+        if settings.GAME_WRITE_BEHIND:
+            self._sync_player()
+            # Дальше профиль в памяти не перечитываем: в БД ещё могут быть не
+            # применены прошлые записи, а приращения не затрут чужие изменения
+            writes = PlayerWrites(self.user.pk)
+            writes.begin(self.user.profile, self.progression_service.get_stats())
+        else:
+            self._lock_player()
+        save = writes is None
 
         if result.success:
             # Записываем улов
             catch_result = self.fishing_service.record_catch(
                 fish=result.fish,
-                location=session.location,
-                weight=result.weight
+                location_id=session.location_id,
+                weight=result.weight,
+                save=save
             )
 
             # Обновляем статистику
             self.progression_service.record_catch_stats(
                 fish=result.fish,
-                fight_duration=result.fight_duration
+                fight_duration=result.fight_duration,
+                weight=result.weight,
+                save=save
             )
 
             # Проверяем достижения
-            new_achievements = self.progression_service.check_achievements()
+            new_achievements = self.progression_service.check_achievements(
+                fish=result.fish,
+                save=save
+            )
+
+            if writes is not None:
+                writes.add_catch(catch_result.record)
+                for achievement in new_achievements:
+                    writes.add_achievement(achievement.id)
 
             reward = {
                 'success': True,
@@ -293,31 +354,77 @@ class GameSessionService:
                 'new_level': catch_result.new_level,
                 'achievements': [a.name for a in new_achievements],
             }
+
+            # Таблицы рекордов - после commit, по профилю в памяти
+            profile = self.user.profile
+            transaction.on_commit(partial(
+                get_leaderboards().record_catch,
+                player_id=self.user.pk,
+                fish_id=result.fish.id,
+                location_id=session.location_id,
+                weight=result.weight,
+                level=level_score(profile.level, profile.experience, profile.experience_for_next_level)
+            ))
         else:
             # Записываем неудачу
             if result.reason == 'line_break':
-                self.progression_service.record_line_break()
+                self.progression_service.record_line_break(save=save)
             else:
-                self.progression_service.record_fish_escaped()
+                self.progression_service.record_fish_escaped(save=save)
 
             reward = {
                 'success': False,
                 'reason': result.reason,
             }
 
+        if writes is not None:
+            writes.finish(self.user.profile, self.progression_service.get_stats())
+            get_write_behind_queue().enqueue(writes)
+
         # Сбрасываем сессию
         session.state = GameState.IDLE
-        session.hooked_fish = None
+        session.hooked_fish_id = None
         session.hooked_fish_weight = 0
         session.fish_stamina = 100
         session.fish_distance = 0
         session.line_tension = 0
         session.line_health = 100
         session.fight_start_time = None
-        session.save()
+        self.save_session(session)
+        self.store.snapshot(session)
 
         return reward
 
+    def _sync_player(self) -> None:
+        """
+        Один раз за соединение: применить отложенные записи игрока и
+        перечитать профиль и статистику (write-behind).
+
+        Профиль загружен при подключении без применения журнала - в нём
+        может не быть наград прошлого соединения. Следующие награды этого
+        соединения уже учтены в памяти.
+        """
+        if self._player_synced:
+            return
+        get_write_behind_queue().flush_all(player_id=self.user.pk)
+        self.user.profile.refresh_from_db()
+        self.progression_service.get_stats().refresh_from_db()
+        self._player_synced = True
+
+    def _lock_player(self) -> None:
+        """
+        Перечитать профиль и статистику под блокировкой перед начислениями.
+
+        Игровое соединение держит их в памяти (PlayerContext), а деньги
+        и статистику могли изменить HTTP API или другое соединение.
+        """
+        self.user.profile.refresh_from_db(
+            from_queryset=PlayerProfile.objects.select_for_update()
+        )
+        self.progression_service.get_stats().refresh_from_db(
+            from_queryset=PlayerStats.objects.select_for_update()
+        )
+
     def get_session_state(self) -> Optional[SessionState]:
         """Получить текущее состояние сессии."""
         session = self.get_session()
@@ -0,0 +1,73 @@
+"""
+Контекст игрока WebSocket-соединения.
+
+При подключении пользователь загружается одним запросом вместе с профилем,
+статистикой и экипировкой (select_related). Игровые сервисы создаются
+один раз на соединение и переиспользуют эти объекты, вместо того чтобы
+на каждое сообщение заново читать профиль и снаряжение.
+"""
+from typing import Optional
+
+from apps.users.models import User
+from apps.inventory.models import PlayerEquipment
+from apps.game.services.game_session import GameSessionService
+
+# Связи, загружаемые вместе с пользователем
+PLAYER_RELATED = (
+    'profile',
+    'stats',
+    'equipment__rod',
+    'equipment__reel',
+    'equipment__line',
+    'equipment__bait',
+)
+
+
+def load_player(user_id: int) -> Optional[User]:
+    """
+    Активный пользователь с профилем, статистикой и экипировкой (один запрос).
+
+    Отложенные записи игрока (write-behind) здесь не применяются, чтобы
+    не нагружать журнал при массовом переподключении: их применяет
+    GameSessionService перед первой наградой соединения.
+    """
+    return (
+        User.objects
+        .select_related(*PLAYER_RELATED)
+        .filter(pk=user_id, is_active=True)
+        .first()
+    )
+
+
+class PlayerContext:
+    """
+    Игрок одного соединения и его сервисы.
+
+    Профиль, статистика и снаряжение живут в памяти всё соединение:
+    GameSessionService перечитывает профиль и статистику перед
+    начислением наград (под блокировкой или, при write-behind, один раз
+    после применения отложенных записей), а снаряжение - при повторном
+    входе на локацию (refresh()).
+    """
+
+    def __init__(self, user: User):
+        self._bind(user)
+
+    def refresh(self) -> None:
+        """Перечитать профиль, статистику и снаряжение одним запросом."""
+        user = load_player(self.user.pk)
+        if user:
+            self._bind(user)
+
+    def _bind(self, user: User) -> None:
+        """Создать сервисы для загруженного пользователя."""
+        self.user = user
+        self.game = GameSessionService(user)
+
+        # Экипировка уже загружена select_related - запрос не нужен
+        if User.equipment.is_cached(user):
+            try:
+                equipment = user.equipment
+            except PlayerEquipment.DoesNotExist:
+                equipment = None
+            self.game.inventory_service.set_equipment(equipment)
@@ -0,0 +1,251 @@
+"""
+Хранилища живого состояния игровой сессии.
+
+GameSessionService читает и пишет сессию через SessionStore:
+- DatabaseSessionStore - таблица GameSession (поведение по умолчанию)
+- InMemorySessionStore - словарь в памяти процесса (один воркер, разработка)
+- RedisSessionStore - Redis hash на каждую сессию
+
+Для in-memory и Redis таблица GameSession остаётся только durable-снимком:
+она пишется в snapshot() в ключевых точках (создание сессии, подсечка,
+завершение боя), а не при каждом изменении.
+
+Блокировка (get(for_update=True)) есть только у DatabaseSessionStore.
+In-memory и Redis её не поддерживают: сессию игрока меняет только его
+соединение, а таймеры и сообщения соединения обрабатываются по очереди
+в одном event loop, поэтому гонок между ними нет. Если сессию одного
+игрока начнут менять несколько процессов, этим хранилищам понадобится
+своя блокировка.
+"""
+import json
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from apps.game.models import GameSession
+from core.exceptions import SessionNotFoundError
+
+
+class SessionStore(ABC):
+    """Интерфейс хранилища сессий."""
+
+    # Хранилище само по себе durable - snapshot() не нужен
+    is_durable = False
+
+    @abstractmethod
+    def get(self, user_id: int, for_update: bool = False) -> Optional[GameSession]:
+        """
+        Получить сессию игрока.
+
+        Args:
+            user_id: ID игрока
+            for_update: Заблокировать сессию до конца транзакции; учитывается
+                только DatabaseSessionStore (см. описание модуля)
+        """
+
+    @abstractmethod
+    def save(self, session: GameSession, update_fields: Optional[Iterable[str]] = None) -> None:
+        """
+        Сохранить живое состояние сессии (все поля или только update_fields).
+
+        Частичное сохранение не создаёт сессию заново: если её уже нет
+        (истёк TTL, сессию удалили), in-memory и Redis бросают
+        SessionNotFoundError, DatabaseSessionStore - DatabaseError, как
+        Model.save(update_fields=...).
+        """
+
+    @abstractmethod
+    def delete(self, user_id: int) -> None:
+        """Удалить сессию игрока (вместе с durable-снимком)."""
+
+    def snapshot(self, session: GameSession) -> None:
+        """
+        Записать durable-снимок сессии в таблицу GameSession.
+
+        Снимок не перезаписывает более новую версию (поле version).
+        """
+        if self.is_durable:
+            return
+
+        values = {
+            field.attname: getattr(session, field.attname)
+            for field in _live_fields()
+            if not field.primary_key and field.attname != 'created_at'
+        }
+        values['updated_at'] = timezone.now()
+
+        if session.pk is None:
+            snapshot, _ = GameSession.objects.update_or_create(
+                player_id=session.player_id,
+                defaults=values
+            )
+            session.pk = snapshot.pk
+            session.created_at = snapshot.created_at
+            return
+
+        GameSession.objects.filter(
+            pk=session.pk,
+            version__lte=session.version
+        ).update(**values)
+
+    def _touch(self, session: GameSession) -> None:
+        """Увеличить версию и время изменения перед сохранением."""
+        session.version += 1
+        session.updated_at = timezone.now()
+
+
+def _live_fields():
+    """Поля модели GameSession, составляющие состояние сессии."""
+    return GameSession._meta.concrete_fields
+
+
+def _to_dict(session: GameSession, update_fields: Optional[Iterable[str]] = None) -> dict:
+    """Значения полей сессии по attname (location_id, hooked_fish_id, ...)."""
+    fields = _live_fields()
+    if update_fields is not None:
+        names = set(update_fields) | {'version', 'updated_at'}
+        fields = [f for f in fields if f.name in names or f.attname in names]
+    return {field.attname: getattr(session, field.attname) for field in fields}
+
+
+def _from_dict(values: dict) -> GameSession:
+    """Собрать экземпляр GameSession, как будто он загружен из БД."""
+    names = [field.attname for field in _live_fields()]
+    return GameSession.from_db('default', names, [values.get(name) for name in names])
+
+
+class DatabaseSessionStore(SessionStore):
+    """Живое состояние в таблице GameSession."""
+
+    is_durable = True
+
+    def get(self, user_id: int, for_update: bool = False) -> Optional[GameSession]:
+        queryset = GameSession.objects.all()
+        if for_update:
+            queryset = queryset.select_for_update()
+        try:
+            return queryset.get(player_id=user_id)
+        except GameSession.DoesNotExist:
+            return None
+
+    def save(self, session: GameSession, update_fields: Optional[Iterable[str]] = None) -> None:
+        session.version += 1
+        if update_fields is not None:
+            update_fields = {*update_fields, 'version', 'updated_at'}
+        session.save(update_fields=update_fields)
+
+    def delete(self, user_id: int) -> None:
+        GameSession.objects.filter(player_id=user_id).delete()
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Живое состояние в памяти процесса.
+
+    Подходит только для одного воркера: другие процессы сессию не увидят.
+    """
+
+    def __init__(self):
+        self._sessions: dict[int, dict] = {}
+
+    def get(self, user_id: int, for_update: bool = False) -> Optional[GameSession]:
+        values = self._sessions.get(user_id)
+        return _from_dict(values) if values is not None else None
+
+    def save(self, session: GameSession, update_fields: Optional[Iterable[str]] = None) -> None:
+        if update_fields is not None and session.player_id not in self._sessions:
+            raise SessionNotFoundError(f'Нет сессии игрока {session.player_id}')
+        self._touch(session)
+        values = self._sessions.setdefault(session.player_id, {})
+        values.update(_to_dict(session, update_fields))
+
+    def delete(self, user_id: int) -> None:
+        self._sessions.pop(user_id, None)
+        GameSession.objects.filter(player_id=user_id).delete()
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Живое состояние в Redis hash `<prefix><user_id>`.
+
+    Значения полей кодируются в JSON. Клиент можно передать явно
+    (например fakeredis.FakeRedis() в тестах), иначе он создаётся по url.
+    Частичное сохранение - check-and-set (WATCH/MULTI): поля пишутся,
+    только если hash ещё существует, иначе после истечения TTL остался бы
+    hash с частью полей.
+    """
+
+    def __init__(
+        self,
+        url: str = 'redis://localhost:6379/0',
+        prefix: str = 'game:session:',
+        ttl: int = 24 * 60 * 60,
+        client=None
+    ):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def _key(self, user_id: int) -> str:
+        return f'{self.prefix}{user_id}'
+
+    def get(self, user_id: int, for_update: bool = False) -> Optional[GameSession]:
+        raw = self.client.hgetall(self._key(user_id))
+        if not raw:
+            return None
+
+        fields = {field.attname: field for field in _live_fields()}
+        values = {}
+        for name, value in raw.items():
+            name = name.decode() if isinstance(name, bytes) else name
+            field = fields.get(name)
+            if field is not None:
+                values[name] = field.to_python(json.loads(value))
+        return _from_dict(values)
+
+    def save(self, session: GameSession, update_fields: Optional[Iterable[str]] = None) -> None:
+        self._touch(session)
+        key = self._key(session.player_id)
+        mapping = {
+            name: json.dumps(value, cls=DjangoJSONEncoder)
+            for name, value in _to_dict(session, update_fields).items()
+        }
+        if update_fields is None:
+            pipe = self.client.pipeline()
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, self.ttl)
+            pipe.execute()
+            return
+
+        def update(pipe):
+            if not pipe.exists(key):
+                raise SessionNotFoundError(f'Нет сессии игрока {session.player_id}')
+            pipe.multi()
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, self.ttl)
+
+        self.client.transaction(update, key)
+
+    def delete(self, user_id: int) -> None:
+        self.client.delete(self._key(user_id))
+        GameSession.objects.filter(player_id=user_id).delete()
+
+
+_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    """Получить хранилище сессий, настроенное в GAME_SESSION_STORE."""
+    global _store
+    if _store is None:
+        config = settings.GAME_SESSION_STORE
+        store_class = import_string(config['BACKEND'])
+        _store = store_class(**config.get('OPTIONS', {}))
+    return _store
@@ -0,0 +1,285 @@
+"""
+Централизованный планировщик тиков вываживания.
+
+Один планировщик на процесс: хранит все активные FightEngine и
+продвигает их одним циклом с фиксированным шагом (accumulator catch-up),
+после чего рассылает обновления consumer'ам. Ввод игрока копится
+в FightInputBuffer боя и применяется в начале шага, перед update().
+
+Рассылка не ждёт отправки: у каждого боя не больше одной отправки
+в полёте, а кадры, пришедшие за время медленной отправки, сливаются
+в один (последнее состояние, сумма шагов). Медленный клиент не
+задерживает шаги остальных боёв.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from django.conf import settings
+
+from apps.game.services.fight_engine import FightEngine, FightState, FightResult, PlayerAction
+from apps.game.services.fight_input import FightInputBuffer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FightTick:
+    """Результат кадра планировщика для одного боя."""
+    state: Optional[FightState] = None
+    result: Optional[FightResult] = None
+    steps: int = 0  # Сколько шагов симуляции прошло с прошлой рассылки
+    error: Optional[Exception] = None
+
+
+TickCallback = Callable[[FightTick], Awaitable[None]]
+
+
+@dataclass
+class TickMetrics:
+    """Метрики работы планировщика."""
+    frames: int = 0             # Итераций цикла (рассылок)
+    steps: int = 0              # Шагов симуляции
+    catch_up_steps: int = 0     # Дополнительных шагов догонки
+    overruns: int = 0           # Кадров, работа в которых заняла больше шага
+    dropped_steps: int = 0      # Шагов, отброшенных из-за лимита догонки
+    last_frame_seconds: float = 0
+    max_frame_seconds: float = 0
+    max_lag_seconds: float = 0  # Максимальное отставание от расписания
+    active_fights: int = 0
+    input_messages: int = 0     # Сообщений ввода от игроков
+    input_actions: int = 0      # Действий, применённых после слияния
+    coalesced_updates: int = 0  # Кадров, слитых из-за ещё идущей отправки
+
+
+@dataclass
+class _FightEntry:
+    engine: FightEngine
+    callback: TickCallback
+    inputs: FightInputBuffer
+    sending: bool = False                # Отправка кадра ещё идёт
+    queued: Optional[FightTick] = None   # Кадр, ждущий окончания отправки
+
+
+class TickScheduler:
+    """
+    Планировщик вываживания с фиксированным шагом.
+
+    Симуляция всегда продвигается шагами ровно по `tick` секунд:
+    если цикл событий перегружен и кадр опоздал, недостающие шаги
+    выполняются подряд (не более `max_catch_up` за кадр). Поэтому
+    результат боя не зависит от задержек таймера, а клиенту уходит
+    одно обновление за кадр с последним состоянием.
+    """
+
+    METRICS_LOG_INTERVAL = 60  # Не чаще раза в минуту пишем о перегрузке
+
+    def __init__(self, tick: float, max_catch_up: int = 5):
+        self.tick = tick
+        self.max_catch_up = max_catch_up
+        self.metrics = TickMetrics()
+        self._fights: Dict[Hashable, _FightEntry] = {}
+        # Бои, завершившиеся в текущем кадре и ещё не получившие результат
+        self._finished: Dict[Hashable, _FightEntry] = {}
+        self._task: Optional[asyncio.Task] = None
+        # Идущие отправки: цикл событий держит задачи только слабыми ссылками
+        self._sends: Set[asyncio.Task] = set()
+        self._last_overrun_log = float('-inf')
+
+    def __len__(self) -> int:
+        return len(self._fights)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._fights
+
+    def register(self, key: Hashable, engine: FightEngine, callback: TickCallback) -> None:
+        """
+        Добавить бой в планировщик.
+
+        Args:
+            key: Уникальный ключ боя (например channel_name consumer'а)
+            engine: Движок вываживания
+            callback: Корутина, получающая FightTick после каждого кадра
+        """
+        self._fights[key] = _FightEntry(
+            engine=engine, callback=callback, inputs=FightInputBuffer()
+        )
+        self.metrics.active_fights = len(self._fights)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def unregister(self, key: Hashable) -> None:
+        """Убрать бой из планировщика (если он там есть)."""
+        for entry in (self._fights.pop(key, None), self._finished.pop(key, None)):
+            if entry is not None:
+                # Идущая отправка закончится, ожидающий кадр уже не нужен
+                entry.queued = None
+        self.metrics.active_fights = len(self._fights)
+
+    def submit(self, key: Hashable, action: PlayerAction, value: float = 0) -> bool:
+        """
+        Добавить ввод игрока; он будет применён в начале следующего шага.
+
+        Returns:
+            False если боя с таким ключом нет
+        """
+        entry = self._fights.get(key)
+        if entry is None:
+            return False
+        entry.inputs.push(action, value)
+        self.metrics.input_messages += 1
+        return True
+
+    def step(self) -> Dict[Hashable, FightTick]:
+        """
+        Выполнить один шаг симуляции для всех боёв.
+
+        Завершившиеся бои сразу убираются из планировщика.
+
+        Returns:
+            Словарь ключ -> FightTick для всех продвинутых боёв
+        """
+        ticks = {}
+        for key, entry in list(self._fights.items()):
+            try:
+                if entry.inputs:
+                    self.metrics.input_actions += entry.inputs.apply(entry.engine)
+                state, result = entry.engine.update(self.tick)
+            except Exception as e:
+                logger.exception('Ошибка симуляции боя %s', key)
+                ticks[key] = FightTick(error=e, steps=1)
+                self._finish(key)
+                continue
+
+            ticks[key] = FightTick(state=state, result=result, steps=1)
+            if result:
+                self._finish(key)
+
+        self.metrics.steps += 1
+        return ticks
+
+    def _finish(self, key: Hashable) -> None:
+        """Перенести завершившийся бой в ожидающие рассылки результата."""
+        self._finished[key] = self._fights.pop(key)
+        self.metrics.active_fights = len(self._fights)
+
+    def advance(self, accumulator: float) -> Tuple[Dict[Hashable, FightTick], float]:
+        """
+        Догнать расписание фиксированными шагами.
+
+        Args:
+            accumulator: Время, накопленное с прошлого кадра, плюс остаток
+
+        Returns:
+            Кадры боёв (последнее состояние, шаги суммированы) и остаток
+            accumulator для следующего кадра
+        """
+        pending: Dict[Hashable, FightTick] = {}
+        steps = 0
+        while accumulator >= self.tick and steps < self.max_catch_up:
+            for key, fight_tick in self.step().items():
+                if key in pending:
+                    fight_tick.steps += pending[key].steps
+                pending[key] = fight_tick
+            accumulator -= self.tick
+            steps += 1
+
+        if steps > 1:
+            self.metrics.catch_up_steps += steps - 1
+        if accumulator >= self.tick:
+            # Слишком сильно отстали - отбрасываем остаток, чтобы не уйти в спираль
+            dropped = int(accumulator // self.tick)
+            self.metrics.dropped_steps += dropped
+            accumulator -= dropped * self.tick
+        return pending, accumulator
+
+    async def _run(self) -> None:
+        """Основной цикл: шаги с фиксированным dt + рассылка обновлений."""
+        loop = asyncio.get_running_loop()
+        accumulator = 0.0
+        last_time = loop.time()
+
+        while self._fights:
+            frame_start = loop.time()
+            accumulator += frame_start - last_time
+            last_time = frame_start
+            lag = max(0.0, accumulator - self.tick)
+
+            pending, accumulator = self.advance(accumulator)
+            self._fan_out(pending)
+
+            self._record_frame(loop.time() - frame_start, lag)
+
+            # Спим до следующей границы шага
+            await asyncio.sleep(max(0.0, self.tick - accumulator - (loop.time() - last_time)))
+
+        self._task = None
+
+    def _fan_out(self, pending: Dict[Hashable, FightTick]) -> None:
+        """Передать кадры consumer'ам, не дожидаясь отправки."""
+        for key, fight_tick in pending.items():
+            entry = self._fights.get(key) or self._finished.pop(key, None)
+            if entry is None:
+                # Бой убрали во время кадра - обновление уже никому не нужно
+                continue
+
+            if entry.sending:
+                # Прошлый кадр ещё отправляется - ждёт только последний
+                if entry.queued is not None:
+                    fight_tick.steps += entry.queued.steps
+                    self.metrics.coalesced_updates += 1
+                entry.queued = fight_tick
+                continue
+
+            entry.sending = True
+            task = asyncio.get_running_loop().create_task(self._deliver(entry, fight_tick))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    async def _deliver(self, entry: _FightEntry, fight_tick: FightTick) -> None:
+        """Отправить кадр боя, затем кадры, накопившиеся за время отправки."""
+        try:
+            while fight_tick is not None:
+                try:
+                    await entry.callback(fight_tick)
+                except Exception as e:
+                    logger.error('Ошибка рассылки обновления боя: %r', e)
+                fight_tick, entry.queued = entry.queued, None
+        finally:
+            entry.sending = False
+
+    def _record_frame(self, duration: float, lag: float) -> None:
+        """Обновить метрики кадра и сообщить о перегрузке."""
+        metrics = self.metrics
+        metrics.frames += 1
+        metrics.last_frame_seconds = duration
+        metrics.max_frame_seconds = max(metrics.max_frame_seconds, duration)
+        metrics.max_lag_seconds = max(metrics.max_lag_seconds, lag)
+
+        if duration > self.tick:
+            metrics.overruns += 1
+            now = asyncio.get_running_loop().time()
+            if now - self._last_overrun_log >= self.METRICS_LOG_INTERVAL:
+                self._last_overrun_log = now
+                logger.warning(
+                    'Кадр вываживания занял %.1f мс (шаг %.1f мс), боёв: %d, '
+                    'перегрузок: %d, отброшено шагов: %d',
+                    duration * 1000, self.tick * 1000, len(self._fights),
+                    metrics.overruns, metrics.dropped_steps
+                )
+
+
+_scheduler: Optional[TickScheduler] = None
+
+
+def get_tick_scheduler() -> TickScheduler:
+    """Получить планировщик вываживания текущего процесса."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = TickScheduler(
+            tick=settings.GAME_FIGHT_TICK,
+            max_catch_up=settings.GAME_FIGHT_MAX_CATCH_UP
+        )
+    return _scheduler
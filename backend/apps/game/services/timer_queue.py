@@ -0,0 +1,117 @@
+"""
+Очередь таймеров игровых событий.
+
+Один планировщик на процесс: таймеры хранятся в куче по времени
+срабатывания, единственная задача спит ровно до ближайшего из них.
+Используется для поклёвок (next_bite_check_time) и таймаута подсечки
+вместо опроса раз в секунду.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+TimerCallback = Callable[[], Awaitable[None]]
+
+
+class TimerQueue:
+    """
+    Priority queue таймеров на asyncio.
+
+    На каждый ключ - не больше одного таймера: повторный call_later()
+    заменяет предыдущий. Колбэки запускаются отдельными задачами,
+    чтобы медленный колбэк (запрос к БД) не задерживал остальные.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._timers: Dict[Hashable, Tuple[float, int, TimerCallback]] = {}
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def call_later(self, key: Hashable, delay: float, callback: TimerCallback) -> None:
+        """
+        Запланировать колбэк через delay секунд.
+
+        Args:
+            key: Ключ таймера (например channel_name consumer'а)
+            delay: Задержка в секундах
+            callback: Корутинная функция без аргументов
+        """
+        loop = asyncio.get_running_loop()
+        when = loop.time() + max(0.0, delay)
+        seq = next(self._counter)
+        self._timers[key] = (when, seq, callback)
+        heapq.heappush(self._heap, (when, seq, key))
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        elif self._heap[0][1] == seq:
+            # Новый таймер раньше всех остальных - будим цикл
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable) -> None:
+        """Отменить таймер (запись в куче удаляется лениво)."""
+        self._timers.pop(key, None)
+
+    async def _run(self) -> None:
+        """Спать до ближайшего таймера и запускать сработавшие."""
+        loop = asyncio.get_running_loop()
+
+        while self._timers:
+            now = loop.time()
+            while self._heap and self._heap[0][0] <= now:
+                when, seq, key = heapq.heappop(self._heap)
+                timer = self._timers.get(key)
+                if timer is None or timer[1] != seq:
+                    continue  # Отменён или заменён
+                del self._timers[key]
+                self._start(key, timer[2])
+
+            # Убираем отменённые записи с вершины кучи
+            while self._heap and self._timers.get(self._heap[0][2], (0, None))[1] != self._heap[0][1]:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                break
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._heap[0][0] - loop.time())
+            except asyncio.TimeoutError:
+                pass
+
+        self._task = None
+
+    def _start(self, key: Hashable, callback: TimerCallback) -> None:
+        """Запустить колбэк таймера отдельной задачей."""
+        task = asyncio.get_running_loop().create_task(callback())
+        self._running.add(task)
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error('Ошибка в колбэке таймера: %r', task.exception())
+
+
+_timer_queue: Optional[TimerQueue] = None
+
+
+def get_timer_queue() -> TimerQueue:
+    """Получить очередь таймеров текущего процесса."""
+    global _timer_queue
+    if _timer_queue is None:
+        _timer_queue = TimerQueue()
+    return _timer_queue
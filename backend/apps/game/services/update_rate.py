@@ -0,0 +1,90 @@
+"""
+Адаптивная частота отправки fight_update.
+
+Симуляция идёт фиксированным шагом GAME_FIGHT_TICK (TickScheduler),
+а частота отправки клиенту зависит от фазы боя: в спокойных фазах
+(рыба пассивна или выдохлась) обновления редкие, во время рывка и
+при натяжении около критического - на каждом шаге.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from apps.game.models import FishState
+from apps.game.services.fight_engine import FightState
+
+CALM = 'calm'
+NORMAL = 'normal'
+URGENT = 'urgent'
+
+
+@dataclass
+class BandwidthStats:
+    """Учёт трафика fight_update одного соединения."""
+    frames_sent: int = 0
+    frames_skipped: int = 0
+    bytes_sent: int = 0
+
+
+class AdaptiveUpdateRate:
+    """
+    Решает, отправлять ли состояние на этом шаге.
+
+    Время считается в шагах симуляции, а не по часам, поэтому частота
+    не зависит от задержек event loop. Частота не может быть выше
+    частоты шагов (1 / tick): большие значения дают отправку на каждом
+    шаге, поэтому urgent по умолчанию равна частоте шагов, а normal - ниже.
+    Смена fish_state и is_critical отправляется сразу.
+    """
+
+    def __init__(self, tick: float, rates: Dict[str, float], urgent_tension: float):
+        self.tick = tick
+        self.rates = rates
+        self.urgent_tension = urgent_tension
+        self.stats = BandwidthStats()
+        self._elapsed = 0.0
+        self._last: Optional[FightState] = None
+
+    def reset(self) -> None:
+        """Начало боя: первое состояние отправляется сразу."""
+        self._elapsed = 0.0
+        self._last = None
+
+    def phase(self, state: FightState) -> str:
+        """Фаза боя для выбора частоты."""
+        if state.fish_state == FishState.RUSH or state.line_tension >= self.urgent_tension:
+            return URGENT
+        if state.fish_state in (FishState.PASSIVE, FishState.EXHAUSTED):
+            return CALM
+        return NORMAL
+
+    def should_send(self, state: FightState, steps: int = 1) -> bool:
+        """
+        Пора ли отправить состояние.
+
+        Args:
+            state: Состояние после шагов кадра
+            steps: Сколько шагов симуляции прошло с прошлого вызова
+        """
+        self._elapsed += steps * self.tick
+        last = self._last
+
+        changed = (
+            last is None
+            or state.fish_state != last.fish_state
+            or state.is_critical != last.is_critical
+        )
+        # Половина шага - допуск, чтобы 3 Гц при шаге 0.1 давали каждый 3-й шаг, а не 4-й
+        due = self._elapsed >= 1 / self.rates[self.phase(state)] - self.tick / 2
+
+        if changed or due:
+            self._elapsed = 0.0
+            self._last = state
+            return True
+
+        self.stats.frames_skipped += 1
+        return False
+
+    def record(self, size: int) -> None:
+        """Учесть отправленный кадр."""
+        self.stats.frames_sent += 1
+        self.stats.bytes_sent += size
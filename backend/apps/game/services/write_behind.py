@@ -0,0 +1,313 @@
+"""
+Отложенная запись итогов боя (write-behind).
+
+complete_catch считает награду по состоянию игрока в памяти соединения
+(PlayerContext) и пишет в БД одну строку журнала PendingWrite вместо
+записи улова, сохранения профиля, статистики и достижений. Фоновый
+сброс применяет журнал пачками:
+
+- уловы и достижения - bulk_create; caught_at - время завершения боя
+  из журнала, а не время сброса
+- уловы по видам (PlayerSpeciesStats) - по одному UPDATE на игрока и вид
+- счётчики профиля и статистики - по одному UPDATE на игрока
+  с выражениями `x = x + n`, рекорды - Greatest / Least; опыт - приращение,
+  уровень пересчитывается по сохранённому опыту (PlayerProfile.settle_level)
+
+Применение пачки и удаление её строк журнала идут в одной транзакции,
+поэтому после падения процесса оставшиеся строки применяются повторно
+(при следующем сбросе или командой replay_pending_writes) - ничего
+не теряется и не применяется дважды.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.fishing.models import CatchRecord
+from apps.game.models import PendingWrite
+from apps.progression.models import PlayerAchievement, PlayerSpeciesStats, PlayerStats
+from apps.users.models import PlayerProfile
+from core.counters import CounterUpdate
+
+logger = logging.getLogger(__name__)
+
+# Поля, изменения которых переносятся в БД как приращения / рекорды.
+# Опыт - отдельно: приращение всего опыта, уровень считает settle_level()
+PROFILE_COUNTERS = ('money', 'total_fish_caught', 'total_weight_caught')
+PROFILE_MAXIMA = ('biggest_fish_weight',)
+STATS_COUNTERS = (
+    'total_casts', 'successful_catches', 'fish_escaped', 'line_breaks',
+    'common_caught', 'uncommon_caught', 'rare_caught', 'epic_caught', 'legendary_caught',
+)
+STATS_MAXIMA = ('longest_fight_seconds',)
+STATS_MINIMA = ('fastest_catch_seconds',)  # 0 - рекорда ещё нет
+CATCH_FIELDS = ('fish_id', 'location_id', 'weight', 'price', 'experience')
+
+
+def _values(obj, names: Iterable[str]) -> Dict[str, float]:
+    return {name: getattr(obj, name) for name in names}
+
+
+@dataclass
+class PlayerWrites:
+    """
+    Изменения одного игрока, отложенные до сброса.
+
+    Приращения счётчиков вычисляются как разница состояния профиля и
+    статистики до и после начислений (begin() / finish()), поэтому
+    сервисы начисляют награды как обычно, только не сохраняя модели.
+    """
+    player_id: int
+    catches: List[dict] = field(default_factory=list)
+    achievement_ids: List[int] = field(default_factory=list)
+    profile_add: Dict[str, float] = field(default_factory=dict)
+    profile_max: Dict[str, float] = field(default_factory=dict)
+    stats_add: Dict[str, int] = field(default_factory=dict)
+    stats_max: Dict[str, int] = field(default_factory=dict)
+    stats_min: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._profile_before: Optional[dict] = None
+        self._stats_before: Optional[dict] = None
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.catches or self.achievement_ids or self.profile_add or self.profile_max
+            or self.stats_add or self.stats_max or self.stats_min
+        )
+
+    def add_catch(self, record: CatchRecord) -> None:
+        """Отложить запись улова (несохранённый CatchRecord)."""
+        values = _values(record, CATCH_FIELDS)
+        values['caught_at'] = (record.caught_at or timezone.now()).isoformat()
+        self.catches.append(values)
+
+    def catch_records(self) -> List[CatchRecord]:
+        """Несохранённые записи уловов."""
+        return [
+            CatchRecord(player_id=self.player_id, caught_at=parse_datetime(values['caught_at']), **{
+                name: values[name] for name in CATCH_FIELDS
+            })
+            for values in self.catches
+        ]
+
+    def add_achievement(self, achievement_id: int) -> None:
+        """Отложить запись PlayerAchievement."""
+        self.achievement_ids.append(achievement_id)
+
+    def species(self) -> Dict[int, tuple]:
+        """
+        Уловы по видам: id рыбы -> (количество, общий вес, максимальный вес,
+        время первого и последнего улова).
+        """
+        result: Dict[int, tuple] = {}
+        for values in self.catches:
+            caught_at = parse_datetime(values['caught_at'])
+            count, total, biggest, first, last = result.get(
+                values['fish_id'], (0, 0.0, 0.0, caught_at, caught_at)
+            )
+            result[values['fish_id']] = (
+                count + 1, total + values['weight'], max(biggest, values['weight']),
+                min(first, caught_at), max(last, caught_at)
+            )
+        return result
+
+    def begin(self, profile: PlayerProfile, stats: PlayerStats) -> None:
+        """Запомнить состояние до начислений."""
+        self._profile_before = _values(profile, PROFILE_COUNTERS + PROFILE_MAXIMA)
+        self._profile_before['experience'] = profile.total_experience
+        self._stats_before = _values(stats, STATS_COUNTERS + STATS_MAXIMA + STATS_MINIMA)
+
+    def finish(self, profile: PlayerProfile, stats: PlayerStats) -> None:
+        """Записать изменения профиля и статистики после начислений."""
+        after = _values(profile, PROFILE_COUNTERS + PROFILE_MAXIMA)
+        after['experience'] = profile.total_experience
+        for name in PROFILE_COUNTERS + ('experience',):
+            if after[name] != self._profile_before[name]:
+                self.profile_add[name] = after[name] - self._profile_before[name]
+        for name in PROFILE_MAXIMA:
+            if after[name] != self._profile_before[name]:
+                self.profile_max[name] = after[name]
+
+        after = _values(stats, STATS_COUNTERS + STATS_MAXIMA + STATS_MINIMA)
+        for name in STATS_COUNTERS:
+            if after[name] != self._stats_before[name]:
+                self.stats_add[name] = after[name] - self._stats_before[name]
+        for name in STATS_MAXIMA:
+            if after[name] != self._stats_before[name]:
+                self.stats_max[name] = after[name]
+        for name in STATS_MINIMA:
+            if after[name] != self._stats_before[name]:
+                self.stats_min[name] = after[name]
+
+    def merge(self, other: 'PlayerWrites') -> None:
+        """Добавить изменения другой записи того же игрока."""
+        self.catches.extend(other.catches)
+        self.achievement_ids.extend(other.achievement_ids)
+        for target, source in ((self.profile_add, other.profile_add), (self.stats_add, other.stats_add)):
+            for name, value in source.items():
+                target[name] = target.get(name, 0) + value
+        for target, source in ((self.profile_max, other.profile_max), (self.stats_max, other.stats_max)):
+            for name, value in source.items():
+                target[name] = max(target.get(name, value), value)
+        for name, value in other.stats_min.items():
+            self.stats_min[name] = min(self.stats_min.get(name, value), value)
+
+    def to_payload(self) -> dict:
+        return {
+            'catches': self.catches,
+            'achievements': self.achievement_ids,
+            'profile_add': self.profile_add,
+            'profile_max': self.profile_max,
+            'stats_add': self.stats_add,
+            'stats_max': self.stats_max,
+            'stats_min': self.stats_min,
+        }
+
+    @classmethod
+    def from_payload(cls, player_id: int, payload: dict) -> 'PlayerWrites':
+        return cls(
+            player_id=player_id,
+            catches=list(payload.get('catches', [])),
+            achievement_ids=list(payload.get('achievements', [])),
+            profile_add=dict(payload.get('profile_add', {})),
+            profile_max=dict(payload.get('profile_max', {})),
+            stats_add=dict(payload.get('stats_add', {})),
+            stats_max=dict(payload.get('stats_max', {})),
+            stats_min=dict(payload.get('stats_min', {})),
+        )
+
+
+def _counter_update(model, lookup: dict, add: dict, maxima: dict, minima: dict) -> CounterUpdate:
+    """Один UPDATE на строку: x = x + n, рекорды через Greatest / Least."""
+    update = CounterUpdate(model, **lookup)
+    for name, amount in add.items():
+        update.add(name, amount)
+    for name, value in maxima.items():
+        update.max(name, value)
+    for name, value in minima.items():
+        update.min(name, value, unset=0)
+    return update
+
+
+class WriteBehindQueue:
+    """
+    Очередь отложенных записей процесса.
+
+    enqueue() вызывается синхронно внутри транзакции complete_catch.
+    schedule() (из event loop) запускает фоновый сброс через interval
+    секунд; задача работает, пока в журнал поступают записи.
+    """
+
+    def __init__(self, interval: float = 1.0, batch_size: int = 500):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.flushed = 0  # Применено записей за время жизни процесса
+        self._task: Optional[asyncio.Task] = None
+        self._dirty = False
+
+    def enqueue(self, writes: PlayerWrites) -> None:
+        """Записать изменения игрока в журнал."""
+        if writes:
+            PendingWrite.objects.create(player_id=writes.player_id, payload=writes.to_payload())
+
+    def schedule(self) -> None:
+        """Запланировать сброс журнала (вызывать из event loop после enqueue)."""
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        flush = database_sync_to_async(self.flush_all)
+        while self._dirty:
+            await asyncio.sleep(self.interval)
+            self._dirty = False
+            try:
+                await flush()
+            except Exception:
+                # Журнал не потерян - повторим при следующем сбросе
+                logger.exception('Ошибка сброса отложенных записей')
+
+    def flush_all(self, player_id: Optional[int] = None) -> int:
+        """Применить весь журнал (или только записи игрока). Возвращает число записей."""
+        total = 0
+        while True:
+            count = self.flush(player_id=player_id)
+            total += count
+            if count < self.batch_size:
+                return total
+
+    @transaction.atomic
+    def flush(self, player_id: Optional[int] = None) -> int:
+        """
+        Применить одну пачку журнала.
+
+        Строки блокируются (SKIP LOCKED для общего сброса), поэтому
+        несколько воркеров не применяют одну запись дважды; сброс
+        записей одного игрока ждёт, пока их применит другой воркер.
+        """
+        queryset = PendingWrite.objects.order_by('id')
+        if player_id is not None:
+            queryset = queryset.filter(player_id=player_id).select_for_update()
+        else:
+            queryset = queryset.select_for_update(skip_locked=True)
+        rows = list(queryset[:self.batch_size])
+        if not rows:
+            return 0
+
+        players: Dict[int, PlayerWrites] = {}
+        for row in rows:
+            writes = PlayerWrites.from_payload(row.player_id, row.payload)
+            if row.player_id in players:
+                players[row.player_id].merge(writes)
+            else:
+                players[row.player_id] = writes
+
+        CatchRecord.objects.bulk_create([
+            record for writes in players.values() for record in writes.catch_records()
+        ])
+        PlayerAchievement.objects.bulk_create([
+            PlayerAchievement(player_id=writes.player_id, achievement_id=achievement_id)
+            for writes in players.values() for achievement_id in writes.achievement_ids
+        ], ignore_conflicts=True)
+
+        for writes in players.values():
+            for fish_id, (count, total_weight, max_weight, first, last) in writes.species().items():
+                PlayerSpeciesStats.record_catches(
+                    writes.player_id, fish_id, count, total_weight, max_weight, last,
+                    first_caught_at=first
+                )
+            _counter_update(
+                PlayerProfile, {'user_id': writes.player_id},
+                writes.profile_add, writes.profile_max, {}
+            ).execute()
+            if 'experience' in writes.profile_add:
+                PlayerProfile.settle_level(user_id=writes.player_id)
+            _counter_update(
+                PlayerStats, {'player_id': writes.player_id},
+                writes.stats_add, writes.stats_max, writes.stats_min
+            ).execute()
+
+        PendingWrite.objects.filter(pk__in=[row.pk for row in rows]).delete()
+        self.flushed += len(rows)
+        return len(rows)
+
+
+_queue: Optional[WriteBehindQueue] = None
+
+
+def get_write_behind_queue() -> WriteBehindQueue:
+    """Получить очередь отложенных записей текущего процесса."""
+    global _queue
+    if _queue is None:
+        _queue = WriteBehindQueue(
+            interval=settings.GAME_WRITE_BEHIND_INTERVAL,
+            batch_size=settings.GAME_WRITE_BEHIND_BATCH_SIZE
+        )
+    return _queue
@@ -0,0 +1,141 @@
+"""
+Статистическая эквивалентность BatchFightEngine и FightEngine.
+
+Оба движка проводят одинаковые бои с одной стратегией игрока, которая
+вываживает примерно половину рыбы, поэтому проверяются обе ветки
+исхода. Сравниваются доли исходов, распределение длительности боёв
+и распределение натяжения по тикам (двухвыборочный критерий
+Колмогорова-Смирнова).
+"""
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from apps.equipment.catalog import LineEntry, ReelEntry, RodEntry
+from apps.equipment.models import Line, Reel, Rod
+from apps.fishing.catalog import FishEntry
+from apps.fishing.models import Fish
+from apps.game.models import FishState, GameSession
+from apps.game.services.batch_fight_engine import RESULT_REASONS, RUSH, BatchFightEngine
+from apps.game.services.fight_engine import FightEngine, PlayerAction
+
+FIGHTS = 2000
+MAX_TICKS = 3000
+TICK = 0.1
+RELEASE_TENSION = 65
+
+FISH = [
+    FishEntry.from_model(fish) for fish in (
+        Fish(name='Карась', max_weight=1.5, strength=20, stamina=30, aggressiveness=15),
+        Fish(name='Окунь', max_weight=2.0, strength=35, stamina=40, aggressiveness=45),
+        Fish(name='Лещ', max_weight=4.0, strength=40, stamina=50, aggressiveness=25),
+        Fish(name='Щука', max_weight=8.0, strength=70, stamina=60, aggressiveness=80),
+    )
+]
+ROD = RodEntry.from_model(Rod(power=70))
+REEL = ReelEntry.from_model(Reel(retrieve_speed=70, drag_power=12))
+LINE = LineEntry.from_model(Line(length=200, breaking_strength=15))
+
+
+def make_engine(index: int, rng: random.Random) -> FightEngine:
+    fish = FISH[index % len(FISH)]
+    session = GameSession(
+        hooked_fish_weight=fish.max_weight * 0.6,
+        fish_state=FishState.ACTIVE,
+        fish_stamina=100,
+        fish_distance=28,
+        line_tension=30,
+        line_health=100,
+        drag_level=1.0,
+    )
+    return FightEngine(session=session, fish=fish, rod=ROD, reel=REEL, line=LINE, rng=rng)
+
+
+def run_scalar(seed: int):
+    """Исходы, длительности (тики) и натяжение по тикам скалярного движка."""
+    rng = random.Random(seed)
+    outcomes, durations, tension = Counter(), [], []
+    for index in range(FIGHTS):
+        engine = make_engine(index, rng)
+        session = engine.session
+        for tick in range(1, MAX_TICKS + 1):
+            if session.line_tension > RELEASE_TENSION:
+                engine.process_action(PlayerAction.RELEASE)
+            if session.fish_state != FishState.RUSH:
+                engine.process_action(PlayerAction.REEL, 1.0)
+            state, result = engine.update(TICK)
+            tension.append(state.line_tension)
+            if result:
+                outcomes[result.reason] += 1
+                durations.append(tick)
+                break
+    return outcomes, np.array(durations), np.array(tension)
+
+
+def run_batch(seed: int):
+    """То же для BatchFightEngine."""
+    rng = random.Random(seed)
+    batch = BatchFightEngine(capacity=FIGHTS, seed=seed)
+    for index in range(FIGHTS):
+        batch.add_engine(make_engine(index, rng))
+    outcomes, durations, tension = Counter(), [], []
+    for tick in range(1, MAX_TICKS + 1):
+        idx = np.flatnonzero(batch.active[:batch.size])
+        batch.release(idx[batch.line_tension[idx] > RELEASE_TENSION])
+        reel = idx[batch.fish_state[idx] != RUSH]
+        batch.reel(reel, np.ones(reel.size))
+        finished = batch.step(TICK)
+        tension.append(batch.line_tension[idx].copy())
+        for slot in finished:
+            outcomes[RESULT_REASONS[int(batch.result[slot])]] += 1
+            durations.append(tick)
+        if not len(batch):
+            break
+    return outcomes, np.array(durations), np.concatenate(tension)
+
+
+def ks_statistic(a: np.ndarray, b: np.ndarray) -> float:
+    """Статистика Колмогорова-Смирнова двух выборок: max |F_a - F_b|."""
+    points = np.union1d(a, b)
+    cdf_a = np.searchsorted(np.sort(a), points, side='right') / a.size
+    cdf_b = np.searchsorted(np.sort(b), points, side='right') / b.size
+    return float(np.max(np.abs(cdf_a - cdf_b)))
+
+
+def ks_critical(n: int, m: int, c_alpha: float = 1.95) -> float:
+    """Критическое значение KS для уровня значимости 0.001."""
+    return c_alpha * np.sqrt((n + m) / (n * m))
+
+
+@pytest.fixture(scope='module')
+def runs():
+    return run_scalar(seed=1), run_batch(seed=2)
+
+
+def test_outcomes_are_balanced(runs):
+    """Стратегия вываживает заметную долю рыбы - ветка поимки проверяется."""
+    for outcomes, _, _ in runs:
+        assert 0.3 < outcomes['caught'] / FIGHTS < 0.7
+
+
+def test_outcome_shares_match(runs):
+    (scalar, _, _), (batch, _, _) = runs
+    assert sum(scalar.values()) == sum(batch.values()) == FIGHTS
+    for reason in set(scalar) | set(batch):
+        # Стандартная ошибка разности долей ~0.016 при FIGHTS = 2000
+        assert abs(scalar[reason] - batch[reason]) / FIGHTS < 0.05, reason
+
+
+def test_duration_distributions_match(runs):
+    (_, scalar, _), (_, batch, _) = runs
+    assert abs(scalar.mean() - batch.mean()) < 0.1 * scalar.mean()
+    assert ks_statistic(scalar, batch) < ks_critical(scalar.size, batch.size)
+
+
+def test_tension_distributions_match(runs):
+    (_, _, scalar), (_, _, batch) = runs
+    assert abs(scalar.mean() - batch.mean()) < 2
+    # Выборки по тикам зависимы внутри боя - критерий с запасом
+    assert ks_statistic(scalar, batch) < 0.05
@@ -0,0 +1,50 @@
+"""
+Завершение боя в GameConsumer: порядок чекпоинта и записи итогов.
+"""
+import asyncio
+
+from apps.game.consumers import GameConsumer
+from apps.game.services.fight_engine import FightResult
+
+
+def make_consumer(events: list) -> GameConsumer:
+    consumer = GameConsumer()
+    consumer.channel_name = 'test-channel'
+
+    async def complete_catch(result):
+        events.append('complete_catch')
+        return {}
+
+    consumer._complete_catch = complete_catch
+    return consumer
+
+
+async def slow_checkpoint(events: list):
+    await asyncio.sleep(0.01)
+    events.append('checkpoint')
+
+
+def test_finish_waits_for_checkpoint():
+    events = []
+
+    async def scenario():
+        consumer = make_consumer(events)
+        consumer.checkpoint_task = asyncio.create_task(slow_checkpoint(events))
+        await consumer._finish_fight(FightResult(success=False, reason='fish_escaped'))
+        assert consumer.checkpoint_task is None
+
+    asyncio.run(scenario())
+    assert events == ['checkpoint', 'complete_catch']
+
+
+def test_disconnect_waits_for_checkpoint():
+    events = []
+
+    async def scenario():
+        consumer = make_consumer(events)
+        consumer.checkpoint_task = asyncio.create_task(slow_checkpoint(events))
+        await consumer.disconnect(1000)
+        assert consumer.checkpoint_task is None
+
+    asyncio.run(scenario())
+    assert events == ['checkpoint']
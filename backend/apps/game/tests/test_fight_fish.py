@@ -0,0 +1,28 @@
+"""
+FightFishUseCase: ввод игрока во время вываживания.
+"""
+from apps.game.use_cases.fight_fish import FightFishInput, FightFishUseCase
+from apps.users.models import User
+
+
+def execute(**kwargs):
+    return FightFishUseCase().execute(FightFishInput(user=User(pk=1), **kwargs))
+
+
+def test_input_after_fight_finished_is_dropped():
+    """Бой уже снят с планировщика - не ошибка, а finished."""
+    result = execute(action='reel', value=1.0, fight_key='finished-fight')
+    assert result.success
+    assert result.data.finished
+    assert not result.data.queued
+
+
+def test_unknown_action_fails():
+    result = execute(action='jump', fight_key='fight')
+    assert not result.success
+
+
+def test_input_without_scheduled_fight_fails():
+    """Без планировщика действие некому применить - не теряем его молча."""
+    result = execute(action='reel', value=1.0)
+    assert not result.success
@@ -0,0 +1,123 @@
+"""
+Кадры fight_update: восстановление состояния клиентом.
+
+Состояния реальных боёв проходят через FightStream во всех режимах
+(JSON / бинарный, полные кадры / дельты). FightStreamDecoder должен
+восстанавливать полное состояние на каждом тике, а после потерянного
+кадра - ждать ключевого кадра.
+"""
+import json
+import random
+
+import pytest
+from django.conf import settings
+
+from apps.game.models import FishState
+from apps.game.protocol import FightStream, FightStreamDecoder, fight_state_dict
+from apps.game.services.fight_engine import PlayerAction
+from apps.game.services.update_rate import AdaptiveUpdateRate
+from apps.game.tests.test_batch_fight_engine import RELEASE_TENSION, TICK, make_engine
+
+FIGHTS = 40
+KEYFRAME_INTERVAL = 20
+
+MODES = {
+    'json': dict(binary=False, delta=False),
+    'binary': dict(binary=True, delta=False),
+    'json-delta': dict(binary=False, delta=True),
+    'binary-delta': dict(binary=True, delta=True),
+}
+
+
+@pytest.fixture(scope='module')
+def fights() -> list:
+    """Состояния боёв по тикам."""
+    rng = random.Random(3)
+    fights = []
+    for index in range(FIGHTS):
+        engine = make_engine(index, rng)
+        session = engine.session
+        states = []
+        for _ in range(3000):
+            if session.line_tension > RELEASE_TENSION:
+                engine.process_action(PlayerAction.RELEASE)
+            if session.fish_state != FishState.RUSH:
+                engine.process_action(PlayerAction.REEL, 1.0)
+            state, result = engine.update(TICK)
+            states.append(state)
+            if result:
+                break
+        fights.append(states)
+    return fights
+
+
+def transmit(frame):
+    """Кадр после сокета: JSON приходит как текст."""
+    return frame if isinstance(frame, bytes) else json.loads(json.dumps(frame))
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_decoder_restores_every_tick(fights, mode):
+    stream = FightStream(keyframe_interval=KEYFRAME_INTERVAL, **MODES[mode])
+    decoder = FightStreamDecoder()
+    for states in fights:
+        stream.request_keyframe()
+        for tick, state in enumerate(states):
+            frame = stream.encode(state)
+            if frame is not None:
+                decoder.apply(transmit(frame))
+            assert decoder.state == fight_state_dict(state), tick
+
+
+@pytest.mark.parametrize('mode', ['json-delta', 'binary-delta'])
+def test_lost_frame_waits_for_keyframe(fights, mode):
+    states = max(fights, key=len)
+    assert len(states) > 3 * KEYFRAME_INTERVAL
+
+    stream = FightStream(keyframe_interval=KEYFRAME_INTERVAL, **MODES[mode])
+    decoder = FightStreamDecoder()
+    lost = recovered = False
+    for tick, state in enumerate(states):
+        frame = stream.encode(state)
+        if frame is None:
+            continue
+        if not lost and tick > 2:
+            lost = True  # Кадр потерян
+            continue
+        result = decoder.apply(transmit(frame))
+        if lost and not recovered:
+            if result is None:
+                continue
+            recovered = True
+        if result is not None:
+            assert result == fight_state_dict(state), tick
+
+    assert recovered
+    assert decoder.gaps == 1
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_adaptive_rate_keeps_client_in_sync(fights, mode):
+    stream = FightStream(keyframe_interval=KEYFRAME_INTERVAL, **MODES[mode])
+    rate = AdaptiveUpdateRate(
+        tick=TICK,
+        rates=settings.GAME_FIGHT_SEND_RATES,
+        urgent_tension=settings.GAME_FIGHT_URGENT_TENSION
+    )
+    decoder = FightStreamDecoder()
+    ticks = 0
+    for states in fights:
+        stream.request_keyframe()
+        rate.reset()
+        for state in states:
+            ticks += 1
+            if not rate.should_send(state):
+                continue
+            frame = stream.encode(state)
+            if frame is None:
+                continue
+            rate.record(len(frame) if isinstance(frame, bytes) else len(json.dumps(frame)))
+            assert decoder.apply(transmit(frame)) == fight_state_dict(state)
+
+    # Отправляется не каждый тик
+    assert 0 < rate.stats.frames_sent < ticks
@@ -0,0 +1,130 @@
+"""
+Хранилища живого состояния сессии: in-memory и Redis (через fakeredis).
+"""
+from datetime import timedelta
+
+import fakeredis
+import pytest
+from django.utils import timezone
+
+from apps.game.models import FishState, GameSession, GameState
+from apps.game.services.fight_engine import FightEngine
+from apps.game.services.session_store import InMemorySessionStore, RedisSessionStore
+from core.exceptions import SessionNotFoundError
+
+PLAYER_ID = 7
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def store(request):
+    if request.param == 'memory':
+        return InMemorySessionStore()
+    return RedisSessionStore(client=fakeredis.FakeRedis(), ttl=60)
+
+
+def make_session() -> GameSession:
+    # DjangoJSONEncoder хранит время с точностью до миллисекунд
+    now = timezone.now().replace(microsecond=0)
+    return GameSession(
+        player_id=PLAYER_ID,
+        location_id=3,
+        state=GameState.FIGHTING,
+        cast_distance=25.5,
+        cast_depth=2.25,
+        next_bite_check_time=now + timedelta(seconds=5),
+        hooked_fish_id=4,
+        hooked_fish_weight=1.75,
+        fish_state=FishState.ACTIVE,
+        fish_stamina=80.0,
+        fish_distance=20.0,
+        line_tension=35.5,
+        line_health=100.0,
+        drag_level=0.5,
+        bite_time=now,
+        fight_start_time=now,
+    )
+
+
+def test_round_trip(store):
+    session = make_session()
+    store.save(session)
+
+    loaded = store.get(PLAYER_ID)
+    assert loaded.player_id == PLAYER_ID
+    assert loaded.location_id == 3
+    assert loaded.hooked_fish_id == 4
+    assert loaded.state == GameState.FIGHTING
+    assert loaded.fish_state == FishState.ACTIVE
+    assert loaded.line_tension == 35.5
+    assert loaded.cast_depth == 2.25
+    assert loaded.bite_time == session.bite_time
+    assert loaded.next_bite_check_time == session.next_bite_check_time
+    assert loaded.version == session.version == 1
+
+
+def test_missing_session(store):
+    assert store.get(PLAYER_ID) is None
+
+
+def test_partial_update(store):
+    session = make_session()
+    store.save(session)
+
+    session.line_tension = 60.0
+    session.cast_distance = 1.0
+    store.save(session, update_fields=['line_tension'])
+
+    loaded = store.get(PLAYER_ID)
+    assert loaded.line_tension == 60.0
+    assert loaded.cast_distance == 25.5  # Не в update_fields - не записано
+    assert loaded.version == 2
+    assert abs(loaded.updated_at - session.updated_at) < timedelta(milliseconds=1)
+
+
+def test_partial_update_of_missing_session_is_refused(store):
+    session = make_session()
+    with pytest.raises(SessionNotFoundError):
+        store.save(session, update_fields=FightEngine.CHECKPOINT_FIELDS)
+    assert store.get(PLAYER_ID) is None
+
+
+def test_partial_update_after_expiry_is_refused():
+    client = fakeredis.FakeRedis()
+    store = RedisSessionStore(client=client, ttl=60)
+    session = make_session()
+    store.save(session)
+    # Истечение TTL
+    client.delete(store._key(PLAYER_ID))
+
+    with pytest.raises(SessionNotFoundError):
+        store.save(session, update_fields=FightEngine.CHECKPOINT_FIELDS)
+    assert not client.exists(store._key(PLAYER_ID))
+
+
+def test_redis_save_refreshes_ttl():
+    client = fakeredis.FakeRedis()
+    store = RedisSessionStore(client=client, ttl=60)
+    session = make_session()
+    store.save(session)
+    key = store._key(PLAYER_ID)
+    assert 0 < client.ttl(key) <= 60
+
+    client.expire(key, 5)
+    store.save(session, update_fields=['line_tension'])
+    assert client.ttl(key) > 5
+
+
+def test_checkpoint_of_missing_session_is_skipped(store, monkeypatch):
+    monkeypatch.setattr('apps.game.services.fight_engine.get_session_store', lambda: store)
+    engine = FightEngine.__new__(FightEngine)
+    engine.session = make_session()
+
+    engine.checkpoint()
+    assert store.get(PLAYER_ID) is None
+
+
+@pytest.mark.django_db
+def test_delete(store):
+    store.save(make_session())
+    store.delete(PLAYER_ID)
+    assert store.get(PLAYER_ID) is None
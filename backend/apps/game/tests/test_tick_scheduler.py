@@ -0,0 +1,210 @@
+"""
+TickScheduler: догонка расписания, порядок ввода и рассылка без ожидания.
+
+Шаг в тестах - двоичная дробь (0.25), чтобы накопитель считался точно.
+"""
+import asyncio
+
+from apps.game.models import FishState
+from apps.game.services.fight_engine import FightResult, FightState, PlayerAction
+from apps.game.services.tick_scheduler import TickScheduler
+
+TICK = 0.25
+
+
+class FakeEngine:
+    """Движок, записывающий вызовы; бой заканчивается через finish_after шагов."""
+
+    def __init__(self, log: list = None, finish_after: int = None):
+        self.log = log if log is not None else []
+        self.finish_after = finish_after
+        self.updates = 0
+
+    def process_action(self, action: PlayerAction, value: float = 0):
+        self.log.append((action, value))
+
+    def update(self, dt: float):
+        self.updates += 1
+        self.log.append(('update', dt))
+        state = FightState(
+            fish_state=FishState.ACTIVE, fish_stamina=100 - self.updates, fish_distance=20,
+            fish_direction=0, line_tension=30, line_health=100, drag_level=1.0, is_critical=False,
+        )
+        result = None
+        if self.finish_after is not None and self.updates >= self.finish_after:
+            result = FightResult(success=True, reason='caught')
+        return state, result
+
+
+def make_scheduler(max_catch_up: int = 3) -> TickScheduler:
+    return TickScheduler(tick=TICK, max_catch_up=max_catch_up)
+
+
+def add_fight(scheduler: TickScheduler, key: str, engine: FakeEngine, callback=None) -> None:
+    """Зарегистрировать бой без запуска цикла (advance / step вызываются вручную)."""
+    async def noop(tick):
+        pass
+
+    scheduler._task = asyncio.Future()  # Не даём register() запустить _run
+    scheduler.register(key, engine, callback or noop)
+
+
+def with_loop(test):
+    """register() требует запущенного цикла событий."""
+    def wrapper():
+        async def run():
+            test()
+        asyncio.run(run())
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+
+@with_loop
+def test_late_frame_catches_up_with_fixed_steps():
+    scheduler = make_scheduler()
+    engine = FakeEngine()
+    add_fight(scheduler, 'fight', engine)
+
+    pending, accumulator = scheduler.advance(TICK * 2.5)
+
+    assert engine.updates == 2
+    assert [entry for entry in engine.log if entry[0] == 'update'] == [('update', TICK)] * 2
+    assert accumulator == TICK / 2
+    assert pending['fight'].steps == 2  # Одно обновление за кадр, шаги суммированы
+    assert pending['fight'].state.fish_stamina == 98
+    assert scheduler.metrics.catch_up_steps == 1
+    assert scheduler.metrics.dropped_steps == 0
+
+
+@with_loop
+def test_catch_up_is_limited_and_the_rest_is_dropped():
+    scheduler = make_scheduler(max_catch_up=3)
+    engine = FakeEngine()
+    add_fight(scheduler, 'fight', engine)
+
+    _, accumulator = scheduler.advance(TICK * 7.5)
+
+    assert engine.updates == 3
+    assert scheduler.metrics.catch_up_steps == 2
+    assert scheduler.metrics.dropped_steps == 4
+    assert accumulator == TICK / 2  # Дробная часть шага сохраняется
+
+
+@with_loop
+def test_short_frame_makes_no_step():
+    scheduler = make_scheduler()
+    engine = FakeEngine()
+    add_fight(scheduler, 'fight', engine)
+
+    pending, accumulator = scheduler.advance(TICK / 2)
+    assert pending == {}
+    assert engine.updates == 0
+    assert accumulator == TICK / 2
+
+
+@with_loop
+def test_input_is_applied_before_update():
+    scheduler = make_scheduler()
+    engine = FakeEngine()
+    add_fight(scheduler, 'fight', engine)
+
+    scheduler.submit('fight', PlayerAction.REEL, 0.5)
+    scheduler.submit('fight', PlayerAction.RELEASE)
+    scheduler.submit('fight', PlayerAction.SET_DRAG, 0.3)
+    scheduler.submit('fight', PlayerAction.REEL, 0.8)
+    scheduler.step()
+
+    assert engine.log == [
+        (PlayerAction.SET_DRAG, 0.3),
+        (PlayerAction.RELEASE, 0),
+        (PlayerAction.REEL, 1.0),  # Подмотки слиты, не больше 1.0 за шаг
+        ('update', TICK),
+    ]
+    assert scheduler.metrics.input_messages == 4
+    assert scheduler.metrics.input_actions == 3
+
+    # Ввод после шага ждёт следующего шага
+    scheduler.submit('fight', PlayerAction.HOLD)
+    assert engine.log[-1] == ('update', TICK)
+    scheduler.step()
+    assert engine.log[-2:] == [(PlayerAction.HOLD, 0), ('update', TICK)]
+
+
+@with_loop
+def test_finished_fight_is_removed_at_once():
+    scheduler = make_scheduler()
+    add_fight(scheduler, 'fight', FakeEngine(finish_after=1))
+
+    ticks = scheduler.step()
+    assert ticks['fight'].result.success
+    assert 'fight' not in scheduler
+    assert not scheduler.submit('fight', PlayerAction.REEL, 1.0)
+
+
+def test_slow_send_does_not_delay_other_fights():
+    """Медленный consumer не задерживает шаги и рассылку остальным, его кадры сливаются."""
+    received = {'fast': [], 'slow': []}
+
+    async def scenario():
+        scheduler = TickScheduler(tick=0.01, max_catch_up=5)
+        slow_release = asyncio.Event()
+
+        async def fast(tick):
+            received['fast'].append(tick)
+
+        async def slow(tick):
+            received['slow'].append(tick)
+            await slow_release.wait()
+
+        fast_engine = FakeEngine()
+        slow_engine = FakeEngine(finish_after=20)
+        scheduler.register('fast', fast_engine, fast)
+        scheduler.register('slow', slow_engine, slow)
+
+        async def slow_fight_finished():
+            while 'slow' in scheduler:
+                await asyncio.sleep(0.01)
+
+        # Медленный клиент висит на первом кадре, а его бой идёт до конца
+        await asyncio.wait_for(slow_fight_finished(), timeout=2)
+        assert len(received['slow']) == 1
+        assert len(received['fast']) >= 10
+
+        slow_release.set()
+        for _ in range(100):
+            if len(received['slow']) == 2:
+                break
+            await asyncio.sleep(0.01)
+        scheduler.unregister('fast')
+        await asyncio.sleep(0.05)
+        return scheduler, slow_engine
+
+    scheduler, slow_engine = asyncio.run(scenario())
+
+    # Все кадры за время отправки слиты в один с результатом боя
+    first, last = received['slow']
+    assert last.result is not None
+    assert first.steps + last.steps == slow_engine.updates == 20
+    assert scheduler.metrics.coalesced_updates > 0
+    assert not scheduler._sends
+
+
+def test_unregister_drops_the_queued_frame():
+    received = []
+
+    async def scenario():
+        scheduler = TickScheduler(tick=0.01, max_catch_up=5)
+        release = asyncio.Event()
+
+        async def slow(tick):
+            received.append(tick)
+            await release.wait()
+
+        scheduler.register('fight', FakeEngine(), slow)
+        await asyncio.sleep(0.05)
+        scheduler.unregister('fight')
+        release.set()
+        await asyncio.sleep(0.02)
+
+    asyncio.run(scenario())
+    assert len(received) == 1
@@ -0,0 +1,43 @@
+"""
+AdaptiveUpdateRate с настройками по умолчанию: фазы реально различаются по частоте.
+"""
+from django.conf import settings
+
+from apps.game.models import FishState
+from apps.game.services.fight_engine import FightState
+from apps.game.services.update_rate import AdaptiveUpdateRate
+
+STEPS = 100
+
+
+def state(fish_state: FishState, tension: float = 40) -> FightState:
+    return FightState(
+        fish_state=fish_state, fish_stamina=80, fish_distance=20, fish_direction=0,
+        line_tension=tension, line_health=100, drag_level=1.0, is_critical=False,
+    )
+
+
+def frames_sent(fight_state: FightState) -> int:
+    rate = AdaptiveUpdateRate(
+        tick=settings.GAME_FIGHT_TICK,
+        rates=settings.GAME_FIGHT_SEND_RATES,
+        urgent_tension=settings.GAME_FIGHT_URGENT_TENSION
+    )
+    rate.reset()
+    return sum(rate.should_send(fight_state) for _ in range(STEPS))
+
+
+def test_default_rates_fit_the_tick():
+    """Ни одна частота не срезается частотой шагов молча."""
+    assert max(settings.GAME_FIGHT_SEND_RATES.values()) <= 1 / settings.GAME_FIGHT_TICK
+
+
+def test_urgent_is_sent_more_often_than_normal():
+    calm = frames_sent(state(FishState.PASSIVE))
+    normal = frames_sent(state(FishState.ACTIVE))
+    rush = frames_sent(state(FishState.RUSH))
+    tense = frames_sent(state(FishState.ACTIVE, tension=settings.GAME_FIGHT_URGENT_TENSION))
+
+    assert calm < normal < rush
+    assert rush == tense == STEPS  # Каждый шаг
+    assert normal == STEPS // 2
@@ -0,0 +1,100 @@
+"""
+Отложенная запись итогов боя: время поимки и награда по состоянию в памяти.
+"""
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from apps.fishing.models import CatchRecord, Fish, Location
+from apps.game.models import GameSession, GameState, PendingWrite
+from apps.game.services.fight_engine import FightResult
+from apps.game.services.game_session import GameSessionService
+from apps.game.services.player_context import load_player
+from apps.game.services.write_behind import PlayerWrites, WriteBehindQueue
+from apps.progression.models import PlayerSpeciesStats, PlayerStats
+from apps.users.models import PlayerProfile, User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def player():
+    return User.objects.create_user(username='angler', email='angler@test.test', password='x')
+
+
+@pytest.fixture
+def fish():
+    return Fish.objects.create(
+        name='Окунь', description='', min_weight=0.1, max_weight=2, base_price=10,
+        strength=35, stamina=40, aggressiveness=45, depth_min=1, depth_max=5
+    )
+
+
+@pytest.fixture
+def location():
+    return Location.objects.create(name='Озеро', description='', max_depth=10)
+
+
+def catch(player, fish, location, caught_at, weight=1.0) -> CatchRecord:
+    return CatchRecord(
+        player=player, fish=fish, location=location,
+        weight=weight, price=10, experience=5, caught_at=caught_at
+    )
+
+
+def test_flush_keeps_catch_time(player, fish, location):
+    first = timezone.now() - timedelta(minutes=10)
+    last = first + timedelta(minutes=3)
+    writes = PlayerWrites(player.pk)
+    writes.add_catch(catch(player, fish, location, last, weight=1.5))
+    writes.add_catch(catch(player, fish, location, first))
+
+    queue = WriteBehindQueue()
+    queue.enqueue(writes)
+    assert queue.flush_all() == 1
+
+    assert sorted(CatchRecord.objects.values_list('caught_at', flat=True)) == [first, last]
+    stats = PlayerSpeciesStats.objects.get(player=player, fish=fish)
+    assert (stats.catch_count, stats.max_weight) == (2, 1.5)
+    assert (stats.first_caught_at, stats.last_caught_at) == (first, last)
+
+
+def test_complete_catch_only_journals(player, location, settings):
+    """
+    Перед первой наградой соединения журнал игрока применяется один раз,
+    дальше награда считается в памяти: ни сброса, ни перечитывания профиля.
+    """
+    settings.GAME_WRITE_BEHIND = True
+    service = GameSessionService(player)
+    service.store.save(GameSession(player=player, location=location, state=GameState.FIGHTING))
+    stats = service.progression_service.get_stats()
+    escaped = stats.fish_escaped
+
+    # Награда прошлого соединения ещё ждёт сброса
+    WriteBehindQueue().enqueue(PlayerWrites(player.pk, profile_add={'money': 50}))
+    money = PlayerProfile.objects.get(pk=player.profile.pk).money
+
+    service.complete_catch(FightResult(success=False, reason='fish_escaped'))
+    assert player.profile.money == money + 50
+    assert PendingWrite.objects.count() == 1  # Только запись этого боя
+
+    # Деньги изменены в обход соединения - следующий бой их не перечитывает
+    PlayerProfile.objects.filter(pk=player.profile.pk).update(money=500)
+    session = service.get_session()
+    session.state = GameState.FIGHTING
+    service.store.save(session)
+    reward = service.complete_catch(FightResult(success=False, reason='fish_escaped'))
+    assert reward == {'success': False, 'reason': 'fish_escaped'}
+    assert player.profile.money == money + 50
+    assert stats.fish_escaped == escaped + 2
+    assert PendingWrite.objects.count() == 2
+    assert PlayerStats.objects.get(pk=stats.pk).fish_escaped == escaped
+
+
+def test_load_player_does_not_touch_the_journal(player, settings):
+    settings.GAME_WRITE_BEHIND = True
+    WriteBehindQueue().enqueue(PlayerWrites(player.pk, profile_add={'money': 50}))
+
+    assert load_player(player.pk).profile.money == player.profile.money
+    assert PendingWrite.objects.count() == 1
@@ -2,6 +2,7 @@
 Use Case: Заброс удочки.
 """
 from dataclasses import dataclass
+from typing import Optional
 from core.use_cases import UseCase, UseCaseResult
 from apps.users.models import User
 from apps.game.services.game_session import GameSessionService, CastResult
@@ -13,6 +14,7 @@ class CastLineInput:
     user: User
     power: float  # 0-1
     angle: float  # градусы
+    service: Optional[GameSessionService] = None  # Сервис соединения (PlayerContext)
 
 
 @dataclass
@@ -20,6 +22,7 @@ class CastLineOutput:
     """Результат заброса."""
     distance: float
     depth: float
+    bite_check_in: Optional[float] = None  # Через сколько секунд проверить поклёвку
 
 
 class CastLineUseCase(UseCase[CastLineInput, CastLineOutput]):
@@ -31,11 +34,11 @@ class CastLineUseCase(UseCase[CastLineInput, CastLineOutput]):
     2. Проверить наличие наживки
     3. Рассчитать дистанцию и глубину
     4. Расходовать наживку
-    5. Обновить состояние на WAITING
+    5. Обновить состояние на WAITING и запланировать первую проверку поклёвки
     """
 
     def execute(self, input_data: CastLineInput) -> UseCaseResult[CastLineOutput]:
-        service = GameSessionService(input_data.user)
+        service = input_data.service or GameSessionService(input_data.user)
 
         # Валидация входных данных
         power = max(0, min(1, input_data.power))
@@ -48,5 +51,6 @@ class CastLineUseCase(UseCase[CastLineInput, CastLineOutput]):
 
         return UseCaseResult.ok(CastLineOutput(
             distance=result.distance,
-            depth=result.depth
+            depth=result.depth,
+            bite_check_in=result.bite_check_in
         ))
@@ -2,11 +2,13 @@
 Use Case: Вываживание рыбы.
 """
 from dataclasses import dataclass
-from typing import Optional
+from typing import Hashable, Optional
+from core.catalog import get_catalog
 from core.use_cases import UseCase, UseCaseResult
 from apps.users.models import User
 from apps.game.services.game_session import GameSessionService
 from apps.game.services.fight_engine import FightState, FightResult, PlayerAction
+from apps.game.services.tick_scheduler import get_tick_scheduler
 
 
 @dataclass
@@ -15,14 +17,16 @@ class FightFishInput:
     user: User
     action: str  # reel, release, hold, drag
     value: float = 0  # Параметр действия (скорость, уровень)
+    fight_key: Optional[Hashable] = None  # Ключ боя в TickScheduler: действие ждёт следующего шага
 
 
 @dataclass
 class FightFishOutput:
     """Результат действия при вываживании."""
-    state: FightState
-    finished: bool = False
+    state: Optional[FightState] = None  # None если действие поставлено в очередь тика
+    finished: bool = False  # Бой уже завершён планировщиком - действие не нужно
     result: Optional[dict] = None
+    queued: bool = False
 
 
 class FightFishUseCase(UseCase[FightFishInput, FightFishOutput]):
@@ -31,36 +35,35 @@ class FightFishUseCase(UseCase[FightFishInput, FightFishOutput]):
 
     Принимает действие игрока, обновляет состояние боя,
     проверяет условия завершения.
+
+    Бои ведёт TickScheduler: действие только добавляется в буфер ввода
+    боя fight_key и применяется в начале следующего шага вместе
+    с остальным вводом (см. FightInputBuffer). Если планировщик боя
+    уже не ведёт, бой завершился на последнем шаге, а итоги ещё не
+    записаны - действие отбрасывается с finished=True.
     """
 
     def execute(self, input_data: FightFishInput) -> UseCaseResult[FightFishOutput]:
-        service = GameSessionService(input_data.user)
-
-        engine = service.get_fight_engine()
-        if not engine:
-            return UseCaseResult.fail('Нет активного вываживания')
-
         # Преобразуем строку в enum
         try:
             action = PlayerAction(input_data.action)
         except ValueError:
             return UseCaseResult.fail(f'Неизвестное действие: {input_data.action}')
 
-        # Обрабатываем действие
-        state = engine.process_action(action, input_data.value)
+        # Движок без планировщика никто не сохранит и не продвинет - действие потерялось бы
+        if input_data.fight_key is None:
+            return UseCaseResult.fail('Нет активного вываживания')
 
-        # Состояние будет обновлено в _fight_loop() в consumers.py
-        # Убран двойной вызов update() для исправления скорости симуляции
-        return UseCaseResult.ok(FightFishOutput(
-            state=state,
-            finished=False
-        ))
+        if not get_tick_scheduler().submit(input_data.fight_key, action, input_data.value):
+            return UseCaseResult.ok(FightFishOutput(finished=True))
+        return UseCaseResult.ok(FightFishOutput(queued=True))
 
 
 @dataclass
 class StartFightInput:
     """Входные данные для подсечки."""
     user: User
+    service: Optional[GameSessionService] = None  # Сервис соединения (PlayerContext)
 
 
 @dataclass
@@ -79,13 +82,14 @@ class StartFightUseCase(UseCase[StartFightInput, StartFightOutput]):
     """
 
     def execute(self, input_data: StartFightInput) -> UseCaseResult[StartFightOutput]:
-        service = GameSessionService(input_data.user)
+        service = input_data.service or GameSessionService(input_data.user)
 
         session = service.get_session()
         if not session:
             return UseCaseResult.fail('Нет активной сессии')
 
-        if not session.hooked_fish:
+        fish = get_catalog().get('fish', session.hooked_fish_id)
+        if not fish:
             return UseCaseResult.fail('Нет рыбы на крючке')
 
         success = service.start_fight()
@@ -94,6 +98,6 @@ class StartFightUseCase(UseCase[StartFightInput, StartFightOutput]):
 
         return UseCaseResult.ok(StartFightOutput(
             success=True,
-            fish_name=session.hooked_fish.name,
+            fish_name=fish.name,
             weight=session.hooked_fish_weight
         ))
@@ -8,8 +8,7 @@ from django.utils import timezone
 from django.db import transaction
 from core.use_cases import UseCase, UseCaseResult
 from apps.users.models import User
-from apps.fishing.models import Fish
-from apps.game.models import GameSession
+from apps.game.models import GameState
 from apps.game.services.game_session import GameSessionService
 
 
@@ -17,6 +16,7 @@ from apps.game.services.game_session import GameSessionService
 class HandleBiteInput:
     """Входные данные."""
     user: User
+    service: Optional[GameSessionService] = None  # Сервис соединения (PlayerContext)
 
 
 @dataclass
@@ -25,63 +25,51 @@ class HandleBiteOutput:
     has_bite: bool
     fish_name: Optional[str] = None
     intensity: float = 0  # Интенсивность поклёвки для UI
+    next_check_in: Optional[float] = None  # Через сколько секунд проверить снова (None - не нужно)
 
 
 class HandleBiteUseCase(UseCase[HandleBiteInput, HandleBiteOutput]):
     """
     Use Case: Проверка и обработка поклёвки.
 
-    Вызывается периодически пока состояние WAITING.
-    Если рыба клюнула - переводит в состояние BITE.
+    Вызывается по таймеру в момент next_bite_check_time пока состояние WAITING.
+    Если рыба клюнула - переводит в состояние BITE, иначе возвращает
+    время до следующей проверки.
     """
 
     @transaction.atomic
     def execute(self, input_data: HandleBiteInput) -> UseCaseResult[HandleBiteOutput]:
-        # Используем select_for_update() для предотвращения race conditions
-        try:
-            session = GameSession.objects.select_for_update().get(player=input_data.user)
-        except GameSession.DoesNotExist:
-            return UseCaseResult.ok(HandleBiteOutput(has_bite=False))
+        service = input_data.service or GameSessionService(input_data.user)
 
-        service = GameSessionService(input_data.user)
+        # Блокируем сессию (select_for_update для БД) для предотвращения race conditions
+        session = service.get_session(for_update=True)
+        if not session or session.state != GameState.WAITING:
+            return UseCaseResult.ok(HandleBiteOutput(has_bite=False))
 
         now = timezone.now()
 
-        # Если это первая проверка после заброса - планируем время поклёвки
+        # Проверка ещё не запланирована (например, после ухода рыбы) - планируем
         if not session.next_bite_check_time:
-            bite = service.calculate_bite()
-            if not bite:
-                return UseCaseResult.ok(HandleBiteOutput(has_bite=False))
+            return self._schedule(service, session, now)
 
-            # Запоминаем время следующей проверки
-            session.next_bite_check_time = now + timedelta(seconds=bite.wait_time)
-            session.save()
-            return UseCaseResult.ok(HandleBiteOutput(has_bite=False))
-
-        # Проверяем, пришло ли время поклёвки
+        # Таймер сработал раньше времени - сообщаем, сколько ждать
         if now < session.next_bite_check_time:
-            # Еще не время
-            return UseCaseResult.ok(HandleBiteOutput(has_bite=False))
+            remaining = (session.next_bite_check_time - now).total_seconds()
+            return UseCaseResult.ok(HandleBiteOutput(has_bite=False, next_check_in=remaining))
 
         # Время пришло - рассчитываем поклёвку
-        bite = service.calculate_bite()
+        bite = service.calculate_bite(session)
         if not bite:
             return UseCaseResult.ok(HandleBiteOutput(has_bite=False))
 
         if not bite.will_bite:
             # Рыба не клюнула - планируем следующую проверку
             session.next_bite_check_time = now + timedelta(seconds=bite.wait_time)
-            session.save()
-            return UseCaseResult.ok(HandleBiteOutput(has_bite=False))
-
-        # Рыба клюнула - обрабатываем
-        success = service.handle_bite(bite)
-
-        if success:
-            # Очищаем время проверки
-            session.next_bite_check_time = None
-            session.save()
+            service.save_session(session)
+            return UseCaseResult.ok(HandleBiteOutput(has_bite=False, next_check_in=bite.wait_time))
 
+        # Рыба клюнула - обрабатываем (та же заблокированная сессия, одно сохранение)
+        if service.handle_bite(bite, session):
             return UseCaseResult.ok(HandleBiteOutput(
                 has_bite=True,
                 fish_name=bite.fish.name,
@@ -89,3 +77,13 @@ class HandleBiteUseCase(UseCase[HandleBiteInput, HandleBiteOutput]):
             ))
 
         return UseCaseResult.ok(HandleBiteOutput(has_bite=False))
+
+    def _schedule(self, service: GameSessionService, session, now) -> UseCaseResult[HandleBiteOutput]:
+        """Запланировать следующую проверку поклёвки."""
+        bite = service.calculate_bite(session)
+        if not bite:
+            return UseCaseResult.ok(HandleBiteOutput(has_bite=False))
+
+        session.next_bite_check_time = now + timedelta(seconds=bite.wait_time)
+        service.save_session(session)
+        return UseCaseResult.ok(HandleBiteOutput(has_bite=False, next_check_in=bite.wait_time))
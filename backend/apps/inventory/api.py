@@ -5,9 +5,12 @@ from typing import List, Optional
 from ninja import Router, Schema
 from ninja_jwt.authentication import JWTAuth
 
-from .models import InventoryItem, PlayerEquipment
-from .services import InventoryService
-from core.exceptions import InsufficientFundsError, InsufficientLevelError
+from .services import InventoryService, EquippedItem
+from core.exceptions import (
+    InsufficientFundsError,
+    InsufficientLevelError,
+    EquipmentNotFoundError
+)
 
 router = Router()
 
@@ -50,15 +53,17 @@ class MessageSchema(Schema):
     success: bool
 
 
-def _item_to_schema(inv_item: InventoryItem) -> InventoryItemSchema:
-    """Конвертирует InventoryItem в схему."""
+def _item_to_schema(item: Optional[EquippedItem]) -> Optional[InventoryItemSchema]:
+    """Конвертирует предмет инвентаря (со снастью из справочника) в схему."""
+    if item is None:
+        return None
     return {
-        'id': inv_item.id,
-        'item_type': inv_item.content_type.model,
-        'item_id': inv_item.object_id,
-        'item_name': str(inv_item.item),
-        'quantity': inv_item.quantity,
-        'durability': inv_item.durability,
+        'id': item.inventory_item_id,
+        'item_type': item.item_type,
+        'item_id': item.item_id,
+        'item_name': item.item_name,
+        'quantity': item.quantity,
+        'durability': item.durability,
     }
 
 
@@ -66,31 +71,22 @@ def _item_to_schema(inv_item: InventoryItem) -> InventoryItemSchema:
 def list_inventory(request):
     """Получить инвентарь игрока."""
     service = InventoryService(request.auth)
-    items = service.get_inventory()
-    return [_item_to_schema(item) for item in items]
+    items = [service.resolve_item(item) for item in service.get_inventory()]
+    return [_item_to_schema(item) for item in items if item]
 
 
 @router.get('/equipment', response=EquipmentSchema, auth=JWTAuth())
 def get_equipment(request):
     """Получить текущую экипировку."""
     service = InventoryService(request.auth)
-    equipment = service.get_equipment()
-
-    if not equipment:
-        return {
-            'rod': None,
-            'reel': None,
-            'line': None,
-            'bait': None,
-            'is_complete': False,
-        }
+    loadout = service.get_loadout()
 
     return {
-        'rod': _item_to_schema(equipment.rod) if equipment.rod else None,
-        'reel': _item_to_schema(equipment.reel) if equipment.reel else None,
-        'line': _item_to_schema(equipment.line) if equipment.line else None,
-        'bait': _item_to_schema(equipment.bait) if equipment.bait else None,
-        'is_complete': equipment.is_complete(),
+        'rod': _item_to_schema(loadout.rod),
+        'reel': _item_to_schema(loadout.reel),
+        'line': _item_to_schema(loadout.line),
+        'bait': _item_to_schema(loadout.bait),
+        'is_complete': loadout.is_complete,
     }
 
 
@@ -105,6 +101,8 @@ def purchase_item(request, data: PurchaseSchema):
         return 400, {'message': str(e), 'success': False}
     except InsufficientLevelError as e:
         return 400, {'message': str(e), 'success': False}
+    except EquipmentNotFoundError as e:
+        return 400, {'message': str(e), 'success': False}
 
 
 @router.post('/equip', response={200: MessageSchema, 400: MessageSchema}, auth=JWTAuth())
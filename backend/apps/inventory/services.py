@@ -1,12 +1,18 @@
 """
 Сервисы для работы с инвентарём.
 """
-from typing import Optional
+from dataclasses import dataclass, replace
+from typing import Optional, Union
 from django.db import transaction
 from django.contrib.contenttypes.models import ContentType
 
 from apps.users.models import User
 from apps.equipment.models import Rod, Reel, Line, Bait
+from apps.equipment.catalog import (
+    RodEntry, ReelEntry, LineEntry, BaitEntry, EQUIPMENT_TABLES
+)
+from core.catalog import get_catalog
+from core.counters import CounterUpdate
 from core.exceptions import (
     InsufficientFundsError,
     InsufficientLevelError,
@@ -15,12 +21,50 @@ from core.exceptions import (
 from .models import InventoryItem, PlayerEquipment
 
 
+CatalogItem = Union[RodEntry, ReelEntry, LineEntry, BaitEntry]
+
+
+@dataclass(frozen=True)
+class EquippedItem:
+    """Экипированный предмет: запись инвентаря и снасть из справочника."""
+    inventory_item_id: int
+    item_type: str
+    item_id: int
+    item_name: str
+    quantity: int
+    durability: int
+    item: CatalogItem
+
+
+@dataclass(frozen=True)
+class Loadout:
+    """Снаряжение игрока, загруженное одним запросом."""
+    rod: Optional[EquippedItem] = None
+    reel: Optional[EquippedItem] = None
+    line: Optional[EquippedItem] = None
+    bait: Optional[EquippedItem] = None
+
+    @property
+    def is_complete(self) -> bool:
+        """Всё снаряжение экипировано."""
+        return all([self.rod, self.reel, self.line, self.bait])
+
+
+LOADOUT_SLOTS = ('rod', 'reel', 'line', 'bait')
+
+
+def _item_type(inv_item: InventoryItem) -> str:
+    """Тип предмета инвентаря (rod, reel, line, bait) по ContentType из кэша."""
+    return ContentType.objects.get_for_id(inv_item.content_type_id).model
+
+
 class InventoryService:
     """Сервис для управления инвентарём игрока."""
 
     def __init__(self, user: User):
         self.user = user
         self.profile = user.profile
+        self._loadout: Optional[Loadout] = None
 
     @transaction.atomic
     def purchase_item(self, item_type: str, item_id: int, quantity: int = 1) -> InventoryItem:
@@ -50,7 +94,9 @@ class InventoryService:
         if not model:
             raise ValueError(f'Неизвестный тип предмета: {item_type}')
 
-        item = model.objects.get(pk=item_id)
+        item = get_catalog().get(EQUIPMENT_TABLES[item_type], item_id)
+        if item is None:
+            raise EquipmentNotFoundError('Предмет не найден')
 
         # Проверка уровня
         if item.required_level > self.profile.level:
@@ -67,9 +113,13 @@ class InventoryService:
                 f'Недостаточно денег. Нужно: {total_price}, есть: {self.profile.money}'
             )
 
-        # Списываем деньги
-        self.profile.money -= total_price
-        self.profile.save()
+        # Списываем деньги одним UPDATE: условие money >= цены проверяет БД,
+        # поэтому параллельные начисления и покупки не теряются
+        payment = CounterUpdate.for_instance(self.profile)
+        payment.add('money', -total_price).require(money__gte=total_price)
+        if not payment.execute():
+            raise InsufficientFundsError('Недостаточно денег')
+        payment.apply_to(self.profile)
 
         # Добавляем в инвентарь
         content_type = ContentType.objects.get_for_model(model)
@@ -105,6 +155,9 @@ class InventoryService:
         except InventoryItem.DoesNotExist:
             raise EquipmentNotFoundError('Предмет не найден в инвентаре')
 
+        if slot in LOADOUT_SLOTS and _item_type(inv_item) != slot:
+            raise ValueError(f'Предмет нельзя экипировать в слот {slot}')
+
         # Получаем или создаём экипировку
         equipment, _ = PlayerEquipment.objects.get_or_create(player=self.user)
 
@@ -121,6 +174,7 @@ class InventoryService:
             raise ValueError(f'Неизвестный слот: {slot}')
 
         equipment.save()
+        self._loadout = None
 
     def get_inventory(self) -> list[InventoryItem]:
         """Получить весь инвентарь игрока."""
@@ -136,6 +190,72 @@ class InventoryService:
         except PlayerEquipment.DoesNotExist:
             return None
 
+    def get_loadout(self, refresh: bool = False) -> Loadout:
+        """
+        Получить снаряжение игрока со снастями из справочника.
+
+        Один запрос: записи инвентаря подтягиваются через select_related,
+        снасти берутся из справочника в памяти (core.catalog), поэтому
+        GenericForeignKey не разрешается.
+
+        Результат запоминается в экземпляре сервиса (игровое соединение
+        держит один сервис всё время, см. PlayerContext). equip_item() и
+        consume_bait() обновляют его сами, refresh=True перечитывает из БД.
+        """
+        if self._loadout is None or refresh:
+            equipment = (
+                PlayerEquipment.objects
+                .filter(player=self.user)
+                .select_related(*LOADOUT_SLOTS)
+                .first()
+            )
+            self.set_equipment(equipment)
+        return self._loadout
+
+    def set_equipment(self, equipment: Optional[PlayerEquipment]) -> None:
+        """Использовать уже загруженную экипировку (со слотами через select_related)."""
+        if not equipment:
+            self._loadout = Loadout()
+            return
+
+        self._loadout = Loadout(**{
+            slot: self.resolve_item(getattr(equipment, slot), slot)
+            for slot in LOADOUT_SLOTS
+        })
+
+    def resolve_item(
+        self,
+        inv_item: Optional[InventoryItem],
+        slot: Optional[str] = None
+    ) -> Optional[EquippedItem]:
+        """
+        Дополнить запись инвентаря снастью из справочника.
+
+        Возвращает None, если снасти нет в справочнике или (при заданном
+        slot) предмет другого типа - например, катушка в слоте удочки,
+        записанная в обход equip_item(). Такой слот считается пустым.
+        """
+        if inv_item is None:
+            return None
+
+        item_type = _item_type(inv_item)
+        if item_type not in EQUIPMENT_TABLES or (slot is not None and item_type != slot):
+            return None
+
+        item = get_catalog().get(EQUIPMENT_TABLES[item_type], inv_item.object_id)
+        if item is None:
+            return None
+
+        return EquippedItem(
+            inventory_item_id=inv_item.id,
+            item_type=item_type,
+            item_id=inv_item.object_id,
+            item_name=str(item),
+            quantity=inv_item.quantity,
+            durability=inv_item.durability,
+            item=item
+        )
+
     @transaction.atomic
     def consume_bait(self) -> bool:
         """
@@ -153,11 +273,11 @@ class InventoryService:
         except PlayerEquipment.DoesNotExist:
             return False
 
-        if not equipment.bait:
+        if not equipment.bait_id:
             return False
 
         # Блокируем bait_item для обновления
-        bait_item = InventoryItem.objects.select_for_update().get(pk=equipment.bait.pk)
+        bait_item = InventoryItem.objects.select_for_update().get(pk=equipment.bait_id)
 
         if bait_item.quantity <= 0:
             return False
@@ -173,7 +293,21 @@ class InventoryService:
             # Наживка закончилась
             equipment.bait = None
             equipment.save()
+            self._set_bait(bait_item.pk, None)
             bait_item.delete()
             return False
 
+        self._set_bait(bait_item.pk, bait_item.quantity)
         return True
+
+    def _set_bait(self, inventory_item_id: int, quantity: Optional[int]) -> None:
+        """Обновить наживку в запомненном снаряжении (None - наживка закончилась)."""
+        loadout = self._loadout
+        if loadout is None:
+            return
+        if loadout.bait is None or loadout.bait.inventory_item_id != inventory_item_id:
+            # Снаряжение поменяли в обход сервиса - перечитаем при следующем обращении
+            self._loadout = None
+            return
+        bait = replace(loadout.bait, quantity=quantity) if quantity is not None else None
+        self._loadout = replace(loadout, bait=bait)
@@ -0,0 +1,64 @@
+"""
+Снаряжение игрока: предмет чужого типа не попадает в слот.
+"""
+import pytest
+from django.contrib.contenttypes.models import ContentType
+
+from apps.equipment.models import Reel, Rod
+from apps.inventory.models import InventoryItem, PlayerEquipment
+from apps.inventory.services import InventoryService
+from apps.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def player():
+    return User.objects.create_user(username='angler', email='angler@test.test', password='x')
+
+
+def make_item(player, model) -> InventoryItem:
+    return InventoryItem.objects.create(
+        player=player,
+        content_type=ContentType.objects.get_for_model(model),
+        object_id=1
+    )
+
+
+def test_equip_item_rejects_wrong_slot(player):
+    reel = make_item(player, Reel)
+    with pytest.raises(ValueError):
+        InventoryService(player).equip_item(reel.pk, 'rod')
+    assert not PlayerEquipment.objects.filter(player=player, rod=reel).exists()
+
+
+def test_wrong_item_type_in_slot_is_empty(player):
+    reel = make_item(player, Reel)
+    # Запись в обход equip_item()
+    PlayerEquipment.objects.create(player=player, rod=reel)
+
+    loadout = InventoryService(player).get_loadout()
+    assert loadout.rod is None
+    assert not loadout.is_complete
+
+
+def test_resolve_item_checks_slot(player):
+    rod = make_item(player, Rod)
+    service = InventoryService(player)
+    assert service.resolve_item(rod, 'reel') is None
+    assert service.resolve_item(None, 'rod') is None
+
+
+def test_rod_in_rod_slot_is_resolved(player):
+    rod = Rod.objects.create(name='Удочка', power=40, sensitivity=50, max_line_weight=5, price=100)
+    item = InventoryItem.objects.create(
+        player=player,
+        content_type=ContentType.objects.get_for_model(Rod),
+        object_id=rod.pk
+    )
+    service = InventoryService(player)
+    service.equip_item(item.pk, 'rod')
+
+    loadout = service.get_loadout()
+    assert loadout.rod.inventory_item_id == item.pk
+    assert loadout.rod.item.power == 40
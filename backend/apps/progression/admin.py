@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Achievement, PlayerAchievement, PlayerStats
+from .models import Achievement, PlayerAchievement, PlayerSpeciesStats, PlayerStats
 
 
 @admin.register(Achievement)
@@ -28,3 +28,10 @@ class PlayerStatsAdmin(admin.ModelAdmin):
         'catch_rate', 'legendary_caught'
     ]
     search_fields = ['player__username']
+
+
+@admin.register(PlayerSpeciesStats)
+class PlayerSpeciesStatsAdmin(admin.ModelAdmin):
+    list_display = ['player', 'fish', 'catch_count', 'max_weight', 'last_caught_at']
+    list_filter = ['fish']
+    search_fields = ['player__username', 'fish__name']
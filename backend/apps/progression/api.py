@@ -1,10 +1,16 @@
 """
 API эндпоинты прогрессии.
 """
+from datetime import datetime
 from typing import List, Optional
 from ninja import Router, Schema
 from ninja_jwt.authentication import JWTAuth
 
+from django.utils import timezone
+
+from apps.users.models import User
+from core.catalog import get_catalog
+from .leaderboards import BOARDS, FISH, GLOBAL, LOCATION, WEEK, Board, get_leaderboards, week_id
 from .services import ProgressionService
 
 router = Router()
@@ -38,6 +44,53 @@ class StatsSchema(Schema):
     longest_fight_seconds: int
     fastest_catch_seconds: int
     total_play_time_seconds: int
+    species_caught: int
+
+
+class SpeciesStatsSchema(Schema):
+    """Схема уловов по виду рыбы."""
+    fish_id: int
+    fish_name: str
+    rarity: str
+    catch_count: int
+    total_weight: float
+    max_weight: float
+    first_caught_at: datetime
+    last_caught_at: datetime
+
+
+class LeaderboardEntrySchema(Schema):
+    """Место в таблице рекордов."""
+    rank: int
+    player_id: int
+    username: str
+    score: float
+
+
+class LeaderboardRankSchema(Schema):
+    """Место текущего игрока."""
+    rank: int
+    score: float
+
+
+class LeaderboardSchema(Schema):
+    """Окно таблицы рекордов."""
+    board: str
+    total: int
+    me: Optional[LeaderboardRankSchema] = None
+    entries: List[LeaderboardEntrySchema]
+    available: bool = True  # False - хранилище таблиц недоступно, страница пустая
+
+
+class LeaderboardInfoSchema(Schema):
+    """Метрика таблицы рекордов и её области."""
+    metric: str
+    scopes: List[str]
+
+
+class MessageSchema(Schema):
+    """Схема сообщения об ошибке."""
+    message: str
 
 
 @router.get('/achievements', response=List[AchievementSchema], auth=JWTAuth())
@@ -66,4 +119,112 @@ def get_stats(request):
         'longest_fight_seconds': stats.longest_fight_seconds,
         'fastest_catch_seconds': stats.fastest_catch_seconds,
         'total_play_time_seconds': stats.total_play_time_seconds,
+        'species_caught': len(service.get_species_stats()),
     }
+
+
+@router.get('/species', response=List[SpeciesStatsSchema], auth=JWTAuth())
+def list_species(request):
+    """Получить уловы игрока по видам рыбы (коллекция)."""
+    service = ProgressionService(request.auth)
+    catalog = get_catalog()
+    result = []
+    for species in service.get_species_stats().values():
+        fish = catalog.get('fish', species.fish_id)
+        if fish is None:
+            continue
+        result.append({
+            'fish_id': fish.id,
+            'fish_name': fish.name,
+            'rarity': fish.rarity,
+            'catch_count': species.catch_count,
+            'total_weight': round(species.total_weight, 2),
+            'max_weight': species.max_weight,
+            'first_caught_at': species.first_caught_at,
+            'last_caught_at': species.last_caught_at,
+        })
+    result.sort(key=lambda item: (-item['catch_count'], item['fish_name']))
+    return result
+
+
+@router.get('/leaderboards', response=List[LeaderboardInfoSchema], auth=JWTAuth())
+def list_leaderboards(request):
+    """Получить список таблиц рекордов (метрики и области)."""
+    return [{'metric': metric, 'scopes': list(scopes)} for metric, scopes in BOARDS.items()]
+
+
+def _board(metric: str, location_id: Optional[int], fish_id: Optional[int], weekly: bool) -> Board:
+    """Таблица по параметрам запроса: не больше одной области."""
+    scopes = [
+        (LOCATION, location_id) if location_id is not None else None,
+        (FISH, fish_id) if fish_id is not None else None,
+        (WEEK, week_id(timezone.localdate())) if weekly else None,
+    ]
+    scopes = [scope for scope in scopes if scope is not None]
+    if len(scopes) > 1:
+        raise ValueError('Укажите только одну область: location_id, fish_id или weekly')
+    if not scopes:
+        return Board(metric, GLOBAL)
+    scope, scope_id = scopes[0]
+    return Board(metric, scope, str(scope_id))
+
+
+def _with_usernames(page: dict) -> dict:
+    """Добавить имена игроков и округлить очки."""
+    ids = [entry['player_id'] for entry in page['entries']]
+    names = dict(User.objects.filter(pk__in=ids).values_list('id', 'username'))
+    for entry in page['entries']:
+        entry['username'] = names.get(entry['player_id'], '')
+        entry['score'] = round(entry['score'], 2)
+    if page.get('me'):
+        page['me']['score'] = round(page['me']['score'], 2)
+    return page
+
+
+@router.get(
+    '/leaderboards/{metric}',
+    response={200: LeaderboardSchema, 400: MessageSchema},
+    auth=JWTAuth()
+)
+def leaderboard_around_me(
+    request,
+    metric: str,
+    location_id: Optional[int] = None,
+    fish_id: Optional[int] = None,
+    weekly: bool = False,
+    around: int = 5
+):
+    """
+    Получить окно таблицы рекордов вокруг текущего игрока.
+
+    Без параметров - общая таблица; location_id, fish_id или weekly=true
+    выбирают таблицу локации, вида рыбы или текущей недели.
+    """
+    try:
+        board = _board(metric, location_id, fish_id, weekly)
+    except ValueError as e:
+        return 400, {'message': str(e)}
+    around = max(0, min(around, 25))
+    return _with_usernames(get_leaderboards().around(board, request.auth.pk, around))
+
+
+@router.get(
+    '/leaderboards/{metric}/top',
+    response={200: LeaderboardSchema, 400: MessageSchema},
+    auth=JWTAuth()
+)
+def leaderboard_top(
+    request,
+    metric: str,
+    location_id: Optional[int] = None,
+    fish_id: Optional[int] = None,
+    weekly: bool = False,
+    limit: int = 10
+):
+    """Получить первые места таблицы рекордов."""
+    try:
+        board = _board(metric, location_id, fish_id, weekly)
+    except ValueError as e:
+        return 400, {'message': str(e)}
+    limit = max(1, min(limit, 100))
+    return _with_usernames(get_leaderboards().top(board, limit))
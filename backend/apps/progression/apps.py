@@ -5,3 +5,7 @@ class ProgressionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.progression'
     verbose_name = 'Прогрессия'
+
+    def ready(self):
+        # Регистрируем достижения в справочнике
+        import apps.progression.catalog  # noqa: F401
@@ -0,0 +1,106 @@
+"""
+Достижения в справочнике процесса.
+
+Неизменяемые копии строк Achievement (core.catalog) и индекс по ключу
+(тип, редкость, рыба): событие игрока затрагивает только достижения
+своих ключей. Регистрируется в ProgressionConfig.ready().
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from core.catalog import get_catalog, registry
+from .models import Achievement, AchievementType
+
+# (тип, редкость, id рыбы) - редкость и рыба только у типов, где они важны
+AchievementKey = Tuple[str, str, Optional[int]]
+
+
+def achievement_key(
+    achievement_type: str,
+    target_rarity: str = '',
+    target_fish_id: Optional[int] = None
+) -> AchievementKey:
+    """Ключ индекса для типа достижения и его цели."""
+    return (
+        achievement_type,
+        target_rarity if achievement_type == AchievementType.CATCH_RARITY else '',
+        target_fish_id if achievement_type == AchievementType.CATCH_SPECIES else None,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class AchievementEntry:
+    """Достижение."""
+    id: int
+    name: str
+    description: str
+    icon: Optional[str]
+    achievement_type: str
+    target_value: int
+    target_fish_id: Optional[int]
+    target_location_id: Optional[int]
+    target_rarity: str
+    reward_money: int
+    reward_experience: int
+    is_hidden: bool
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def key(self) -> AchievementKey:
+        return achievement_key(self.achievement_type, self.target_rarity, self.target_fish_id)
+
+    @classmethod
+    def from_model(cls, achievement: Achievement) -> 'AchievementEntry':
+        return cls(
+            id=achievement.id, name=achievement.name,
+            description=achievement.description,
+            icon=achievement.icon.url if achievement.icon else None,
+            achievement_type=achievement.achievement_type,
+            target_value=achievement.target_value,
+            target_fish_id=achievement.target_fish_id,
+            target_location_id=achievement.target_location_id,
+            target_rarity=achievement.target_rarity,
+            reward_money=achievement.reward_money,
+            reward_experience=achievement.reward_experience,
+            is_hidden=achievement.is_hidden,
+        )
+
+
+class AchievementIndex:
+    """Достижения по ключу, отсортированные по целевому значению."""
+
+    def __init__(self, entries: Iterable[AchievementEntry]):
+        groups: Dict[AchievementKey, list] = defaultdict(list)
+        for entry in entries:
+            groups[entry.key].append(entry)
+        self._entries = {
+            key: tuple(sorted(group, key=lambda e: e.target_value))
+            for key, group in groups.items()
+        }
+        self._targets = {
+            key: [entry.target_value for entry in group]
+            for key, group in self._entries.items()
+        }
+
+    def reached(self, key: AchievementKey, progress: int) -> Tuple[AchievementEntry, ...]:
+        """Достижения ключа, цель которых не больше progress."""
+        targets = self._targets.get(key)
+        if not targets:
+            return ()
+        return self._entries[key][:bisect_right(targets, progress)]
+
+
+def get_achievement_index() -> AchievementIndex:
+    """Индекс достижений текущего снимка справочника."""
+    catalog = get_catalog()
+    return catalog.derived(
+        'achievement_index',
+        lambda: AchievementIndex(catalog.all('achievements'))
+    )
+
+
+registry.register('achievements', Achievement.objects.all(), AchievementEntry.from_model)
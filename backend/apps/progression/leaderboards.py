@@ -0,0 +1,364 @@
+"""
+Таблицы рекордов (leaderboards).
+
+Каждая таблица - sorted set: игрок -> очки. Поимка обновляет все
+затронутые таблицы за O(log n) на каждую (ZINCRBY / ZADD GT / ZADD),
+чтение места игрока и окна вокруг него - ZREVRANK + ZREVRANGE, без
+ORDER BY по таблицам игроков.
+
+Таблицы (метрика: области):
+- weight - общий вес улова: global, location, week (неделя ISO)
+- biggest - самая крупная рыба: global, location, fish
+- level - уровень с долей опыта до следующего: global
+
+Хранилище задаётся в LEADERBOARD_STORE:
+- RedisLeaderboardStore - Redis sorted sets (production)
+- InMemoryLeaderboardStore - память процесса (разработка, тесты)
+
+Таблицы - производные данные: при ошибке Redis поимка не падает,
+а команда rebuild_leaderboards пересобирает их из БД; чтение отдаёт
+пустую страницу с available=False.
+"""
+import logging
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+WEIGHT = 'weight'
+BIGGEST = 'biggest'
+LEVEL = 'level'
+
+GLOBAL = 'global'
+LOCATION = 'location'
+FISH = 'fish'
+WEEK = 'week'
+
+# Метрика -> допустимые области
+BOARDS = {
+    WEIGHT: (GLOBAL, LOCATION, WEEK),
+    BIGGEST: (GLOBAL, LOCATION, FISH),
+    LEVEL: (GLOBAL,),
+}
+
+# Изменение таблицы: (операция, таблица, игрок, значение)
+#   add - прибавить, max - оставить большее, set - заменить
+Change = Tuple[str, str, int, float]
+
+
+def week_id(day: date) -> str:
+    """Неделя ISO: '2026-W42'."""
+    year, week, _ = day.isocalendar()
+    return f'{year}-W{week:02d}'
+
+
+@dataclass(frozen=True)
+class Board:
+    """Таблица рекордов: метрика и область (scope_id - id локации/рыбы или неделя)."""
+    metric: str
+    scope: str = GLOBAL
+    scope_id: Optional[str] = None
+
+    def __post_init__(self):
+        if self.scope not in BOARDS.get(self.metric, ()):
+            raise ValueError(f'Нет таблицы {self.metric} для области {self.scope}')
+        if (self.scope == GLOBAL) != (self.scope_id is None):
+            raise ValueError(f'Неверная область таблицы: {self.scope} {self.scope_id}')
+
+    @property
+    def key(self) -> str:
+        if self.scope == GLOBAL:
+            return f'{self.metric}:{GLOBAL}'
+        return f'{self.metric}:{self.scope}:{self.scope_id}'
+
+
+def level_score(level: int, experience: int, experience_for_level: int) -> float:
+    """Уровень с долей опыта до следующего: 12.45 - 45% пути к 13-му."""
+    return level + min(experience / experience_for_level, 0.99) if experience_for_level else level
+
+
+class LeaderboardStore(ABC):
+    """
+    Интерфейс хранилища таблиц (sorted sets, места с 0 по убыванию очков).
+
+    Равные очки упорядочены как в Redis ZREVRANGE: по игроку как строке
+    по убыванию ('9' выше '10').
+    """
+
+    # Ошибки хранилища, при которых чтение отдаёт пустую страницу
+    errors: Tuple[type, ...] = ()
+
+    @abstractmethod
+    def apply(self, changes: Iterable[Change], ttl: Dict[str, int]) -> None:
+        """Применить изменения; ttl - время жизни таблиц (сек) по ключу."""
+
+    @abstractmethod
+    def rank(self, key: str, player_id: int) -> Optional[int]:
+        """Место игрока (0 - первое) или None."""
+
+    @abstractmethod
+    def score(self, key: str, player_id: int) -> Optional[float]:
+        """Очки игрока или None."""
+
+    @abstractmethod
+    def range(self, key: str, start: int, stop: int) -> List[Tuple[int, float]]:
+        """Игроки на местах start..stop включительно: [(player_id, очки)]."""
+
+    @abstractmethod
+    def size(self, key: str) -> int:
+        """Число игроков в таблице."""
+
+    @abstractmethod
+    def replace(self, key: str, scores: Dict[int, float], ttl: Optional[int] = None) -> None:
+        """Заменить таблицу целиком (пересборка)."""
+
+
+class _SortedSet:
+    """
+    Sorted set в памяти: словарь очков и список (очки, игрок как строка).
+
+    Список упорядочен как sorted set Redis по возрастанию; места по
+    убыванию очков (ZREVRANK, ZREVRANGE) отсчитываются с его конца.
+    """
+
+    def __init__(self, scores: Optional[Dict[int, float]] = None):
+        self.scores: Dict[int, float] = dict(scores or {})
+        self.order: List[Tuple[float, str]] = sorted(
+            (score, str(member)) for member, score in self.scores.items()
+        )
+
+    def set(self, member: int, score: float) -> None:
+        old = self.scores.get(member)
+        if old is not None:
+            del self.order[bisect_left(self.order, (old, str(member)))]
+        self.scores[member] = score
+        insort(self.order, (score, str(member)))
+
+    def rank(self, member: int) -> Optional[int]:
+        score = self.scores.get(member)
+        if score is None:
+            return None
+        return len(self.order) - 1 - bisect_left(self.order, (score, str(member)))
+
+    def range(self, start: int, stop: int) -> List[Tuple[int, float]]:
+        """Места start..stop по убыванию очков."""
+        size = len(self.order)
+        rows = self.order[max(size - 1 - stop, 0):max(size - start, 0)]
+        return [(int(member), score) for score, member in reversed(rows)]
+
+
+class InMemoryLeaderboardStore(LeaderboardStore):
+    """
+    Таблицы в памяти процесса.
+
+    Для разработки и тестов: другие воркеры таблиц не видят, ttl не учитывается.
+    """
+
+    def __init__(self):
+        self._sets: Dict[str, _SortedSet] = {}
+
+    def apply(self, changes: Iterable[Change], ttl: Dict[str, int]) -> None:
+        for op, key, member, value in changes:
+            board = self._sets.setdefault(key, _SortedSet())
+            old = board.scores.get(member)
+            if op == 'add':
+                board.set(member, (old or 0) + value)
+            elif op == 'max':
+                if old is None or value > old:
+                    board.set(member, value)
+            else:
+                board.set(member, value)
+
+    def rank(self, key: str, player_id: int) -> Optional[int]:
+        board = self._sets.get(key)
+        return board.rank(player_id) if board else None
+
+    def score(self, key: str, player_id: int) -> Optional[float]:
+        board = self._sets.get(key)
+        return board.scores.get(player_id) if board else None
+
+    def range(self, key: str, start: int, stop: int) -> List[Tuple[int, float]]:
+        board = self._sets.get(key)
+        return board.range(start, stop) if board else []
+
+    def size(self, key: str) -> int:
+        board = self._sets.get(key)
+        return len(board.scores) if board else 0
+
+    def replace(self, key: str, scores: Dict[int, float], ttl: Optional[int] = None) -> None:
+        self._sets[key] = _SortedSet(scores)
+
+
+class RedisLeaderboardStore(LeaderboardStore):
+    """
+    Таблицы в Redis sorted sets `<prefix><key>` (нужен Redis 6.2+ для ZADD GT).
+
+    Клиент можно передать явно (например fakeredis.FakeRedis() в тестах),
+    иначе он создаётся по url.
+    """
+
+    def __init__(self, url: str = 'redis://localhost:6379/0', prefix: str = 'lb:', client=None):
+        import redis
+
+        if client is None:
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.errors = (redis.RedisError,)
+
+    def _key(self, key: str) -> str:
+        return f'{self.prefix}{key}'
+
+    def apply(self, changes: Iterable[Change], ttl: Dict[str, int]) -> None:
+        # Все изменения поимки - один round trip
+        pipe = self.client.pipeline(transaction=False)
+        for op, key, member, value in changes:
+            if op == 'add':
+                pipe.zincrby(self._key(key), value, member)
+            elif op == 'max':
+                pipe.zadd(self._key(key), {member: value}, gt=True)
+            else:
+                pipe.zadd(self._key(key), {member: value})
+        for key, seconds in ttl.items():
+            pipe.expire(self._key(key), seconds)
+        pipe.execute()
+
+    def rank(self, key: str, player_id: int) -> Optional[int]:
+        return self.client.zrevrank(self._key(key), player_id)
+
+    def score(self, key: str, player_id: int) -> Optional[float]:
+        return self.client.zscore(self._key(key), player_id)
+
+    def range(self, key: str, start: int, stop: int) -> List[Tuple[int, float]]:
+        rows = self.client.zrevrange(self._key(key), start, stop, withscores=True)
+        return [(int(member), score) for member, score in rows]
+
+    def size(self, key: str) -> int:
+        return self.client.zcard(self._key(key))
+
+    def replace(self, key: str, scores: Dict[int, float], ttl: Optional[int] = None) -> None:
+        # Новая таблица собирается рядом и подменяет старую атомарно (RENAME)
+        target = self._key(key)
+        if not scores:
+            self.client.delete(target)
+            return
+        temp = f'{target}:rebuild'
+        pipe = self.client.pipeline()
+        pipe.delete(temp)
+        pipe.zadd(temp, scores)
+        pipe.rename(temp, target)
+        if ttl:
+            pipe.expire(target, ttl)
+        pipe.execute()
+
+
+class Leaderboards:
+    """Обновление и чтение таблиц рекордов."""
+
+    def __init__(self, store: LeaderboardStore, weeks_kept: int = 5):
+        self.store = store
+        self.week_ttl = weeks_kept * 7 * 24 * 60 * 60
+
+    def record_catch(
+        self,
+        player_id: int,
+        fish_id: int,
+        location_id: int,
+        weight: float,
+        level: float,
+        day: Optional[date] = None
+    ) -> None:
+        """
+        Учесть поимку во всех затронутых таблицах.
+
+        Args:
+            level: Очки таблицы уровня после поимки (level_score)
+            day: День поимки (по умолчанию - сегодня)
+        """
+        week = Board(WEIGHT, WEEK, week_id(day or timezone.localdate()))
+        changes = [
+            ('add', Board(WEIGHT).key, player_id, weight),
+            ('add', Board(WEIGHT, LOCATION, str(location_id)).key, player_id, weight),
+            ('add', week.key, player_id, weight),
+            ('max', Board(BIGGEST).key, player_id, weight),
+            ('max', Board(BIGGEST, LOCATION, str(location_id)).key, player_id, weight),
+            ('max', Board(BIGGEST, FISH, str(fish_id)).key, player_id, weight),
+            ('set', Board(LEVEL).key, player_id, level),
+        ]
+        try:
+            self.store.apply(changes, ttl={week.key: self.week_ttl})
+        except Exception:
+            # Таблицы восстановит rebuild_leaderboards
+            logger.exception('Ошибка обновления таблиц рекордов')
+
+    def top(self, board: Board, limit: int = 10) -> dict:
+        """Первые limit мест."""
+        try:
+            return self._page(board, 0, limit - 1)
+        except self.store.errors:
+            logger.exception('Ошибка чтения таблицы рекордов')
+            return self._unavailable(board)
+
+    def around(self, board: Board, player_id: int, around: int = 5) -> dict:
+        """
+        Окно вокруг игрока: around мест выше и ниже.
+
+        Если игрока нет в таблице - первые 2 * around + 1 мест.
+        """
+        try:
+            return self._around(board, player_id, around)
+        except self.store.errors:
+            logger.exception('Ошибка чтения таблицы рекордов')
+            return self._unavailable(board)
+
+    def _around(self, board: Board, player_id: int, around: int) -> dict:
+        rank = self.store.rank(board.key, player_id)
+        start = max(0, rank - around) if rank is not None else 0
+        page = self._page(board, start, start + 2 * around)
+        page['me'] = None
+        if rank is not None:
+            page['me'] = {'rank': rank + 1, 'score': self.store.score(board.key, player_id)}
+        return page
+
+    def _page(self, board: Board, start: int, stop: int) -> dict:
+        rows = self.store.range(board.key, start, stop)
+        return {
+            'board': board.key,
+            'total': self.store.size(board.key),
+            'entries': [
+                {'rank': start + offset + 1, 'player_id': player_id, 'score': score}
+                for offset, (player_id, score) in enumerate(rows)
+            ],
+        }
+
+    @staticmethod
+    def _unavailable(board: Board) -> dict:
+        """Пустая страница при недоступном хранилище."""
+        return {'board': board.key, 'total': 0, 'entries': [], 'me': None, 'available': False}
+
+    def replace(self, board: Board, scores: Dict[int, float]) -> None:
+        """Заменить таблицу целиком (пересборка из БД)."""
+        self.store.replace(board.key, scores, ttl=self.week_ttl if board.scope == WEEK else None)
+
+
+_leaderboards: Optional[Leaderboards] = None
+
+
+def get_leaderboards() -> Leaderboards:
+    """Получить таблицы рекордов с хранилищем из LEADERBOARD_STORE."""
+    global _leaderboards
+    if _leaderboards is None:
+        config = settings.LEADERBOARD_STORE
+        store_class = import_string(config['BACKEND'])
+        _leaderboards = Leaderboards(
+            store_class(**config.get('OPTIONS', {})),
+            weeks_kept=settings.LEADERBOARD_WEEKS_KEPT
+        )
+    return _leaderboards
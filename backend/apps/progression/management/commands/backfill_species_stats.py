@@ -0,0 +1,63 @@
+"""
+Пересчитать уловы по видам (PlayerSpeciesStats) из истории CatchRecord.
+
+Нужна один раз после добавления таблицы и после ручных правок уловов.
+Строки перезаписываются значениями из истории, поэтому команду можно
+запускать повторно. Отложенные записи write-behind в историю ещё не
+попали - сначала примените их (replay_pending_writes).
+
+    python manage.py backfill_species_stats [--player ID]
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+
+from apps.fishing.models import CatchRecord
+from apps.progression.models import PlayerSpeciesStats
+
+UPDATE_FIELDS = ['catch_count', 'total_weight', 'max_weight', 'first_caught_at', 'last_caught_at']
+
+
+class Command(BaseCommand):
+    help = 'Пересчитать уловы игроков по видам рыбы из истории уловов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--player', type=int, help='Только один игрок (ID)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        catches = CatchRecord.objects.order_by()
+        if options['player'] is not None:
+            catches = catches.filter(player_id=options['player'])
+        rows = (
+            catches.values('player_id', 'fish_id')
+            .annotate(
+                catch_count=Count('id'),
+                total_weight=Sum('weight'),
+                max_weight=Max('weight'),
+                first_caught_at=Min('caught_at'),
+                last_caught_at=Max('caught_at'),
+            )
+            .order_by('player_id', 'fish_id')
+        )
+
+        total = 0
+        batch = []
+        with transaction.atomic():
+            for row in rows.iterator(chunk_size=options['batch_size']):
+                batch.append(PlayerSpeciesStats(**row))
+                if len(batch) >= options['batch_size']:
+                    total += self._save(batch)
+                    batch = []
+            total += self._save(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Пересчитано строк: {total}'))
+
+    def _save(self, batch) -> int:
+        PlayerSpeciesStats.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['player', 'fish'],
+            update_fields=UPDATE_FIELDS,
+        )
+        return len(batch)
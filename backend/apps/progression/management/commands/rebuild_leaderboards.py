@@ -0,0 +1,80 @@
+"""
+Пересобрать таблицы рекордов из БД.
+
+Нужна после потери данных Redis, смены LEADERBOARD_STORE или ошибок
+обновления. Источники:
+- общие таблицы - PlayerProfile
+- самая крупная рыба вида - PlayerSpeciesStats
+- таблицы локаций и текущей недели - CatchDailyRollup
+  (сначала обновите итоги: rollup_catches)
+
+Каждая таблица подменяется целиком.
+
+    python manage.py rebuild_leaderboards
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from apps.fishing.models import CatchDailyRollup
+from apps.progression.leaderboards import (
+    BIGGEST, FISH, LEVEL, LOCATION, WEEK, WEIGHT,
+    Board, get_leaderboards, level_score, week_id
+)
+from apps.progression.models import PlayerSpeciesStats
+from apps.users.models import PlayerProfile
+
+
+class Command(BaseCommand):
+    help = 'Пересобрать таблицы рекордов из профилей, уловов по видам и итогов по дням'
+
+    def handle(self, *args, **options):
+        boards = {}
+
+        weight, biggest, level = {}, {}, {}
+        for profile in PlayerProfile.objects.only(
+            'user_id', 'level', 'experience', 'total_weight_caught', 'biggest_fish_weight'
+        ).iterator():
+            if profile.total_weight_caught:
+                weight[profile.user_id] = profile.total_weight_caught
+            if profile.biggest_fish_weight:
+                biggest[profile.user_id] = profile.biggest_fish_weight
+            level[profile.user_id] = level_score(
+                profile.level, profile.experience, profile.experience_for_next_level
+            )
+        boards[Board(WEIGHT)] = weight
+        boards[Board(BIGGEST)] = biggest
+        boards[Board(LEVEL)] = level
+
+        species = defaultdict(dict)
+        for player_id, fish_id, max_weight in PlayerSpeciesStats.objects.values_list(
+            'player_id', 'fish_id', 'max_weight'
+        ).iterator():
+            species[fish_id][player_id] = max_weight
+        for fish_id, scores in species.items():
+            boards[Board(BIGGEST, FISH, str(fish_id))] = scores
+
+        by_location = (
+            CatchDailyRollup.objects.order_by()
+            .values_list('location_id', 'player_id')
+            .annotate(weight=Sum('total_weight'), biggest=Max('max_weight'))
+        )
+        for location_id, player_id, total, top in by_location.iterator():
+            boards.setdefault(Board(WEIGHT, LOCATION, str(location_id)), {})[player_id] = total
+            boards.setdefault(Board(BIGGEST, LOCATION, str(location_id)), {})[player_id] = top
+
+        today = timezone.localdate()
+        monday = today - timedelta(days=today.weekday())
+        week = dict(
+            CatchDailyRollup.objects.filter(day__gte=monday, day__lte=today).order_by()
+            .values_list('player_id').annotate(weight=Sum('total_weight'))
+        )
+        boards[Board(WEIGHT, WEEK, week_id(today))] = week
+
+        leaderboards = get_leaderboards()
+        for board, scores in boards.items():
+            leaderboards.replace(board, scores)
+        self.stdout.write(self.style.SUCCESS(f'Пересобрано таблиц: {len(boards)}'))
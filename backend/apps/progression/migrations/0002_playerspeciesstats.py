@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fishing', '0001_initial'),
+        ('progression', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerSpeciesStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('catch_count', models.PositiveIntegerField(default=0, verbose_name='Поймано')),
+                ('total_weight', models.FloatField(default=0, verbose_name='Общий вес (кг)')),
+                ('max_weight', models.FloatField(default=0, verbose_name='Самая крупная (кг)')),
+                ('first_caught_at', models.DateTimeField(verbose_name='Первая поимка')),
+                ('last_caught_at', models.DateTimeField(verbose_name='Последняя поимка')),
+                ('fish', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_stats', to='fishing.fish', verbose_name='Рыба')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='species_stats', to=settings.AUTH_USER_MODEL, verbose_name='Игрок')),
+            ],
+            options={
+                'verbose_name': 'Уловы игрока по виду',
+                'verbose_name_plural': 'Уловы игроков по видам',
+                'unique_together': {('player', 'fish')},
+            },
+        ),
+    ]
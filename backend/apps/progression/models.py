@@ -1,7 +1,13 @@
 """
 Модели системы прогрессии: достижения и статистика.
 """
-from django.db import models
+from datetime import datetime
+from typing import Optional
+
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from core.counters import CounterUpdate
 
 
 class AchievementType(models.TextChoices):
@@ -181,3 +187,104 @@ class PlayerStats(models.Model):
         if self.total_casts == 0:
             return 0
         return round(self.successful_catches / self.total_casts * 100, 1)
+
+
+class PlayerSpeciesStats(models.Model):
+    """
+    Уловы игрока по виду рыбы.
+
+    Агрегат CatchRecord, который ведётся на пути поимки (record_catches),
+    чтобы достижения и коллекция не считали уловы запросом по истории.
+    Пересчитывается из CatchRecord командой backfill_species_stats.
+    """
+    player = models.ForeignKey(
+        'users.User',
+        on_delete=models.CASCADE,
+        related_name='species_stats',
+        verbose_name='Игрок'
+    )
+    fish = models.ForeignKey(
+        'fishing.Fish',
+        on_delete=models.CASCADE,
+        related_name='player_stats',
+        verbose_name='Рыба'
+    )
+    catch_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Поймано'
+    )
+    total_weight = models.FloatField(
+        default=0,
+        verbose_name='Общий вес (кг)'
+    )
+    max_weight = models.FloatField(
+        default=0,
+        verbose_name='Самая крупная (кг)'
+    )
+    first_caught_at = models.DateTimeField(verbose_name='Первая поимка')
+    last_caught_at = models.DateTimeField(verbose_name='Последняя поимка')
+
+    class Meta:
+        verbose_name = 'Уловы игрока по виду'
+        verbose_name_plural = 'Уловы игроков по видам'
+        unique_together = ['player', 'fish']
+
+    def __str__(self):
+        return f'{self.player.username}: {self.fish.name} x{self.catch_count}'
+
+    @classmethod
+    def catch_update(
+        cls,
+        player_id: int,
+        fish_id: int,
+        count: int,
+        total_weight: float,
+        max_weight: float,
+        caught_at: datetime
+    ) -> CounterUpdate:
+        """Приращения строки (игрок, рыба) за count уловов."""
+        return (
+            CounterUpdate(cls, player_id=player_id, fish_id=fish_id)
+            .add('catch_count', count)
+            .add('total_weight', total_weight)
+            .max('max_weight', max_weight)
+            .max('last_caught_at', caught_at)
+        )
+
+    @classmethod
+    def record_catches(
+        cls,
+        player_id: int,
+        fish_id: int,
+        count: int,
+        total_weight: float,
+        max_weight: float,
+        caught_at: Optional[datetime] = None,
+        exists: bool = True,
+        first_caught_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Учесть уловы одного вида: UPDATE существующей строки, иначе INSERT.
+
+        Args:
+            count: Количество уловов
+            total_weight: Их общий вес
+            max_weight: Самый крупный из них
+            caught_at: Время поимки (последнего из уловов, по умолчанию - сейчас)
+            exists: False - строки, скорее всего, нет: сначала INSERT
+            first_caught_at: Время первого из уловов (по умолчанию - caught_at)
+        """
+        caught_at = caught_at or timezone.now()
+        update = cls.catch_update(player_id, fish_id, count, total_weight, max_weight, caught_at)
+        if exists and update.execute():
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    player_id=player_id, fish_id=fish_id,
+                    catch_count=count, total_weight=total_weight, max_weight=max_weight,
+                    first_caught_at=first_caught_at or caught_at, last_caught_at=caught_at
+                )
+        except IntegrityError:
+            # Строку успел создать параллельный улов
+            update.execute()
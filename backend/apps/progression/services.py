@@ -1,12 +1,32 @@
 """
 Сервисы системы прогрессии.
 """
-from typing import List
+from typing import Dict, List, Optional, Set
 from django.db import transaction
+from django.utils import timezone
 
-from apps.users.models import User
-from apps.fishing.models import Fish, CatchRecord, Rarity
-from .models import Achievement, PlayerAchievement, PlayerStats, AchievementType
+from apps.users.models import PlayerProfile, User
+from apps.fishing.models import Rarity
+from apps.fishing.catalog import FishEntry
+from core.catalog import get_catalog
+from core.counters import CounterUpdate
+from .catalog import AchievementEntry, AchievementKey, achievement_key, get_achievement_index
+from .models import PlayerAchievement, PlayerSpeciesStats, PlayerStats, AchievementType
+
+# Счётчики статистики по редкости
+RARITY_FIELDS = {
+    Rarity.COMMON: 'common_caught',
+    Rarity.UNCOMMON: 'uncommon_caught',
+    Rarity.RARE: 'rare_caught',
+    Rarity.EPIC: 'epic_caught',
+    Rarity.LEGENDARY: 'legendary_caught',
+}
+
+# Достижения, прогресс которых меняется вместе с профилем (в том числе от наград)
+PROFILE_KEYS = (
+    achievement_key(AchievementType.LEVEL_REACH),
+    achievement_key(AchievementType.MONEY_EARN),
+)
 
 
 class ProgressionService:
@@ -15,11 +35,25 @@ class ProgressionService:
     def __init__(self, user: User):
         self.user = user
         self.profile = user.profile
+        self._stats: Optional[PlayerStats] = None
+        # Полученные достижения и уловы по видам: читаются из БД один раз,
+        # дальше ведутся в памяти (при save=False БД отстаёт от памяти)
+        self._unlocked: Optional[Set[int]] = None
+        self._species: Optional[Dict[int, PlayerSpeciesStats]] = None
 
     def get_stats(self) -> PlayerStats:
-        """Получить или создать статистику игрока."""
-        stats, _ = PlayerStats.objects.get_or_create(player=self.user)
-        return stats
+        """
+        Получить или создать статистику игрока.
+
+        Запоминается в экземпляре сервиса; если статистика уже загружена
+        вместе с пользователем (select_related('stats')), запроса нет.
+        """
+        if self._stats is None:
+            try:
+                self._stats = self.user.stats
+            except PlayerStats.DoesNotExist:
+                self._stats, _ = PlayerStats.objects.get_or_create(player=self.user)
+        return self._stats
 
     def get_achievements(self) -> List[dict]:
         """
@@ -28,26 +62,21 @@ class ProgressionService:
         Returns:
             Список достижений с информацией о статусе и прогрессе.
         """
-        all_achievements = Achievement.objects.all()
-        unlocked_ids = set(
-            PlayerAchievement.objects.filter(player=self.user)
-            .values_list('achievement_id', flat=True)
-        )
+        unlocked_ids = self._get_unlocked()
 
         result = []
-        for ach in all_achievements:
+        for ach in get_catalog().all('achievements'):
             # Скрытые достижения не показываем, пока не получены
             if ach.is_hidden and ach.id not in unlocked_ids:
                 continue
 
-            progress = self._calculate_progress(ach)
             result.append({
                 'id': ach.id,
                 'name': ach.name,
                 'description': ach.description,
-                'icon': ach.icon.url if ach.icon else None,
+                'icon': ach.icon,
                 'unlocked': ach.id in unlocked_ids,
-                'progress': progress,
+                'progress': self._progress(ach.key),
                 'target': ach.target_value,
                 'reward_money': ach.reward_money,
                 'reward_experience': ach.reward_experience,
@@ -55,119 +84,211 @@ class ProgressionService:
 
         return result
 
-    def _calculate_progress(self, achievement: Achievement) -> int:
-        """Рассчитать текущий прогресс по достижению."""
-        stats = self.get_stats()
+    def _get_unlocked(self) -> Set[int]:
+        """Id полученных достижений (читаются из БД один раз на экземпляр)."""
+        if self._unlocked is None:
+            self._unlocked = set(
+                PlayerAchievement.objects.filter(player=self.user)
+                .values_list('achievement_id', flat=True)
+            )
+        return self._unlocked
 
-        if achievement.achievement_type == AchievementType.CATCH_COUNT:
-            return stats.successful_catches
+    def get_species_stats(self) -> Dict[int, PlayerSpeciesStats]:
+        """
+        Уловы игрока по видам: id рыбы -> PlayerSpeciesStats.
 
-        elif achievement.achievement_type == AchievementType.CATCH_WEIGHT:
+        Читаются из БД один раз на экземпляр сервиса, дальше ведутся
+        в памяти (record_catch_stats).
+        """
+        if self._species is None:
+            self._species = {
+                row.fish_id: row
+                for row in PlayerSpeciesStats.objects.filter(player=self.user)
+            }
+        return self._species
+
+    def _progress(self, key: AchievementKey) -> int:
+        """Текущий прогресс по ключу достижения - из счётчиков в памяти."""
+        achievement_type, rarity, fish_id = key
+
+        if achievement_type == AchievementType.CATCH_COUNT:
+            return self.get_stats().successful_catches
+
+        elif achievement_type == AchievementType.CATCH_WEIGHT:
             return int(self.profile.total_weight_caught)
 
-        elif achievement.achievement_type == AchievementType.LEVEL_REACH:
+        elif achievement_type == AchievementType.LEVEL_REACH:
             return self.profile.level
 
-        elif achievement.achievement_type == AchievementType.MONEY_EARN:
+        elif achievement_type == AchievementType.MONEY_EARN:
             return self.profile.money
 
-        elif achievement.achievement_type == AchievementType.CATCH_RARITY:
-            rarity_map = {
-                Rarity.COMMON: stats.common_caught,
-                Rarity.UNCOMMON: stats.uncommon_caught,
-                Rarity.RARE: stats.rare_caught,
-                Rarity.EPIC: stats.epic_caught,
-                Rarity.LEGENDARY: stats.legendary_caught,
-            }
-            return rarity_map.get(achievement.target_rarity, 0)
-
-        elif achievement.achievement_type == AchievementType.CATCH_SPECIES:
-            if achievement.target_fish:
-                return CatchRecord.objects.filter(
-                    player=self.user,
-                    fish=achievement.target_fish
-                ).count()
+        elif achievement_type == AchievementType.CATCH_RARITY:
+            field = RARITY_FIELDS.get(rarity)
+            return getattr(self.get_stats(), field) if field else 0
+
+        elif achievement_type == AchievementType.CATCH_SPECIES:
+            if fish_id:
+                species = self.get_species_stats().get(fish_id)
+                return species.catch_count if species else 0
             return 0
 
         return 0
 
-    @transaction.atomic
-    def check_achievements(self) -> List[Achievement]:
+    def check_achievements(self, fish: Optional[FishEntry] = None, save: bool = True) -> List[AchievementEntry]:
         """
-        Проверить и выдать новые достижения.
+        Проверить и выдать новые достижения после события.
+
+        Проверяются только достижения, на которые событие могло повлиять
+        (индекс get_achievement_index): поимка fish - количество, вес,
+        редкость и вид рыбы; уровень и деньги - всегда, они меняются и от
+        наград. Прогресс берётся из профиля, статистики и счётчиков по
+        видам в памяти, поэтому проверка не делает запросов к БД (кроме
+        первой загрузки полученных достижений и счётчиков по видам).
+
+        Args:
+            fish: Пойманная рыба; None - проверить только уровень и деньги
+            save: False - ничего не записывать: награды начисляются профилю
+                в памяти, а записи PlayerAchievement создаёт вызывающий
 
         Returns:
             Список только что полученных достижений.
         """
-        unlocked_ids = set(
-            PlayerAchievement.objects.filter(player=self.user)
-            .values_list('achievement_id', flat=True)
-        )
+        index = get_achievement_index()
+        unlocked = self._get_unlocked()
+
+        keys = list(PROFILE_KEYS)
+        if fish is not None:
+            keys = [
+                achievement_key(AchievementType.CATCH_COUNT),
+                achievement_key(AchievementType.CATCH_WEIGHT),
+                achievement_key(AchievementType.CATCH_RARITY, target_rarity=fish.rarity),
+                achievement_key(AchievementType.CATCH_SPECIES, target_fish_id=fish.id),
+            ] + keys
 
         new_achievements = []
-        all_achievements = Achievement.objects.exclude(id__in=unlocked_ids)
-
-        for ach in all_achievements:
-            progress = self._calculate_progress(ach)
-            if progress >= ach.target_value:
-                # Достижение получено!
-                PlayerAchievement.objects.create(
-                    player=self.user,
-                    achievement=ach
-                )
-                # Выдаём награды
-                self.profile.money += ach.reward_money
-                self.profile.add_experience(ach.reward_experience)
-                new_achievements.append(ach)
+        rewards = CounterUpdate.for_instance(self.profile)
+        while keys:
+            granted = False
+            for key in keys:
+                for ach in index.reached(key, self._progress(key)):
+                    if ach.id in unlocked:
+                        continue
+                    # Достижение получено!
+                    unlocked.add(ach.id)
+                    # Выдаём награды: профиль в памяти меняется сразу (от него
+                    # зависит прогресс следующих достижений), в БД - одним UPDATE
+                    reward = CounterUpdate.for_instance(self.profile).add('money', ach.reward_money)
+                    self.profile.gain_experience(reward, ach.reward_experience)
+                    reward.apply_to(self.profile)
+                    self.profile.normalize_level()
+                    rewards.merge(reward)
+                    new_achievements.append(ach)
+                    granted = True
+            # Награды могли поднять уровень и деньги - проверяем их ещё раз
+            keys = PROFILE_KEYS if granted else ()
+
+        if save and new_achievements:
+            with transaction.atomic():
+                PlayerAchievement.objects.bulk_create([
+                    PlayerAchievement(player=self.user, achievement_id=ach.id)
+                    for ach in new_achievements
+                ])
+                rewards.execute()
+                level, experience, _ = PlayerProfile.settle_level(pk=self.profile.pk)
+                self.profile.level, self.profile.experience = level, experience
 
         return new_achievements
 
-    @transaction.atomic
-    def record_catch_stats(self, fish: Fish, fight_duration: int) -> None:
+    def stats_update(self) -> CounterUpdate:
+        """Пустое обновление счётчиков статистики игрока."""
+        return CounterUpdate.for_instance(self.get_stats())
+
+    def apply_stats(self, update: CounterUpdate, save: bool = True) -> None:
+        """
+        Применить обновление статистики.
+
+        В БД - одним UPDATE с F() / Greatest / Least (без чтения строки,
+        поэтому параллельные изменения не теряются), затем те же изменения
+        - к статистике в памяти.
+
+        Args:
+            update: Изменения счётчиков (stats_update())
+            save: False - изменить статистику только в памяти
+        """
+        if save:
+            update.execute()
+        update.apply_to(self.get_stats())
+
+    def increment_stats(self, save: bool = True, **counters: int) -> None:
+        """Увеличить счётчики статистики одним UPDATE: increment_stats(total_casts=1)."""
+        update = self.stats_update()
+        for field, amount in counters.items():
+            update.add(field, amount)
+        self.apply_stats(update, save=save)
+
+    def record_catch_stats(
+        self,
+        fish: FishEntry,
+        fight_duration: int,
+        weight: float,
+        save: bool = True
+    ) -> None:
         """
-        Обновить статистику после поимки рыбы.
+        Обновить статистику и уловы по виду после поимки рыбы.
 
         Args:
             fish: Пойманная рыба
             fight_duration: Длительность вываживания в секундах
+            weight: Вес рыбы
+            save: False - изменить статистику только в памяти
+                (уловы по видам тогда применяет сброс write-behind)
         """
-        stats = self.get_stats()
-        stats.successful_catches += 1
+        self._record_species_catch(fish.id, weight, save=save)
+
+        update = self.stats_update().add('successful_catches')
 
         # Обновляем по редкости
-        rarity_field_map = {
-            Rarity.COMMON: 'common_caught',
-            Rarity.UNCOMMON: 'uncommon_caught',
-            Rarity.RARE: 'rare_caught',
-            Rarity.EPIC: 'epic_caught',
-            Rarity.LEGENDARY: 'legendary_caught',
-        }
-        field = rarity_field_map.get(fish.rarity)
+        field = RARITY_FIELDS.get(fish.rarity)
         if field:
-            setattr(stats, field, getattr(stats, field) + 1)
+            update.add(field)
+
+        # Обновляем рекорды (0 - быстрой поимки ещё не было)
+        update.max('longest_fight_seconds', fight_duration)
+        update.min('fastest_catch_seconds', fight_duration, unset=0)
+
+        self.apply_stats(update, save=save)
 
-        # Обновляем рекорды
-        if fight_duration > stats.longest_fight_seconds:
-            stats.longest_fight_seconds = fight_duration
-        if stats.fastest_catch_seconds == 0 or fight_duration < stats.fastest_catch_seconds:
-            stats.fastest_catch_seconds = fight_duration
+    def _record_species_catch(self, fish_id: int, weight: float, save: bool) -> None:
+        """Учесть улов в PlayerSpeciesStats (в БД - один UPDATE) и в памяти."""
+        species = self.get_species_stats()
+        entry = species.get(fish_id)
+        caught_at = timezone.now()
+        if save:
+            PlayerSpeciesStats.record_catches(
+                self.user.pk, fish_id, 1, weight, weight, caught_at,
+                exists=entry is not None
+            )
 
-        stats.save()
+        if entry is None:
+            species[fish_id] = PlayerSpeciesStats(
+                player=self.user, fish_id=fish_id,
+                catch_count=1, total_weight=weight, max_weight=weight,
+                first_caught_at=caught_at, last_caught_at=caught_at
+            )
+        else:
+            PlayerSpeciesStats.catch_update(
+                self.user.pk, fish_id, 1, weight, weight, caught_at
+            ).apply_to(entry)
 
     def record_cast(self) -> None:
         """Записать заброс."""
-        stats = self.get_stats()
-        stats.total_casts += 1
-        stats.save()
+        self.increment_stats(total_casts=1)
 
-    def record_fish_escaped(self) -> None:
+    def record_fish_escaped(self, save: bool = True) -> None:
         """Записать сход рыбы."""
-        stats = self.get_stats()
-        stats.fish_escaped += 1
-        stats.save()
+        self.increment_stats(save=save, fish_escaped=1)
 
-    def record_line_break(self) -> None:
+    def record_line_break(self, save: bool = True) -> None:
         """Записать обрыв лески."""
-        stats = self.get_stats()
-        stats.line_breaks += 1
-        stats.save()
+        self.increment_stats(save=save, line_breaks=1)
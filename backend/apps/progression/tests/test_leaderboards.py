@@ -0,0 +1,91 @@
+"""
+Таблицы рекордов: in-memory и Redis (fakeredis) упорядочены одинаково,
+чтение при недоступном Redis отдаёт пустую страницу.
+"""
+import random
+
+import fakeredis
+import pytest
+
+from apps.progression.leaderboards import (
+    BIGGEST, WEIGHT, Board, InMemoryLeaderboardStore, Leaderboards, RedisLeaderboardStore
+)
+
+KEY = Board(WEIGHT).key
+
+
+@pytest.fixture
+def stores():
+    return InMemoryLeaderboardStore(), RedisLeaderboardStore(client=fakeredis.FakeRedis())
+
+
+def snapshot(store, players):
+    size = store.size(KEY)
+    return (
+        store.range(KEY, 0, size),
+        store.range(KEY, 2, 5),
+        store.range(KEY, size - 2, size + 3),
+        [store.rank(KEY, player) for player in players],
+    )
+
+
+def test_equal_scores_ordered_like_redis(stores):
+    players = [2, 9, 10, 11, 100, 7]
+    for store in stores:
+        store.apply([('add', KEY, player, 5.0) for player in players], ttl={})
+        store.apply([('add', KEY, 3, 8.0)], ttl={})
+
+    memory, redis = stores
+    assert memory.range(KEY, 0, 10) == redis.range(KEY, 0, 10)
+    # Игрок как строка по убыванию: '9' выше '7', '7' выше '2', '2' выше '11'
+    assert [player for player, _ in memory.range(KEY, 0, 10)] == [3, 9, 7, 2, 11, 100, 10]
+    assert snapshot(memory, players + [3, 42]) == snapshot(redis, players + [3, 42])
+
+
+def test_random_changes_match(stores):
+    rng = random.Random(1)
+    players = list(range(1, 40))
+    for _ in range(300):
+        op = rng.choice(['add', 'max', 'set'])
+        changes = [(op, KEY, rng.choice(players), float(rng.randint(0, 6)))]
+        for store in stores:
+            store.apply(changes, ttl={})
+
+    memory, redis = stores
+    assert snapshot(memory, players) == snapshot(redis, players)
+
+
+def test_replace_matches(stores):
+    scores = {player: float(player % 4) for player in range(1, 25)}
+    for store in stores:
+        store.replace(KEY, scores)
+    memory, redis = stores
+    assert snapshot(memory, list(scores)) == snapshot(redis, list(scores))
+
+
+def test_around_and_top(stores):
+    for store in stores:
+        leaderboards = Leaderboards(store)
+        for player in range(1, 21):
+            leaderboards.record_catch(player, fish_id=1, location_id=1, weight=float(player), level=1)
+
+        page = leaderboards.around(Board(BIGGEST), player_id=10, around=2)
+        assert [entry['player_id'] for entry in page['entries']] == [12, 11, 10, 9, 8]
+        assert page['me'] == {'rank': 11, 'score': 10.0}
+        assert page['total'] == 20
+        assert [entry['rank'] for entry in leaderboards.top(Board(BIGGEST), 3)['entries']] == [1, 2, 3]
+
+
+def test_read_degrades_when_redis_is_down():
+    server = fakeredis.FakeServer()
+    leaderboards = Leaderboards(RedisLeaderboardStore(client=fakeredis.FakeRedis(server=server)))
+    leaderboards.record_catch(1, fish_id=1, location_id=1, weight=2.0, level=1)
+
+    server.connected = False
+    for page in (leaderboards.top(Board(WEIGHT)), leaderboards.around(Board(WEIGHT), 1)):
+        assert page == {'board': KEY, 'total': 0, 'entries': [], 'me': None, 'available': False}
+    # Запись тоже не падает
+    leaderboards.record_catch(1, fish_id=1, location_id=1, weight=2.0, level=1)
+
+    server.connected = True
+    assert leaderboards.top(Board(WEIGHT))['entries'][0]['player_id'] == 1
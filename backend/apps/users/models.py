@@ -1,9 +1,13 @@
 """
 User and Player Profile models.
 """
-from django.db import models
+from typing import Tuple
+
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 
+from core.counters import CounterUpdate
+
 
 class User(AbstractUser):
     """Custom user model."""
@@ -40,15 +44,73 @@ class PlayerProfile(models.Model):
     @property
     def experience_for_next_level(self) -> int:
         """Calculate experience needed for next level."""
-        return int(100 * (self.level ** 1.5))
-
-    def add_experience(self, amount: int) -> bool:
-        """Add experience and check for level up. Returns True if leveled up."""
-        self.experience += amount
-        leveled_up = False
-        while self.experience >= self.experience_for_next_level:
-            self.experience -= self.experience_for_next_level
-            self.level += 1
-            leveled_up = True
-        self.save()
+        return self.experience_for_level(self.level)
+
+    @staticmethod
+    def experience_for_level(level: int) -> int:
+        """Experience needed to advance from the given level."""
+        return int(100 * (level ** 1.5))
+
+    @property
+    def total_experience(self) -> int:
+        """Experience gained over all levels."""
+        return sum(self.experience_for_level(level) for level in range(1, self.level)) + self.experience
+
+    def level_after(self, amount: int) -> Tuple[int, int]:
+        """Level and experience after gaining amount (the profile is not changed)."""
+        level = self.level
+        experience = self.experience + amount
+        while experience >= self.experience_for_level(level):
+            experience -= self.experience_for_level(level)
+            level += 1
+        return level, experience
+
+    def add_experience(self, amount: int, save: bool = True) -> bool:
+        """
+        Add experience and check for level up. Returns True if leveled up.
+
+        With save=False only the in-memory profile changes (the caller
+        persists it, e.g. through the write-behind queue).
+        """
+        level, self.experience = self.level_after(amount)
+        leveled_up = level > self.level
+        self.level = level
+        if save:
+            self.save()
         return leveled_up
+
+    def gain_experience(self, update: CounterUpdate, amount: int) -> None:
+        """
+        Add experience to a counter update.
+
+        Only `experience = experience + amount` is written: a level computed
+        from this (possibly stale) instance could corrupt the stored one.
+        After the update, carry the experience over level thresholds with
+        settle_level() in the database and normalize_level() in memory.
+        """
+        update.add('experience', amount)
+
+    def normalize_level(self) -> bool:
+        """Carry in-memory experience over level thresholds. Returns True if the level went up."""
+        level, self.experience = self.level_after(0)
+        leveled_up = level > self.level
+        self.level = level
+        return leveled_up
+
+    @classmethod
+    def settle_level(cls, **lookup) -> Tuple[int, int, bool]:
+        """
+        Carry stored experience over level thresholds.
+
+        The level is computed from the stored values under a row lock,
+        so concurrent experience gains are never lost or counted twice.
+
+        Returns:
+            Stored level, experience and whether the level went up
+        """
+        with transaction.atomic():
+            stored = cls.objects.select_for_update().only('level', 'experience').get(**lookup)
+            leveled_up = stored.normalize_level()
+            if leveled_up:
+                cls.objects.filter(pk=stored.pk).update(level=stored.level, experience=stored.experience)
+        return stored.level, stored.experience, leveled_up
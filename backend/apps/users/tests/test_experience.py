@@ -0,0 +1,59 @@
+"""
+Experience and level: the stored level is computed from stored values.
+"""
+import pytest
+
+from apps.users.models import PlayerProfile, User
+from core.counters import CounterUpdate
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def profile():
+    user = User.objects.create_user(username='angler', email='angler@test.test', password='x')
+    return user.profile
+
+
+def gain(profile: PlayerProfile, amount: int) -> bool:
+    """Gain experience the way FishingService.record_catch does."""
+    update = CounterUpdate.for_instance(profile)
+    profile.gain_experience(update, amount)
+    update.execute()
+    update.apply_to(profile)
+    level, experience, leveled_up = PlayerProfile.settle_level(pk=profile.pk)
+    profile.level, profile.experience = level, experience
+    return leveled_up
+
+
+def test_level_up(profile):
+    assert gain(profile, 150)
+    stored = PlayerProfile.objects.get(pk=profile.pk)
+    assert (stored.level, stored.experience) == (2, 50)
+    assert (profile.level, profile.experience) == (2, 50)
+
+
+def test_stale_instance_does_not_corrupt_level(profile):
+    stale = PlayerProfile.objects.get(pk=profile.pk)
+    gain(profile, 150)   # Level 2 in the database
+
+    # The stale copy still sees level 1 with 0 experience
+    assert not gain(stale, 30)
+    stored = PlayerProfile.objects.get(pk=profile.pk)
+    assert (stored.level, stored.experience) == (2, 80)
+    assert stored.total_experience == 180
+
+
+def test_stale_instances_level_up_once(profile):
+    stale = PlayerProfile.objects.get(pk=profile.pk)
+    assert not gain(profile, 60)
+    # Both gains together cross the threshold; the stale copy levels up the row
+    assert gain(stale, 60)
+    stored = PlayerProfile.objects.get(pk=profile.pk)
+    assert (stored.level, stored.experience) == (2, 20)
+
+
+def test_normalize_level_in_memory(profile):
+    profile.experience = PlayerProfile.experience_for_level(1) + PlayerProfile.experience_for_level(2) + 5
+    assert profile.normalize_level()
+    assert (profile.level, profile.experience) == (3, 5)
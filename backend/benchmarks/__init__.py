@@ -0,0 +1,49 @@
+"""
+Бенчмарки игрового ядра.
+
+Запуск из каталога backend:
+    python -m benchmarks.batch_fight
+"""
+import os
+from typing import Optional
+
+
+def setup_django(databases: Optional[dict] = None) -> None:
+    """
+    Инициализировать Django для запуска бенчмарка как скрипта.
+
+    Args:
+        databases: Подменить DATABASES из настроек (например SQLite-файлом)
+    """
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fishing_game.settings.development')
+    if databases:
+        from django.conf import settings
+        settings.DATABASES = databases
+    django.setup()
+
+
+def prepare_database() -> None:
+    """Миграции и начальные данные для пустой базы."""
+    from django.core.management import call_command
+
+    from apps.fishing.models import Location
+
+    call_command('migrate', verbosity=0)
+    if not Location.objects.exists():
+        call_command('loaddata', 'fixtures/initial_data.json', verbosity=0)
+
+
+def fix_bite_hour(hour: int) -> None:
+    """Считать клёв так, будто сейчас hour часов (активность рыбы по времени суток)."""
+    from datetime import datetime
+
+    from apps.fishing.services import bite_calculator
+
+    class FixedHour(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz).replace(hour=hour)
+
+    bite_calculator.datetime = FixedHour
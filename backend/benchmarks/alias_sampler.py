@@ -0,0 +1,56 @@
+"""
+Бенчмарк AliasSampler.
+
+Время одного выбора рыбы alias-методом против прежнего линейного прохода
+по накопленным вероятностям. Корректность распределения проверяет
+pytest apps/fishing/tests/test_alias_sampler.py.
+
+    python -m benchmarks.alias_sampler --draws 200000
+"""
+import argparse
+import random
+import time
+
+from benchmarks import setup_django
+
+setup_django()
+
+from apps.fishing.catalog import FishEntry  # noqa: E402
+from apps.fishing.services.bite_table import BiteEntry, BiteTable  # noqa: E402
+from apps.fishing.tests.test_alias_sampler import ATTRACTION, CONTEXTS, FISH, linear_choice  # noqa: E402
+
+
+def bench_draw(table: BiteTable, depth: float, hour: int, draws: int) -> None:
+    """Время одного выбора: сборка весов + линейный проход против alias."""
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for _ in range(draws):
+        entries = table.candidates(depth, hour)
+        weights = [entry.probability(depth) for entry in entries]
+        linear_choice(entries, weights, sum(weights), rng)
+    linear = (time.perf_counter() - start) / draws
+
+    start = time.perf_counter()
+    for _ in range(draws):
+        table.sampler(depth, hour).sample(rng)
+    alias = (time.perf_counter() - start) / draws
+
+    print(f'  глубина {depth:>5} час {hour:>2}: линейный проход {linear * 1e6:.2f} мкс, '
+          f'alias {alias * 1e6:.2f} мкс (x{linear / alias:.1f})')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--draws', type=int, default=200000)
+    args = parser.parse_args()
+
+    table = BiteTable([
+        BiteEntry(FishEntry.from_model(fish), ATTRACTION[fish.pk]) for fish in FISH
+    ])
+    print(f'Время выбора рыбы ({args.draws} выборок):')
+    for depth, hour in CONTEXTS:
+        bench_draw(table, depth, hour, args.draws)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Бенчмарк пакетного движка вываживания.
+
+Сравнивает стоимость одного тика для N одновременных боёв:
+скалярный FightEngine (цикл по боям) и BatchFightEngine (один шаг NumPy),
+а также распределение исходов боёв обоих движков.
+
+    python -m benchmarks.batch_fight --fights 10000
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from benchmarks import setup_django
+
+setup_django()
+
+from apps.equipment.models import Rod, Reel, Line  # noqa: E402
+from apps.equipment.catalog import RodEntry, ReelEntry, LineEntry  # noqa: E402
+from apps.fishing.models import Fish  # noqa: E402
+from apps.fishing.catalog import FishEntry  # noqa: E402
+from apps.game.models import GameSession, FishState  # noqa: E402
+import numpy as np  # noqa: E402
+
+from apps.game.services.fight_engine import FightEngine, PlayerAction  # noqa: E402
+from apps.game.services.batch_fight_engine import BatchFightEngine, RESULT_REASONS, RUSH  # noqa: E402
+
+TICK = 0.1
+
+# Рыба и лучшая снасть из fixtures/initial_data.json (без обращения к БД)
+FISH = [
+    FishEntry.from_model(fish) for fish in (
+        Fish(name='Карась', max_weight=1.5, strength=20, stamina=30, aggressiveness=15),
+        Fish(name='Окунь', max_weight=2.0, strength=35, stamina=40, aggressiveness=45),
+        Fish(name='Лещ', max_weight=4.0, strength=40, stamina=50, aggressiveness=25),
+        Fish(name='Щука', max_weight=8.0, strength=70, stamina=60, aggressiveness=80),
+    )
+]
+ROD = RodEntry.from_model(Rod(power=70))
+REEL = ReelEntry.from_model(Reel(retrieve_speed=70, drag_power=12))
+LINE = LineEntry.from_model(Line(length=200, breaking_strength=15))
+
+# Натяжение, выше которого игрок стравливает леску
+RELEASE_TENSION = 65
+
+
+def make_engine(index: int, rng: random.Random) -> FightEngine:
+    """Скалярный движок в состоянии сразу после подсечки."""
+    fish = FISH[index % len(FISH)]
+    session = GameSession(
+        hooked_fish_weight=fish.max_weight * 0.6,
+        fish_state=FishState.ACTIVE,
+        fish_stamina=100,
+        fish_distance=28,
+        line_tension=30,
+        line_health=100,
+        drag_level=0.5,
+    )
+    return FightEngine(session=session, fish=fish, rod=ROD, reel=REEL, line=LINE, rng=rng)
+
+
+def bench_tick(fights: int, ticks: int) -> None:
+    """Стоимость одного тика для fights боёв."""
+    rng = random.Random(1)
+    engines = [make_engine(i, rng) for i in range(fights)]
+    batch = BatchFightEngine(capacity=fights, seed=1)
+    for engine in engines:
+        batch.add_engine(engine)
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for engine in engines:
+            engine.update(TICK)
+    scalar = (time.perf_counter() - start) / ticks
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        batch.step(TICK)
+    vectorized = (time.perf_counter() - start) / ticks
+
+    print(f'Боёв: {fights}, тиков: {ticks}')
+    print(f'  FightEngine (скалярный): {scalar * 1000:8.2f} мс/тик')
+    print(f'  BatchFightEngine:        {vectorized * 1000:8.2f} мс/тик')
+    print(f'  Ускорение:               {scalar / vectorized:8.1f}x')
+
+
+def play(engine: FightEngine) -> None:
+    """
+    Стратегия игрока, которая вываживает примерно половину рыбы.
+
+    Фрикцион на максимум (рыба быстрее устаёт и слабее тянет леску),
+    подмотка каждый тик, кроме рывка, при сильном натяжении леска
+    сначала стравливается.
+    """
+    session = engine.session
+    if session.drag_level < 1:
+        engine.process_action(PlayerAction.SET_DRAG, 1.0)
+    if session.line_tension > RELEASE_TENSION:
+        engine.process_action(PlayerAction.RELEASE)
+    if session.fish_state != FishState.RUSH:
+        engine.process_action(PlayerAction.REEL, 1.0)
+
+
+def play_batch(batch: BatchFightEngine) -> None:
+    """Та же стратегия для всех активных боёв пакета."""
+    idx = np.flatnonzero(batch.active[:batch.size])
+    loose = idx[batch.drag_level[idx] < 1]
+    batch.set_drag(loose, np.ones(loose.size))
+    batch.release(idx[batch.line_tension[idx] > RELEASE_TENSION])
+    reel = idx[batch.fish_state[idx] != RUSH]
+    batch.reel(reel, np.ones(reel.size))
+
+
+def compare_outcomes(fights: int, max_ticks: int = 3000) -> None:
+    """Распределение исходов и средняя длительность боёв с одинаковой стратегией игрока."""
+    rng = random.Random(2)
+    scalar = Counter()
+    scalar_ticks = 0
+    for i in range(fights):
+        engine = make_engine(i, rng)
+        for tick in range(1, max_ticks + 1):
+            play(engine)
+            _, result = engine.update(TICK)
+            if result:
+                scalar[result.reason] += 1
+                scalar_ticks += tick
+                break
+
+    batch = BatchFightEngine(capacity=fights, seed=2)
+    for i in range(fights):
+        batch.add_engine(make_engine(i, rng))
+    vectorized = Counter()
+    vectorized_ticks = 0
+    for tick in range(1, max_ticks + 1):
+        play_batch(batch)
+        finished = batch.step(TICK)
+        for slot in finished:
+            vectorized[RESULT_REASONS[int(batch.result[slot])]] += 1
+        vectorized_ticks += tick * len(finished)
+        if not len(batch):
+            break
+
+    print(f'Исходы {fights} боёв (скалярный / пакетный):')
+    for reason in sorted(set(scalar) | set(vectorized)):
+        print(f'  {reason:13} {scalar[reason] / fights:7.2%}  {vectorized[reason] / fights:7.2%}')
+    print(
+        f'  средняя длительность: {scalar_ticks / max(1, sum(scalar.values())) * TICK:.1f} c'
+        f' / {vectorized_ticks / max(1, sum(vectorized.values())) * TICK:.1f} c'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--fights', type=int, default=10000)
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--compare', type=int, default=5000, help='Боёв для сравнения исходов (0 - пропустить)')
+    args = parser.parse_args()
+
+    bench_tick(args.fights, args.ticks)
+    if args.compare:
+        compare_outcomes(args.compare)
+
+
+if __name__ == '__main__':
+    main()
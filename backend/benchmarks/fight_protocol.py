@@ -0,0 +1,139 @@
+"""
+Бенчмарк форматов fight_update.
+
+Прогоняет состояния реальных боёв через FightStream во всех режимах
+(JSON / бинарный, полные кадры / дельты) и сравнивает размер кадров
+и время кодирования. В конце - доля отправленных кадров и трафик
+с адаптивной частотой (AdaptiveUpdateRate, GAME_FIGHT_SEND_RATES).
+Восстановление состояния клиентом проверяет
+pytest apps/game/tests/test_protocol.py.
+
+    python -m benchmarks.fight_protocol --frames 100000
+"""
+import argparse
+import json
+import random
+import time
+
+from django.conf import settings
+
+from benchmarks import setup_django
+
+setup_django()
+
+from apps.game.protocol import FightStream, FightStreamDecoder, fight_state_dict  # noqa: E402
+from apps.game.services.update_rate import AdaptiveUpdateRate  # noqa: E402
+from benchmarks.batch_fight import TICK, make_engine, play  # noqa: E402
+
+MODES = (
+    ('JSON', dict(binary=False, delta=False)),
+    ('binary', dict(binary=True, delta=False)),
+    ('JSON Δ', dict(binary=False, delta=True)),
+    ('binary Δ', dict(binary=True, delta=True)),
+)
+
+
+def collect_fights(frames: int) -> list:
+    """Состояния реальных боёв по тикам (список боёв), всего не меньше frames."""
+    rng = random.Random(3)
+    fights = []
+    total = 0
+    index = 0
+    while total < frames:
+        engine = make_engine(index, rng)
+        index += 1
+        states = []
+        for _ in range(3000):
+            play(engine)
+            state, result = engine.update(TICK)
+            states.append(state)
+            if result:
+                break
+        fights.append(states)
+        total += len(states)
+    return fights
+
+
+def wire(frame) -> bytes:
+    """Кадр в том виде, в каком он уходит в сокет (JSON - как send_json)."""
+    return frame if isinstance(frame, bytes) else json.dumps(frame).encode()
+
+
+def bench(name: str, options: dict, fights: list, keyframe_interval: int) -> int:
+    stream = FightStream(keyframe_interval=keyframe_interval, **options)
+    ticks = sum(len(states) for states in fights)
+    size = 0
+    sent = 0
+    start = time.perf_counter()
+    for states in fights:
+        stream.request_keyframe()
+        for state in states:
+            frame = stream.encode(state)
+            if frame is not None:
+                size += len(wire(frame))
+                sent += 1
+    elapsed = time.perf_counter() - start
+    print(
+        f'  {name:9} {size / ticks:6.1f} байт/тик  {elapsed / ticks * 1e6:6.2f} мкс/тик'
+        f'  кадров: {sent / ticks:5.1%}'
+    )
+    return size
+
+
+def bench_adaptive(name: str, options: dict, fights: list, keyframe_interval: int) -> None:
+    """Трафик с адаптивной частотой; состояние клиента проверяется в моменты отправки."""
+    stream = FightStream(keyframe_interval=keyframe_interval, **options)
+    rate = AdaptiveUpdateRate(
+        tick=TICK,
+        rates=settings.GAME_FIGHT_SEND_RATES,
+        urgent_tension=settings.GAME_FIGHT_URGENT_TENSION
+    )
+    decoder = FightStreamDecoder()
+    ticks = sum(len(states) for states in fights)
+    mismatches = 0
+    for states in fights:
+        stream.request_keyframe()
+        rate.reset()
+        for state in states:
+            if not rate.should_send(state):
+                continue
+            frame = stream.encode(state)
+            if frame is None:
+                continue
+            rate.record(len(wire(frame)))
+            decoded = decoder.apply(frame if isinstance(frame, bytes) else json.loads(wire(frame)))
+            if decoded != fight_state_dict(state):
+                mismatches += 1
+    stats = rate.stats
+    print(
+        f'  {name:9} {stats.bytes_sent / ticks:6.1f} байт/тик  кадров: {stats.frames_sent / ticks:5.1%}'
+        f'  расхождений: {mismatches}'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, default=100000)
+    parser.add_argument('--keyframe', type=int, default=20, help='Ключевой кадр раз в N тиков')
+    args = parser.parse_args()
+
+    fights = collect_fights(args.frames)
+    ticks = sum(len(states) for states in fights)
+    print(f'Боёв: {len(fights)}, тиков: {ticks}')
+
+    sizes = {}
+    print('Трафик и кодирование:')
+    for name, options in MODES:
+        sizes[name] = bench(name, options, fights, args.keyframe)
+    base = sizes['JSON']
+    print('  Трафик меньше JSON в: ' + ', '.join(
+        f'{name} {base / size:.1f}x' for name, size in sizes.items() if name != 'JSON'
+    ))
+
+    print(f'Адаптивная частота {settings.GAME_FIGHT_SEND_RATES} (шаг {TICK} с):')
+    for name, options in MODES:
+        bench_adaptive(name, options, fights, args.keyframe)
+
+
+if __name__ == '__main__':
+    main()
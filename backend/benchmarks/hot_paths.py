@@ -0,0 +1,400 @@
+"""
+Микробенчмарки горячих путей игрового ядра с базовой линией.
+
+Для каждого бенчмарка измеряются время одного вызова (медиана и минимум
+по раундам) и число запросов к БД на вызов. Результаты сравниваются
+с базовой линией benchmarks/hot_paths_baseline.json (отдельно для
+каждой СУБД):
+- запросов к БД больше, чем в базовой линии (любое увеличение), -
+  регрессия, скрипт завершается с кодом 1
+- время больше базового более чем на --tolerance (по умолчанию 30%) -
+  только предупреждение; с --fail-on-time тоже регрессия
+
+Число запросов детерминировано, а время зависит от машины и её
+загрузки, поэтому по умолчанию проверка времени лишь подсказывает.
+--fail-on-time имеет смысл, когда базовая линия записана (--save)
+на той же машине, где сравнивают.
+
+По умолчанию база - SQLite в памяти с миграциями и initial_data,
+--settings-db берёт базу из настроек (PostgreSQL). Каждый бенчмарк
+выполняется в транзакции, которая откатывается, - изменения профиля
+не копятся между запусками. Клёв считается для полудня (--hour).
+
+    python -m benchmarks.hot_paths                # сравнить с базовой линией
+    python -m benchmarks.hot_paths --save         # записать базовую линию
+    python -m benchmarks.hot_paths -k fight_engine --repeat 10
+"""
+import argparse
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks import fix_bite_hour, prepare_database, setup_django
+
+BASELINE_PATH = Path(__file__).with_name('hot_paths_baseline.json')
+
+# Операция бенчмарка: один вызов измеряемого кода
+Operation = Callable[[], object]
+
+
+@dataclass
+class Benchmark:
+    """Бенчмарк: setup() готовит данные и возвращает операцию."""
+    name: str
+    setup: Callable[[], Operation]
+    number: int  # Вызовов в раунде
+
+
+@dataclass
+class Measurement:
+    name: str
+    median_us: float
+    min_us: float
+    queries: float  # Запросов к БД на вызов
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, number: int):
+    """Зарегистрировать функцию подготовки бенчмарка."""
+    def decorator(setup: Callable[[], Operation]):
+        BENCHMARKS.append(Benchmark(name=name, setup=setup, number=number))
+        return setup
+    return decorator
+
+
+class QueryCounter:
+    """execute_wrapper: считает запросы соединения."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(bench: Benchmark, repeat: int) -> Measurement:
+    """Выполнить бенчмарк repeat раундов по bench.number вызовов."""
+    from django.db import connection
+
+    operation = bench.setup()
+    # Разогрев: загрузка справочника и прочих кэшей процесса не входит в замер
+    operation()
+
+    counter = QueryCounter()
+    timings = []
+    with connection.execute_wrapper(counter):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(bench.number):
+                operation()
+            timings.append((time.perf_counter() - start) / bench.number)
+    return Measurement(
+        name=bench.name,
+        median_us=statistics.median(timings) * 1e6,
+        min_us=min(timings) * 1e6,
+        queries=round(counter.count / (repeat * bench.number), 3),
+    )
+
+
+# --- Вываживание ---------------------------------------------------------
+
+def _fights(count: int = 256):
+    from benchmarks.batch_fight import make_engine
+
+    rng = random.Random(1)
+    return [make_engine(i, rng) for i in range(count)], rng
+
+
+@benchmark('FightEngine.update', number=20000)
+def fight_engine_update() -> Operation:
+    from benchmarks.batch_fight import TICK, make_engine, play
+
+    engines, rng = _fights()
+    slots = itertools.cycle(range(len(engines)))
+
+    def operation():
+        index = next(slots)
+        engine = engines[index]
+        play(engine)
+        _, result = engine.update(TICK)
+        if result:
+            # Закончившийся бой заменяется новым - число активных боёв постоянно
+            engines[index] = make_engine(index, rng)
+
+    return operation
+
+
+@benchmark('FightEngine.process_action', number=50000)
+def fight_engine_process_action() -> Operation:
+    from apps.game.services.fight_engine import PlayerAction
+
+    engines, _ = _fights()
+    actions = itertools.cycle(itertools.product(
+        engines,
+        ((PlayerAction.REEL, 1.0), (PlayerAction.RELEASE, 0), (PlayerAction.SET_DRAG, 0.4)),
+    ))
+
+    def operation():
+        engine, (action, value) = next(actions)
+        engine.process_action(action, value)
+
+    return operation
+
+
+@benchmark('FishAI.update', number=50000)
+def fish_ai_update() -> Operation:
+    from apps.game.models import FishState
+    from apps.game.services.fish_ai import FishAI
+    from benchmarks.batch_fight import FISH
+
+    rng = random.Random(1)
+    fish_ais = [FishAI(fish, fish.max_weight * 0.6, rng=rng) for fish in FISH]
+    calls = itertools.cycle(itertools.product(
+        fish_ais,
+        list(FishState),
+        (15.0, 55.0, 95.0),   # выносливость
+        (20.0, 60.0, 90.0),   # натяжение
+        (True, False),        # подмотка
+    ))
+
+    def operation():
+        fish_ai, state, stamina, tension, reeling = next(calls)
+        fish_ai.update(state, stamina, tension, reeling)
+
+    return operation
+
+
+# --- Клёв и награды ------------------------------------------------------
+
+@benchmark('BiteCalculator.calculate_bite', number=20000)
+def bite_calculator_calculate_bite() -> Operation:
+    from apps.fishing.models import Location
+    from apps.fishing.services.bite_calculator import BiteCalculator
+    from core.catalog import get_catalog
+
+    baits = [bait.id for bait in get_catalog().all('baits')]
+    calculators = itertools.cycle([
+        BiteCalculator(
+            location_id=location.id,
+            bait_id=bait_id,
+            cast_distance=20,
+            depth=location.max_depth * share,
+        )
+        for location in Location.objects.order_by('id')
+        for bait_id in baits
+        for share in (0.3, 0.6, 1.0)
+    ])
+
+    def operation():
+        next(calculators).calculate_bite()
+
+    return operation
+
+
+@benchmark('Fish.calculate_price+experience', number=100000)
+def fish_price_experience() -> Operation:
+    from core.catalog import get_catalog
+
+    catches = itertools.cycle([
+        (fish, fish.min_weight + (fish.max_weight - fish.min_weight) * share)
+        for fish in get_catalog().all('fish')
+        for share in (0.1, 0.5, 0.9)
+    ])
+
+    def operation():
+        fish, weight = next(catches)
+        return fish.calculate_price(weight), fish.calculate_experience(weight)
+
+    return operation
+
+
+def _player():
+    """Игрок бенчмарков с профилем и статистикой."""
+    from apps.users.models import User
+
+    user, _ = User.objects.get_or_create(username='bench', defaults={'email': 'bench@bench.test'})
+    return User.objects.select_related('profile', 'stats').get(pk=user.pk)
+
+
+@benchmark('PlayerProfile.add_experience', number=2000)
+def profile_add_experience() -> Operation:
+    profile = _player().profile
+
+    def operation():
+        profile.add_experience(7)
+
+    return operation
+
+
+@benchmark('PlayerProfile.add_experience(save=False)', number=100000)
+def profile_add_experience_in_memory() -> Operation:
+    profile = _player().profile
+
+    def operation():
+        profile.add_experience(7, save=False)
+
+    return operation
+
+
+@benchmark('ProgressionService.check_achievements', number=20000)
+def progression_check_achievements() -> Operation:
+    from apps.progression.services import ProgressionService
+    from core.catalog import get_catalog
+
+    service = ProgressionService(_player())
+    fish = itertools.cycle(get_catalog().all('fish'))
+
+    def operation():
+        service.check_achievements(fish=next(fish), save=False)
+
+    return operation
+
+
+# --- Списки справочника (HTTP) -------------------------------------------
+
+CATALOG_ENDPOINTS = (
+    '/api/fishing/locations',
+    '/api/fishing/locations/1/fish',
+    '/api/equipment/rods',
+    '/api/equipment/reels',
+    '/api/equipment/lines',
+    '/api/equipment/baits',
+    '/api/progression/achievements',
+)
+
+
+def _endpoint_benchmark(path: str) -> Callable[[], Operation]:
+    def setup() -> Operation:
+        from django.test import Client
+        from ninja_jwt.tokens import RefreshToken
+
+        token = RefreshToken.for_user(_player()).access_token
+        client = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        def operation():
+            response = client.get(path)
+            assert response.status_code == 200, (path, response.status_code)
+
+        return operation
+    return setup
+
+
+for _path in CATALOG_ENDPOINTS:
+    benchmark(f'GET {_path}', number=300)(_endpoint_benchmark(_path))
+
+
+# --- Сравнение с базовой линией ------------------------------------------
+
+def load_baseline() -> Dict[str, dict]:
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text())
+
+
+def save_baseline(vendor: str, measurements: List[Measurement]) -> None:
+    """Записать результаты в базовую линию СУБД (остальные бенчмарки сохраняются)."""
+    baseline = load_baseline()
+    entries = baseline.setdefault(vendor, {})
+    for m in measurements:
+        entries[m.name] = {'us': round(m.median_us, 3), 'queries': m.queries}
+    baseline[vendor] = dict(sorted(entries.items()))
+    BASELINE_PATH.write_text(json.dumps(baseline, ensure_ascii=False, indent=2, sort_keys=True) + '\n')
+
+
+def compare(measurement: Measurement, base: Optional[dict], tolerance: float) -> Tuple[List[str], List[str]]:
+    """
+    Отличия измерения от базовой линии.
+
+    Returns:
+        (рост числа запросов, рост времени сверх tolerance)
+    """
+    if base is None:
+        return [], []
+    queries, timing = [], []
+    if measurement.queries > base['queries']:
+        queries.append(f'запросов {measurement.queries:g} > {base["queries"]:g}')
+    if measurement.median_us > base['us'] * (1 + tolerance):
+        timing.append(f'время {measurement.median_us:.2f} мкс > {base["us"]:.2f} мкс + {tolerance:.0%}')
+    return queries, timing
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Микробенчмарки игрового ядра')
+    parser.add_argument('-k', dest='pattern', help='Только бенчмарки, в имени которых есть подстрока')
+    parser.add_argument('--repeat', type=int, default=5, help='Раундов на бенчмарк')
+    parser.add_argument('--tolerance', type=float, default=0.3, help='Допустимый рост времени (доля)')
+    parser.add_argument(
+        '--fail-on-time', action='store_true',
+        help='Рост времени - тоже регрессия (базовая линия записана на этой машине)'
+    )
+    parser.add_argument('--save', action='store_true', help='Записать результаты как базовую линию')
+    parser.add_argument('--settings-db', action='store_true', help='База из настроек вместо SQLite в памяти')
+    parser.add_argument('--hour', type=int, default=12, help='Час суток для расчёта клёва')
+    args = parser.parse_args()
+
+    setup_django(
+        None if args.settings_db
+        else {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}}
+    )
+    from django.db import connection, transaction
+
+    prepare_database()
+    fix_bite_hour(args.hour)
+
+    selected = [b for b in BENCHMARKS if not args.pattern or args.pattern.lower() in b.name.lower()]
+    vendor = connection.vendor
+    baseline = load_baseline().get(vendor, {})
+
+    print(f'СУБД: {vendor}, раундов: {args.repeat}, допуск по времени: {args.tolerance:.0%}')
+    print(f'{"бенчмарк":<46}{"медиана, мкс":>14}{"мин, мкс":>12}{"запросов":>10}{"база, мкс":>12}')
+    measurements = []
+    regressions = []
+    slowdowns = []
+    for bench in selected:
+        with transaction.atomic():
+            measurement = measure(bench, args.repeat)
+            transaction.set_rollback(True)
+        measurements.append(measurement)
+        base = baseline.get(bench.name)
+        queries, timing = compare(measurement, base, args.tolerance)
+        if args.fail_on_time:
+            queries, timing = queries + timing, []
+        regressions += [f'{bench.name}: {problem}' for problem in queries]
+        slowdowns += [f'{bench.name}: {problem}' for problem in timing]
+        print(
+            f'{bench.name:<46}{measurement.median_us:>14.2f}{measurement.min_us:>12.2f}'
+            f'{measurement.queries:>10g}{base["us"] if base else "-":>12}'
+            + ('  РЕГРЕССИЯ' if queries else '  медленнее' if timing else '')
+        )
+
+    if args.save:
+        save_baseline(vendor, measurements)
+        print(f'Базовая линия записана: {BASELINE_PATH.name} ({vendor})')
+        return
+
+    missing = [m.name for m in measurements if m.name not in baseline]
+    if missing:
+        print(f'Нет в базовой линии (--save): {", ".join(missing)}')
+    if slowdowns:
+        print('Медленнее базовой линии (предупреждение, см. --fail-on-time):')
+        for slowdown in slowdowns:
+            print(f'  {slowdown}')
+    if regressions:
+        print('Регрессии:')
+        for regression in regressions:
+            print(f'  {regression}')
+        sys.exit(1)
+    print('Регрессий нет')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Бенчмарк кодирования JSON (core/json_codec.py).
+
+Сравнивает стандартный json и orjson на типичных сообщениях:
+fight_update (полное состояние и дельта), результат поимки (catch)
+и список рыбы справочника. Для каждого сообщения проверяет, что оба
+бэкенда после декодирования дают одинаковые данные.
+
+    python -m benchmarks.json_codec --repeat 50000
+"""
+import argparse
+import random
+import time
+
+from benchmarks import setup_django
+
+setup_django()
+
+from apps.fishing.models import Rarity  # noqa: E402
+from apps.game.protocol import FightStream  # noqa: E402
+from benchmarks.batch_fight import TICK, make_engine, play  # noqa: E402
+from core.json_codec import BACKENDS, orjson  # noqa: E402
+
+RARITIES = Rarity.choices
+
+
+def fight_updates() -> tuple:
+    """Полное сообщение fight_update и дельта из середины реального боя."""
+    engine = make_engine(0, random.Random(5))
+    full = FightStream()
+    delta = FightStream(delta=True, keyframe_interval=1000)
+    full_message = delta_message = None
+    for tick in range(40):
+        play(engine)
+        state, _ = engine.update(TICK)
+        full_message = full.encode(state)
+        message = delta.encode(state)
+        if tick > 0 and message is not None:
+            delta_message = message
+    return full_message, delta_message
+
+
+def catch_message() -> dict:
+    """Сообщение об успешной поимке с достижениями."""
+    return {
+        'type': 'catch',
+        'result': {
+            'success': True,
+            'fish_name': 'Щука',
+            'weight': 4.37,
+            'price': 1311,
+            'experience': 174,
+            'leveled_up': True,
+            'new_level': 12,
+            'achievements': ['Первый улов', 'Хищник', 'Трофейная рыба'],
+        },
+    }
+
+
+def catalog_fish(count: int = 40) -> list:
+    """Список рыбы в формате GET /api/fishing/locations/{id}/fish."""
+    return [
+        {
+            'id': i,
+            'name': f'Рыба {i}',
+            'description': 'Осторожная рыба, которая держится у дна и выходит кормиться на рассвете.',
+            'image': f'/media/fish/{i}.png' if i % 3 else None,
+            'min_weight': round(0.1 * i, 2),
+            'max_weight': round(1.5 * i, 2),
+            'rarity': RARITIES[i % len(RARITIES)][0],
+            'rarity_display': RARITIES[i % len(RARITIES)][1],
+            'base_price': 50 * i,
+            'strength': 20 + i % 80,
+            'stamina': 30 + i % 70,
+            'aggressiveness': 15 + i % 85,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def timed(func, payload, repeat: int) -> float:
+    """Среднее время одного вызова (мкс)."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(payload)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=50000)
+    args = parser.parse_args()
+
+    full, delta = fight_updates()
+    payloads = (
+        ('fight_update', full, args.repeat),
+        ('fight_update Δ', delta, args.repeat),
+        ('catch', catch_message(), args.repeat),
+        ('catalog (40 рыб)', catalog_fish(), max(1, args.repeat // 20)),
+    )
+
+    if orjson is None:
+        print('orjson не установлен - доступен только стандартный json')
+    backends = [cls() for name, cls in BACKENDS.items() if name != 'orjson' or orjson is not None]
+
+    for title, payload, repeat in payloads:
+        print(f'{title}:')
+        decoded = []
+        results = {}
+        for backend in backends:
+            text = backend.dumps(payload)
+            decoded.append(backend.loads(text))
+            results[backend.name] = (
+                len(backend.dumps_bytes(payload)),
+                timed(backend.dumps, payload, repeat),
+                timed(backend.dumps_bytes, payload, repeat),
+                timed(backend.loads, text, repeat),
+            )
+        for name, (size, dumps, dumps_bytes, loads) in results.items():
+            print(
+                f'  {name:7} {size:6} байт  dumps {dumps:7.2f} мкс  '
+                f'dumps_bytes {dumps_bytes:7.2f} мкс  loads {loads:7.2f} мкс'
+            )
+        if len(results) > 1:
+            base, fast = results['json'], results['orjson']
+            print(f'  orjson быстрее: dumps {base[1] / fast[1]:.1f}x, loads {base[3] / fast[3]:.1f}x')
+        same = all(data == decoded[0] for data in decoded)
+        print(f'  данные совпадают: {"да" if same else "НЕТ"}')
+
+
+if __name__ == '__main__':
+    main()
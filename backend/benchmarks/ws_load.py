@@ -0,0 +1,533 @@
+"""
+Нагрузочный тест WebSocket ws/game/.
+
+Запускает N рыболовов: каждый подключается со своим JWT, входит
+в локацию и по кругу проходит полный цикл join → cast → bite → hook →
+reel / release / set_drag → catch с человеческими задержками (раздумье
+перед забросом, реакция на поклёвку, ввод во время боя 7-12 раз в секунду).
+В бою рыболов держит фрикцион на 1.0, стравливает при натяжении выше 65
+и подматывает, пока рыба не в рывке, - с лучшими снастями справочника
+так вываживается около половины рыбы, и ветка поимки тоже нагружена.
+
+По умолчанию сервер работает в этом же процессе: ASGI-приложение
+fishing_game.asgi через channels.testing.WebsocketCommunicator, слой
+каналов и хранилища - из настроек (в development - в памяти), база -
+из настроек или отдельный SQLite (--sqlite, миграции и initial_data
+накатываются автоматически). С --url рыболовы подключаются к живому
+серверу по сети (нужен пакет websockets), тогда тики и запросы к БД
+сервера не видны.
+
+Отчёт:
+- задержки ответа (p50/p95/p99) по типам: connect, join, cast, hook
+- интервалы между fight_update на клиенте и их отклонение от шага
+- отставание кадров TickScheduler от расписания и его перегрузки
+- сообщения в секунду (приём и отправка)
+- доля пойманной рыбы, запросы к БД на бой и на пойманную рыбу
+  (с фоновым сбросом итогов)
+
+Поклёвка в игре ждёт 15-60 секунд; --time-scale сокращает ожидание
+поклёвки и повторной попытки, --hour фиксирует час суток, от которого
+зависит активность рыбы (оба - только в процессе). Бой идёт в реальном
+времени.
+
+    python -m benchmarks.ws_load --anglers 200 --duration 120 --sqlite /tmp/load.sqlite3 --time-scale 0.05 --hour 12
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from benchmarks import fix_bite_hour, prepare_database, setup_django
+
+# Стратегия боя: та же, что в тестах эквивалентности движков
+RELEASE_TENSION = 65
+
+# Ответ сервера -> на какой запрос он отвечает
+REPLIES = {
+    'connected': 'connect',
+    'joined': 'join',
+    'cast_result': 'cast',
+    'fight_started': 'hook',
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль q (0-100) по ближайшему рангу."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LoadStats:
+    """Метрики прогона, общие для всех рыболовов."""
+
+    def __init__(self):
+        self.latency: Dict[str, List[float]] = defaultdict(list)
+        self.update_gaps: List[float] = []
+        self.fight_seconds: List[float] = []
+        self.bite_waits: List[float] = []
+        self.received: Counter = Counter()
+        self.sent: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.escapes: Counter = Counter()
+        self.fights = 0
+        self.catches = 0
+
+    def report(self, elapsed: float, tick: float) -> None:
+        print(f'{"запрос":<10}{"n":>8}{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}')
+        for name in ('connect', 'join', 'cast', 'hook'):
+            values = [v * 1000 for v in self.latency.get(name, [])]
+            print(
+                f'{name:<10}{len(values):>8}{percentile(values, 50):>10.1f}'
+                f'{percentile(values, 95):>10.1f}{percentile(values, 99):>10.1f}'
+            )
+
+        gaps = [gap * 1000 for gap in self.update_gaps]
+        # Отклонение интервала от ближайшего кратного шага: кадры
+        # пропускаются адаптивной частотой, но приходят по сетке тиков
+        jitter = [abs(gap - round(gap / (tick * 1000)) * tick * 1000) for gap in gaps]
+        print()
+        print(
+            f'fight_update: {len(gaps)} интервалов, p50 {percentile(gaps, 50):.1f} мс, '
+            f'p99 {percentile(gaps, 99):.1f} мс; отклонение от сетки шага {tick * 1000:.0f} мс: '
+            f'p50 {percentile(jitter, 50):.1f}, p95 {percentile(jitter, 95):.1f}, '
+            f'p99 {percentile(jitter, 99):.1f} мс'
+        )
+        waits = self.bite_waits
+        finished = self.catches + sum(self.escapes.values())
+        print(
+            f'Ожидание поклёвки: {len(waits)}, p50 {percentile(waits, 50):.1f} с; '
+            f'боёв: {self.fights}, длительность боя p50 {percentile(self.fight_seconds, 50):.1f} с'
+        )
+        print(
+            f'Поймано: {self.catches} из {finished} завершённых боёв '
+            f'({self.catches / finished if finished else 0:.0%})'
+            + (f', сошли: {dict(self.escapes)}' if self.escapes else '')
+        )
+
+        received, sent = sum(self.received.values()), sum(self.sent.values())
+        print(
+            f'Сообщений: принято {received} ({received / elapsed:.0f}/с), '
+            f'отправлено {sent} ({sent / elapsed:.0f}/с)'
+        )
+        print('  принято по типам:', dict(self.received.most_common()))
+        print('  отправлено по типам:', dict(self.sent.most_common()))
+        if self.errors:
+            print('Ошибки:', dict(self.errors.most_common()))
+
+
+class InProcessTransport:
+    """Соединение с ASGI-приложением этого процесса."""
+
+    def __init__(self, path: str):
+        from channels.testing import WebsocketCommunicator
+        from fishing_game.asgi import application
+
+        self.communicator = WebsocketCommunicator(application, path)
+
+    async def connect(self) -> None:
+        connected, _ = await self.communicator.connect(timeout=30)
+        if not connected:
+            raise ConnectionError('Соединение отклонено')
+
+    async def send(self, text: str) -> None:
+        await self.communicator.send_to(text_data=text)
+
+    async def receive(self) -> str:
+        return await self.communicator.receive_from(timeout=3600)
+
+    async def close(self) -> None:
+        await self.communicator.disconnect()
+
+
+class NetworkTransport:
+    """Соединение с сервером по сети (пакет websockets)."""
+
+    def __init__(self, url: str):
+        try:
+            import websockets
+        except ImportError:
+            raise SystemExit('Для --url нужен пакет websockets: pip install websockets') from None
+        self.websockets = websockets
+        self.url = url
+        self.socket = None
+
+    async def connect(self) -> None:
+        self.socket = await self.websockets.connect(self.url, max_size=None)
+
+    async def send(self, text: str) -> None:
+        await self.socket.send(text)
+
+    async def receive(self) -> str:
+        return await self.socket.recv()
+
+    async def close(self) -> None:
+        await self.socket.close()
+
+
+class Angler:
+    """Один рыболов: читает сообщения в фоне и играет по кругу."""
+
+    def __init__(self, transport, location_id: int, stats: LoadStats, deadline: float, rng: random.Random):
+        self.transport = transport
+        self.location_id = location_id
+        self.stats = stats
+        self.deadline = deadline
+        self.rng = rng
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.pending: Dict[str, float] = {}
+        self.state: dict = {}
+        self.last_update: Optional[float] = None
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.pending['connect'] = loop.time()
+        try:
+            await self.transport.connect()
+        except Exception as e:
+            self.stats.errors[f'connect: {e}'] += 1
+            return
+        reader = asyncio.create_task(self._read())
+        try:
+            await self._expect('connected')
+            await self._send({'type': 'join', 'location_id': self.location_id}, 'join')
+            if await self._expect('joined'):
+                while loop.time() < self.deadline:
+                    await self._fish()
+        finally:
+            reader.cancel()
+            await self.transport.close()
+
+    async def _read(self) -> None:
+        """Принимать сообщения, отмечая время ответа на запросы."""
+        loop = asyncio.get_running_loop()
+        while True:
+            message = json.loads(await self.transport.receive())
+            now = loop.time()
+            message_type = message.get('type')
+            self.stats.received[message_type] += 1
+            request = REPLIES.get(message_type)
+            if request in self.pending:
+                self.stats.latency[request].append(now - self.pending.pop(request))
+            if message_type == 'fight_update':
+                if self.last_update is not None:
+                    self.stats.update_gaps.append(now - self.last_update)
+                self.last_update = now
+            elif message_type == 'error':
+                self.stats.errors[message.get('message', '')] += 1
+            self.inbox.put_nowait((now, message))
+
+    async def _send(self, message: dict, request: Optional[str] = None) -> None:
+        if request:
+            self.pending[request] = asyncio.get_running_loop().time()
+        self.stats.sent[message['type']] += 1
+        await self.transport.send(json.dumps(message))
+
+    async def _next(self, timeout: float):
+        """Следующее сообщение или (None, None) по таймауту."""
+        try:
+            return await asyncio.wait_for(self.inbox.get(), max(timeout, 0))
+        except asyncio.TimeoutError:
+            return None, None
+
+    async def _expect(self, message_type: str) -> bool:
+        loop = asyncio.get_running_loop()
+        while loop.time() < self.deadline:
+            _, message = await self._next(self.deadline - loop.time())
+            if message is None or message['type'] == 'error':
+                return False
+            if message['type'] == message_type:
+                return True
+        return False
+
+    async def _fish(self) -> None:
+        """Один заброс: ждать поклёвку, подсечь и вывести рыбу."""
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(self.rng.uniform(1, 4))
+        await self._send({
+            'type': 'cast',
+            'power': round(self.rng.uniform(0.3, 1), 2),
+            'angle': self.rng.randint(20, 60),
+        }, 'cast')
+        if not await self._expect('cast_result'):
+            await asyncio.sleep(1)
+            return
+        cast_at = loop.time()
+
+        while True:
+            _, message = await self._next(self.deadline - loop.time())
+            if message is None:
+                return
+            if message['type'] == 'bite':
+                self.stats.bite_waits.append(loop.time() - cast_at)
+                break
+            if message['type'] == 'error':
+                return
+
+        await asyncio.sleep(self.rng.uniform(0.3, 0.9))
+        await self._send({'type': 'hook'}, 'hook')
+        if not await self._expect('fight_started'):
+            return
+        await self._send({'type': 'set_drag', 'level': 1.0})
+        await self._fight()
+
+    async def _fight(self) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self.stats.fights += 1
+        self.state = {}
+        self.last_update = None
+        next_input = started + self.rng.uniform(0.2, 0.5)
+        while True:
+            # Время до конца прогона не ограничивает бой: его итоги нужны отчёту
+            _, message = await self._next(next_input - loop.time())
+            if message is None:
+                await self._control()
+                next_input = loop.time() + self.rng.uniform(0.08, 0.15)
+                continue
+            if message['type'] == 'fight_update':
+                # В дельта-режиме приходят только изменившиеся поля
+                self.state.update(message.get('state', {}))
+            elif message['type'] == 'catch':
+                self.stats.fight_seconds.append(loop.time() - started)
+                result = message['result']
+                if result.get('success'):
+                    self.stats.catches += 1
+                else:
+                    self.stats.escapes[result.get('reason', '')] += 1
+                return
+            elif message['type'] == 'error':
+                return
+
+    async def _control(self) -> None:
+        """
+        Решение игрока по последнему известному состоянию боя.
+
+        Стравливание и подмотка в одном вводе не исключают друг друга:
+        TickScheduler сливает их в кадре в порядке release → reel.
+        """
+        if self.state.get('line_tension', 0) > RELEASE_TENSION:
+            await self._send({'type': 'release'})
+        if self.state.get('fish_state') != 'rush':
+            await self._send({'type': 'reel', 'speed': 1.0})
+
+
+def ensure_anglers(count: int, prefix: str) -> List[tuple]:
+    """
+    Пользователи prefix_0..prefix_{count-1} со снастями и JWT.
+
+    Удилище, катушка и леска - лучшие (самые дорогие) в справочнике,
+    наживка - самая дешёвая. Уже созданные пользователи переиспользуются,
+    недостающие или другие снасти докупаются и надеваются.
+    """
+    from ninja_jwt.tokens import RefreshToken
+
+    from apps.equipment.models import Bait, Line, Reel, Rod
+    from apps.inventory.models import PlayerEquipment
+    from apps.inventory.services import InventoryService
+    from apps.users.models import User
+
+    tackle = {
+        slot: model.objects.order_by(order).values_list('id', flat=True).first()
+        for slot, model, order in (
+            ('rod', Rod, '-price'), ('reel', Reel, '-price'), ('line', Line, '-price'), ('bait', Bait, 'price'),
+        )
+    }
+    anglers = []
+    for index in range(count):
+        username = f'{prefix}_{index}'
+        user = User.objects.filter(username=username).first()
+        if user is None:
+            user = User.objects.create_user(username=username, email=f'{username}@load.test')
+            user.profile.money = 10_000_000
+            user.profile.level = 50
+            user.profile.save()
+            user = User.objects.get(pk=user.pk)
+        equipped = PlayerEquipment.objects.filter(player=user).select_related('rod', 'reel', 'line', 'bait').first()
+        service = InventoryService(user)
+        for slot, item_id in tackle.items():
+            item = getattr(equipped, slot, None) if equipped else None
+            if item is None or item.object_id != item_id or (slot == 'bait' and item.quantity < 100):
+                bought = service.purchase_item(slot, item_id, 1000 if slot == 'bait' else 1)
+                service.equip_item(bought.id, slot)
+        anglers.append((user, str(RefreshToken.for_user(user).access_token)))
+    return anglers
+
+
+def scale_bite_waits(scale: float) -> None:
+    """Сократить ожидание поклёвки и повторной попытки в scale раз."""
+    from apps.fishing.services.bite_calculator import BiteCalculator
+    from apps.game.services.game_session import GameSessionService
+
+    calculate_bite = BiteCalculator.calculate_bite
+
+    def scaled(self):
+        result = calculate_bite(self)
+        result.wait_time *= scale
+        return result
+
+    BiteCalculator.calculate_bite = scaled
+    GameSessionService.BITE_RETRY_DELAY *= scale
+
+
+class QueryCounter:
+    """Счётчик запросов ко всем соединениям с БД (и открытым позже)."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self) -> None:
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        for connection in connections.all():
+            self._attach(connection)
+        connection_created.connect(self._on_connection, weak=False)
+
+    def _on_connection(self, sender, connection, **kwargs):
+        self._attach(connection)
+
+    def _attach(self, connection) -> None:
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+class TickLag:
+    """Отставание кадров TickScheduler от расписания."""
+
+    def __init__(self):
+        self.lags: List[float] = []
+        self.durations: List[float] = []
+
+    def install(self) -> None:
+        from apps.game.services.tick_scheduler import get_tick_scheduler
+
+        scheduler = get_tick_scheduler()
+        record_frame = scheduler._record_frame
+
+        def recorded(duration: float, lag: float) -> None:
+            self.durations.append(duration)
+            self.lags.append(lag)
+            record_frame(duration, lag)
+
+        scheduler._record_frame = recorded
+
+    def report(self) -> None:
+        from apps.game.services.tick_scheduler import get_tick_scheduler
+
+        metrics = get_tick_scheduler().metrics
+        lags = [lag * 1000 for lag in self.lags]
+        durations = [duration * 1000 for duration in self.durations]
+        print(
+            f'Кадры TickScheduler: {metrics.frames}, отставание p50 {percentile(lags, 50):.1f} / '
+            f'p99 {percentile(lags, 99):.1f} / max {max(lags, default=0):.1f} мс, '
+            f'работа кадра p99 {percentile(durations, 99):.2f} мс; перегрузок {metrics.overruns}, '
+            f'догонка {metrics.catch_up_steps} шагов, отброшено {metrics.dropped_steps}'
+        )
+        print(f'Ввод: сообщений {metrics.input_messages}, действий после слияния {metrics.input_actions}')
+        print(f'Кадров слито из-за медленной отправки: {metrics.coalesced_updates}')
+
+
+async def run_load(args, anglers: List[tuple], location_ids: List[int], stats: LoadStats) -> float:
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + args.ramp_up + args.duration
+    query = '&delta=1' if args.delta else ''
+    tasks = []
+    for index, (user, token) in enumerate(anglers):
+        path = f'/ws/game/?token={token}{query}'
+        transport = NetworkTransport(args.url.rstrip('/') + path) if args.url else InProcessTransport(path)
+        angler = Angler(
+            transport, location_ids[index % len(location_ids)], stats, deadline,
+            random.Random(args.seed + index)
+        )
+        tasks.append(asyncio.create_task(angler.run()))
+        # Подключения растянуты на ramp_up секунд
+        await asyncio.sleep(args.ramp_up / len(anglers))
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return loop.time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный тест WebSocket ws/game/')
+    parser.add_argument('--anglers', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=60, help='Секунд игры после подключения всех')
+    parser.add_argument('--ramp-up', type=float, default=5, help='За сколько секунд подключить всех')
+    parser.add_argument('--time-scale', type=float, default=1, help='Множитель ожидания поклёвки')
+    parser.add_argument('--hour', type=int, help='Час суток для активности рыбы (по умолчанию - текущий)')
+    parser.add_argument('--location', type=int, action='append', help='Локация (можно несколько)')
+    parser.add_argument('--delta', action='store_true', help='Дельта-кодирование fight_update')
+    parser.add_argument('--sqlite', help='Файл SQLite вместо базы из настроек')
+    parser.add_argument('--url', help='ws://host:port живого сервера вместо процесса')
+    parser.add_argument('--prefix', default='load')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    setup_django(
+        {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': args.sqlite}} if args.sqlite else None
+    )
+
+    from django.conf import settings
+
+    from apps.fishing.models import Location
+
+    if args.sqlite:
+        prepare_database()
+    if args.url and (args.time_scale != 1 or args.hour is not None):
+        parser.error('--time-scale и --hour работают только без --url')
+    if args.time_scale != 1:
+        scale_bite_waits(args.time_scale)
+    if args.hour is not None:
+        fix_bite_hour(args.hour)
+
+    setup_started = time.perf_counter()
+    anglers = ensure_anglers(args.anglers, args.prefix)
+    location_ids = args.location or list(
+        Location.objects.filter(is_active=True, required_level__lte=50).values_list('id', flat=True)
+    )
+    print(
+        f'Рыболовов: {len(anglers)} (подготовка {time.perf_counter() - setup_started:.1f} с), '
+        f'локации: {location_ids}, {settings.DATABASES["default"]["ENGINE"].rsplit(".", 1)[-1]}, '
+        f'{"сеть " + args.url if args.url else "в процессе"}'
+    )
+
+    stats = LoadStats()
+    queries = QueryCounter()
+    ticks = TickLag()
+    if not args.url:
+        queries.install()
+        ticks.install()
+
+    elapsed = asyncio.run(run_load(args, anglers, location_ids, stats))
+
+    print(f'Прогон: {elapsed:.1f} с')
+    print()
+    stats.report(elapsed, settings.GAME_FIGHT_TICK)
+    if args.url:
+        return
+
+    from apps.game.services.write_behind import get_write_behind_queue
+
+    # Итоги последних боёв ещё в журнале отложенной записи
+    if settings.GAME_WRITE_BEHIND:
+        get_write_behind_queue().flush_all()
+    ticks.report()
+    per_fight = queries.count / stats.fights if stats.fights else 0
+    per_catch = queries.count / stats.catches if stats.catches else 0
+    print(
+        f'Запросов к БД: {queries.count}, на бой: {per_fight:.1f}, на пойманную рыбу: {per_catch:.1f} '
+        f'(включая забросы и поклёвки)'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,14 @@
+"""
+Shared pytest fixtures.
+"""
+import pytest
+
+from core.catalog import registry
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog():
+    """Drop the process catalog snapshot: each test's database is rolled back."""
+    registry._catalog = None
+    yield
+    registry._catalog = None
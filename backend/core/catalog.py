@@ -0,0 +1,163 @@
+"""
+Process-local catalog of reference tables.
+
+Small, rarely changing tables (equipment, fish, locations) are loaded once
+per process into immutable value objects and read from memory afterwards.
+
+Every snapshot carries a version token stored in the Django cache
+(CATALOG_CACHE). Saving or deleting a catalog row replaces the token
+after the transaction commits. Each worker compares its snapshot's
+token with the cache at most once per CATALOG_CHECK_INTERVAL seconds
+and reloads on mismatch. With a shared cache backend (Redis, Memcached)
+this invalidates every worker. With the default LocMemCache it only
+invalidates the current process.
+"""
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Model, QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+
+@dataclass
+class CatalogTable:
+    """A registered table: queryset to load and how to turn rows into entries."""
+    queryset: QuerySet
+    factory: Callable[[Model], Any]
+    key: Callable[[Model], Hashable]
+
+
+class Catalog:
+    """Immutable snapshot of all registered tables."""
+
+    __slots__ = ('version', '_tables', '_derived', '_lock')
+
+    def __init__(self, version: str, tables: Dict[str, Dict[Hashable, Any]]):
+        self.version = version
+        self._tables = tables
+        self._derived: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, table: str, key: Hashable, default: Any = None) -> Any:
+        """Entry by key (primary key unless the table defines its own)."""
+        return self._tables[table].get(key, default)
+
+    def all(self, table: str) -> list:
+        """All entries of a table in queryset order."""
+        return list(self._tables[table].values())
+
+    def derived(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """
+        Data computed from this snapshot (e.g. lookup indexes).
+
+        Built once per snapshot and dropped together with it.
+        """
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = build()
+            return self._derived[key]
+
+
+class CatalogRegistry:
+    """Registry of catalog tables with version-based invalidation."""
+
+    def __init__(self):
+        self._tables: Dict[str, CatalogTable] = {}
+        self._catalog: Optional[Catalog] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        queryset: QuerySet,
+        factory: Callable[[Model], Any],
+        key: Callable[[Model], Hashable] = lambda obj: obj.pk
+    ) -> None:
+        """
+        Register a table and invalidate the catalog whenever its model changes.
+
+        Args:
+            name: Table name used in Catalog.get()/all()
+            queryset: Rows to load (may use select_related/prefetch_related)
+            factory: Converts a row into an immutable entry
+            key: Entry key, primary key by default
+        """
+        self._tables[name] = CatalogTable(queryset=queryset, factory=factory, key=key)
+        self.watch(queryset.model)
+        self._catalog = None
+
+    def watch(self, *models) -> None:
+        """Invalidate the catalog on save/delete of models (and m2m changes of through models)."""
+        for model in models:
+            post_save.connect(self._on_change, sender=model, weak=False)
+            post_delete.connect(self._on_change, sender=model, weak=False)
+            m2m_changed.connect(self._on_m2m_change, sender=model, weak=False)
+
+    def get(self) -> Catalog:
+        """Current snapshot, reloaded if another worker changed the catalog."""
+        catalog = self._catalog
+        now = time.monotonic()
+
+        if catalog is not None and now - self._checked_at < settings.CATALOG_CHECK_INTERVAL:
+            return catalog
+
+        with self._lock:
+            catalog = self._catalog
+            version = self._cache().get(CATALOG_VERSION_KEY)
+            if catalog is None or version != catalog.version:
+                catalog = self._load(version)
+                self._catalog = catalog
+            self._checked_at = now
+            return catalog
+
+    def invalidate(self) -> None:
+        """Publish a new version (after commit) and drop this process's snapshot."""
+        def publish():
+            self._cache().set(CATALOG_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+            self._catalog = None
+
+        transaction.on_commit(publish)
+
+    def _load(self, version: Optional[str]) -> Catalog:
+        """Load all tables; the version is read before loading so a concurrent change triggers a reload."""
+        if version is None:
+            version = uuid.uuid4().hex
+            if not self._cache().add(CATALOG_VERSION_KEY, version, timeout=None):
+                version = self._cache().get(CATALOG_VERSION_KEY)
+
+        tables = {
+            name: {table.key(obj): table.factory(obj) for obj in table.queryset.all()}
+            for name, table in self._tables.items()
+        }
+        return Catalog(version, tables)
+
+    def _cache(self):
+        return caches[settings.CATALOG_CACHE]
+
+    def _on_change(self, sender, **kwargs) -> None:
+        self.invalidate()
+
+    def _on_m2m_change(self, sender, action, **kwargs) -> None:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            self.invalidate()
+
+
+registry = CatalogRegistry()
+
+
+def get_catalog() -> Catalog:
+    """Current catalog snapshot of this process."""
+    return registry.get()
@@ -0,0 +1,133 @@
+"""
+Atomic counter updates.
+
+CounterUpdate collects changes to numeric fields of one row and applies
+them as a single UPDATE: counters as `x = x + n`, records through
+Greatest / Least. Nothing is read first, so concurrent writers do not
+overwrite each other's changes, and several counters changed by one
+game event cost one statement.
+
+The same changes can be mirrored onto an already loaded instance
+(apply_to), so services keep their in-memory models current without
+reloading them.
+"""
+from typing import Any, Dict, Optional, Type
+
+from django.db.models import Case, F, Model, Value, When
+from django.db.models.functions import Greatest, Least
+
+
+class CounterUpdate:
+    """
+    Pending changes to the counters of one row.
+
+        update = CounterUpdate.for_instance(stats)
+        update.add('successful_catches').max('longest_fight_seconds', 42)
+        update.execute()         # one UPDATE
+        update.apply_to(stats)   # same changes in memory
+    """
+
+    def __init__(self, model: Type[Model], **lookup):
+        self.model = model
+        self.lookup = lookup
+        self._add: Dict[str, Any] = {}
+        self._max: Dict[str, Any] = {}
+        self._min: Dict[str, Any] = {}
+        self._unset: Dict[str, Any] = {}
+        self._conditions: Dict[str, Any] = {}
+
+    @classmethod
+    def for_instance(cls, instance: Model) -> 'CounterUpdate':
+        """Update for the row of a loaded instance."""
+        return cls(type(instance), pk=instance.pk)
+
+    def __bool__(self) -> bool:
+        return bool(self._add or self._max or self._min)
+
+    def add(self, field: str, amount: Any = 1) -> 'CounterUpdate':
+        """Increment a counter (negative amounts decrement)."""
+        if amount:
+            self._add[field] = self._add.get(field, 0) + amount
+        return self
+
+    def max(self, field: str, value: Any) -> 'CounterUpdate':
+        """Keep the larger of the stored value and value."""
+        self._max[field] = max(self._max.get(field, value), value)
+        return self
+
+    def min(self, field: str, value: Any, unset: Optional[Any] = None) -> 'CounterUpdate':
+        """
+        Keep the smaller of the stored value and value.
+
+        Args:
+            unset: Stored value meaning "no record yet" (e.g. 0), replaced by value
+        """
+        self._min[field] = min(self._min.get(field, value), value)
+        self._unset[field] = unset
+        return self
+
+    def merge(self, other: 'CounterUpdate') -> 'CounterUpdate':
+        """Add the changes of another update of the same row."""
+        for field, amount in other._add.items():
+            self.add(field, amount)
+        for field, value in other._max.items():
+            self.max(field, value)
+        for field, value in other._min.items():
+            self.min(field, value, other._unset[field])
+        self._conditions.update(other._conditions)
+        return self
+
+    def require(self, **lookups) -> 'CounterUpdate':
+        """Extra conditions for the row (e.g. money__gte=price)."""
+        self._conditions.update(lookups)
+        return self
+
+    def expressions(self) -> Dict[str, Any]:
+        """Arguments for QuerySet.update()."""
+        values = {field: F(field) + amount for field, amount in self._add.items()}
+        for field, value in self._max.items():
+            values[field] = Greatest(field, Value(value), output_field=self._field(field))
+        for field, value in self._min.items():
+            output_field = self._field(field)
+            smaller = Least(field, Value(value), output_field=output_field)
+            unset = self._unset[field]
+            if unset is not None:
+                smaller = Case(
+                    When(**{field: unset}, then=Value(value)),
+                    default=smaller,
+                    output_field=output_field
+                )
+            values[field] = smaller
+        return values
+
+    def execute(self) -> int:
+        """
+        Apply the changes in one UPDATE.
+
+        Returns:
+            Number of updated rows (0 - no row or require() conditions failed)
+        """
+        if not self:
+            return 0
+        return (
+            self.model.objects
+            .filter(**self.lookup, **self._conditions)
+            .update(**self.expressions())
+        )
+
+    def apply_to(self, instance: Model) -> None:
+        """Apply the same changes to an instance in memory."""
+        for field, amount in self._add.items():
+            setattr(instance, field, getattr(instance, field) + amount)
+        for field, value in self._max.items():
+            setattr(instance, field, max(getattr(instance, field), value))
+        for field, value in self._min.items():
+            current = getattr(instance, field)
+            unset = self._unset[field]
+            if unset is not None and current == unset:
+                setattr(instance, field, value)
+            else:
+                setattr(instance, field, min(current, value))
+
+    def _field(self, name: str):
+        return self.model._meta.get_field(name)
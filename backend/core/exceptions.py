@@ -28,6 +28,11 @@ class InvalidGameStateError(FishingGameException):
     pass
 
 
+class SessionNotFoundError(InvalidGameStateError):
+    """Raised when a partial update targets a game session that no longer exists."""
+    pass
+
+
 class LineBreakError(FishingGameException):
     """Raised when fishing line breaks."""
     pass
@@ -0,0 +1,66 @@
+"""
+Conditional GET for endpoints built only from the catalog.
+
+Such responses are the same for every user while the catalog version
+stays the same. They are rendered once per catalog snapshot, served with
+a strong ETag derived from the version and answered with 304 Not Modified
+when If-None-Match matches. The endpoints require authentication, so
+Cache-Control is private: only the browser reuses a response for
+CATALOG_HTTP_MAX_AGE seconds, shared caches (nginx, CDN) must not answer
+for the backend and skip the auth check. Revalidation after max-age is
+a cheap 304.
+"""
+import hashlib
+from typing import Any, Callable, Hashable, Iterable
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from .catalog import Catalog, get_catalog
+from .json_codec import JSONRenderer
+
+# Same renderer as NinjaAPI (fishing_game/urls.py)
+_renderer = JSONRenderer()
+
+
+def level_bucket(entries: Iterable[Any], level: int) -> int:
+    """
+    Highest required_level among entries available at the given level.
+
+    Players whose level lies between two neighbouring thresholds see the
+    same filtered list, so such lists are cached per bucket, not per level.
+    """
+    return max((e.required_level for e in entries if e.required_level <= level), default=0)
+
+
+def catalog_response(
+    request: HttpRequest,
+    key: Hashable,
+    build: Callable[[Catalog], Any]
+) -> HttpResponse:
+    """
+    Cached response for catalog data.
+
+    Args:
+        request: Current request (If-None-Match is read from it)
+        key: Identifies the response within a catalog snapshot (endpoint and parameters)
+        build: Returns response data from the snapshot; called once per snapshot and key
+    """
+    catalog = get_catalog()
+    digest = hashlib.blake2b(repr((catalog.version, key)).encode(), digest_size=16)
+    etag = f'"{digest.hexdigest()}"'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        content = catalog.derived(
+            ('http', key),
+            lambda: _renderer.render(request, build(catalog), response_status=200)
+        )
+        response = HttpResponse(
+            content, content_type=f'{_renderer.media_type}; charset={_renderer.charset}'
+        )
+
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=settings.CATALOG_HTTP_MAX_AGE)
+    return response
@@ -0,0 +1,113 @@
+"""
+JSON encoding shared by the WebSocket consumer and the REST API.
+
+The backend is chosen by the JSON_BACKEND setting: 'orjson', 'json'
+(stdlib) or 'auto' - orjson when it is installed, stdlib otherwise.
+Both backends produce the same data for the types the API returns:
+values orjson does not serialize itself (datetimes, Decimal, lazy
+strings, pydantic models) go through NinjaJSONEncoder.default, so
+dates keep Django's format.
+
+    python -m benchmarks.json_codec
+"""
+import json
+from typing import Any, Union
+
+from django.conf import settings
+from django.http import HttpRequest
+from ninja.parser import Parser
+from ninja.renderers import BaseRenderer
+from ninja.responses import NinjaJSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class StdlibBackend:
+    """Stdlib json with the encoder NinjaAPI uses by default."""
+
+    name = 'json'
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, cls=NinjaJSONEncoder)
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return self.dumps(obj).encode()
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonBackend:
+    """orjson; output is UTF-8 without ASCII escaping and without spaces."""
+
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError('JSON_BACKEND = "orjson" requires the orjson package')
+        self._default = NinjaJSONEncoder().default
+        # Non-string keys are converted like in stdlib; datetimes go to
+        # NinjaJSONEncoder to keep Django's format (milliseconds, 'Z')
+        self._options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj: Any) -> str:
+        return self.dumps_bytes(obj).decode()
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=self._default, option=self._options)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+
+BACKENDS = {
+    StdlibBackend.name: StdlibBackend,
+    OrjsonBackend.name: OrjsonBackend,
+}
+
+
+def get_backend(name: str = 'auto'):
+    """Backend instance by name; 'auto' picks orjson when it is installed."""
+    if name == 'auto':
+        name = OrjsonBackend.name if orjson is not None else StdlibBackend.name
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f'Unknown JSON_BACKEND: {name!r}') from None
+
+
+backend = get_backend(getattr(settings, 'JSON_BACKEND', 'auto'))
+
+
+def dumps(obj: Any) -> str:
+    """Encode to a JSON string (WebSocket text frames)."""
+    return backend.dumps(obj)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Encode to UTF-8 JSON bytes (HTTP responses)."""
+    return backend.dumps_bytes(obj)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON; invalid input raises ValueError (json.JSONDecodeError)."""
+    return backend.loads(data)
+
+
+class JSONRenderer(BaseRenderer):
+    """NinjaAPI renderer using the configured backend."""
+
+    media_type = 'application/json'
+
+    def render(self, request: HttpRequest, data: Any, *, response_status: int) -> bytes:
+        return dumps_bytes(data)
+
+
+class JSONParser(Parser):
+    """NinjaAPI request body parser using the configured backend."""
+
+    def parse_body(self, request: HttpRequest):
+        return loads(request.body)
@@ -70,6 +70,59 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Game
+GAME_FIGHT_TICK = 0.1  # Шаг симуляции вываживания (сек)
+GAME_FIGHT_MAX_CATCH_UP = 5  # Макс. шагов догонки за кадр при перегрузке
+GAME_FIGHT_CHECKPOINT_INTERVAL = 5  # Периодичность сохранения боя в БД (сек), 0 - отключено
+GAME_FIGHT_KEYFRAME_INTERVAL = 20  # Полный кадр fight_update раз в N тиков в дельта-режиме (?delta=1)
+# Частота отправки fight_update (Гц) по фазам боя, не выше 1 / GAME_FIGHT_TICK:
+#   calm - рыба пассивна или выдохлась, urgent - рывок или натяжение ≥ GAME_FIGHT_URGENT_TENSION
+#   (при шаге 0.1 urgent = каждый шаг, normal - каждый второй)
+GAME_FIGHT_SEND_RATES = {'calm': 3, 'normal': 5, 'urgent': 10}
+GAME_FIGHT_URGENT_TENSION = 75
+
+# Отложенная запись итогов боя (apps/game/services/write_behind.py):
+# награда считается в памяти, улов и счётчики применяются пачками из журнала PendingWrite.
+# Выключено: итоги боя попадают в таблицы с задержкой до GAME_WRITE_BEHIND_INTERVAL,
+# включается явно в настройках окружения
+GAME_WRITE_BEHIND = False
+GAME_WRITE_BEHIND_INTERVAL = 1.0  # Задержка сброса журнала (сек)
+GAME_WRITE_BEHIND_BATCH_SIZE = 500  # Записей журнала в одной транзакции сброса
+
+# Хранилище живого состояния сессий:
+#   DatabaseSessionStore - таблица GameSession
+#   InMemorySessionStore - память процесса (только один воркер)
+#   RedisSessionStore    - Redis hash, например
+#       {'BACKEND': 'apps.game.services.session_store.RedisSessionStore',
+#        'OPTIONS': {'url': 'redis://localhost:6379/1'}}
+GAME_SESSION_STORE = {
+    'BACKEND': 'apps.game.services.session_store.DatabaseSessionStore',
+    'OPTIONS': {},
+}
+
+# Таблицы рекордов (apps/progression/leaderboards.py):
+#   RedisLeaderboardStore - Redis sorted sets, InMemoryLeaderboardStore - память процесса
+LEADERBOARD_STORE = {
+    'BACKEND': 'apps.progression.leaderboards.RedisLeaderboardStore',
+    'OPTIONS': {'url': f"redis://{os.environ.get('REDIS_HOST', 'localhost')}:6379/3"},
+}
+LEADERBOARD_WEEKS_KEPT = 5  # Сколько недель хранить недельные таблицы
+
+# Помесячные партиции CatchRecord в PostgreSQL (apps/fishing/services/partitions.py,
+# команда catch_partitions) и дневные итоги уловов (команда rollup_catches)
+CATCH_PARTITION_MONTHS_AHEAD = 3  # Сколько месяцев партиций создавать заранее
+CATCH_RETENTION_MONTHS = 24  # Сколько месяцев сырых уловов держать подключёнными
+
+# Справочник (снасти, рыба, локации) в памяти процесса, см. core/catalog.py.
+# Версия хранится в кэше CATALOG_CACHE - для нескольких воркеров он должен быть общим.
+CATALOG_CACHE = 'default'
+CATALOG_CHECK_INTERVAL = 2  # Как часто сверять версию справочника (сек)
+CATALOG_HTTP_MAX_AGE = 10  # Cache-Control: max-age для списков справочника (сек), см. core/http_cache.py
+
+# Кодирование JSON в WebSocket и REST API (core/json_codec.py):
+#   'auto' - orjson, если установлен, иначе стандартный json; 'orjson'; 'json'
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+
 # Database
 DATABASES = {
     'default': {
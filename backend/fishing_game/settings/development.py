@@ -56,3 +56,12 @@ LOGGING = {
         },
     },
 }
+
+# Отложенная запись итогов боя (см. base.py)
+GAME_WRITE_BEHIND = True
+
+# Таблицы рекордов в памяти процесса (без Redis)
+LEADERBOARD_STORE = {
+    'BACKEND': 'apps.progression.leaderboards.InMemoryLeaderboardStore',
+    'OPTIONS': {},
+}
@@ -0,0 +1,24 @@
+"""
+Django test settings (pytest).
+
+PostgreSQL from the environment when DB_HOST is set (docker-compose),
+otherwise SQLite - tests that need PostgreSQL are skipped there.
+"""
+import os
+
+from .development import *
+
+if not os.environ.get('DB_HOST'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'test.sqlite3',
+        }
+    }
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+}
@@ -15,11 +15,14 @@ from apps.fishing.api import router as fishing_router
 from apps.equipment.api import router as equipment_router
 from apps.inventory.api import router as inventory_router
 from apps.progression.api import router as progression_router
+from core.json_codec import JSONParser, JSONRenderer
 
 api = NinjaAPI(
     title='Fishing Game API',
     version='1.0.0',
-    description='API для браузерной игры-рыбалки'
+    description='API для браузерной игры-рыбалки',
+    renderer=JSONRenderer(),
+    parser=JSONParser()
 )
 
 # JWT Authentication routers